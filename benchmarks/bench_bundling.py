@@ -0,0 +1,132 @@
+"""
+Benchmark of the loading of a synthetic spec split across files, with its schemas spread over
+files referencing each other, against the loading of the same spec as a single file.
+
+Run with: python -m benchmarks.bench_bundling [--schemas 1000] [--files 50] [--format yaml]
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.spec_factory import make_spec
+
+from python_client_generator.bundling import (
+    DocumentCache,
+    bundle_external_refs,
+    load_document,
+)
+
+
+SCHEMAS_PREFIX = "#/components/schemas/"
+
+
+def _relocate_refs(node: Any, get_file: Callable[[str], str]) -> Any:
+    """
+    Copy of a node whose `$ref`s to schemas point to the file holding them
+    """
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith(SCHEMAS_PREFIX):
+            return {**node, "$ref": f"{get_file(ref.replace(SCHEMAS_PREFIX, '', 1))}{ref}"}
+        return {k: _relocate_refs(v, get_file) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_relocate_refs(v, get_file) for v in node]
+    return node
+
+
+def dump_document(obj: Any, path: Path) -> None:
+    with open(path, "w") as f:
+        if path.suffix == ".json":
+            json.dump(obj, f)
+        else:
+            import yaml
+
+            yaml.safe_dump(obj, f, sort_keys=False)
+
+
+def write_split_spec(spec: Dict[str, Any], out_dir: Path, files: int, suffix: str) -> Path:
+    """
+    Write a spec as a root document and `files` files of schemas, returns the root document
+    """
+    names = list(spec["components"]["schemas"])
+    file_of = {n: f"part{i % files}{suffix}" for i, n in enumerate(names)}
+
+    (out_dir / "schemas").mkdir()
+    for i in range(files):
+        schemas = {
+            n: _relocate_refs(s, lambda r: file_of[r] if file_of[r] != file_of[n] else "")
+            for n, s in spec["components"]["schemas"].items()
+            if file_of[n] == f"part{i}{suffix}"
+        }
+        dump_document(
+            {"components": {"schemas": schemas}}, out_dir / "schemas" / f"part{i}{suffix}"
+        )
+
+    root = {
+        **spec,
+        "paths": _relocate_refs(spec["paths"], lambda r: f"schemas/{file_of[r]}"),
+        "components": {},
+    }
+    dump_document(root, out_dir / f"openapi{suffix}")
+    return out_dir / f"openapi{suffix}"
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark(schemas: int, files: int, repeat: int, suffix: str = ".json") -> List[Dict[str, Any]]:
+    spec = make_spec(schemas, operations=schemas // 5, ref_reuse=3, union_fan_out=2, acyclic=True)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        single_path = Path(tmp_dir) / f"single{suffix}"
+        dump_document(spec, single_path)
+        split_dir = Path(tmp_dir) / "split"
+        split_dir.mkdir()
+        split_path = write_split_spec(spec, split_dir, files, suffix)
+
+        cache = DocumentCache()
+
+        def load_split(cache: DocumentCache) -> Dict[str, Any]:
+            return bundle_external_refs(load_document(split_path), split_path, cache)
+
+        # Only the schemas the paths reference, directly or not, are bundled
+        bundled = load_split(cache)["components"]["schemas"]
+        assert set(bundled) <= set(spec["components"]["schemas"])
+
+        return [
+            {"case": "single file", "load_s": _time(lambda: load_document(single_path), repeat)},
+            {
+                "case": f"{files + 1} files, cold cache",
+                "load_s": _time(lambda: load_split(DocumentCache()), repeat),
+            },
+            {
+                "case": f"{files + 1} files, warm cache",
+                "load_s": _time(lambda: load_split(cache), repeat),
+            },
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the bundling of split specs.")
+    parser.add_argument("--schemas", type=int, default=1000, help="Number of schemas")
+    parser.add_argument("--files", type=int, default=50, help="Number of files of schemas")
+    parser.add_argument("--format", choices=["json", "yaml"], default="json", help="Split files")
+    parser.add_argument("--repeat", type=int, default=5, help="Keep the best of N timings")
+    args = parser.parse_args()
+
+    print(f"{'case':<24}  {'load (ms)':>10}")
+    for r in benchmark(args.schemas, args.files, args.repeat, f".{args.format}"):
+        print(f"{r['case']:<24}  {r['load_s'] * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Benchmark of the decoding of responses by clients generated with each model backend: Pydantic v1,
+Pydantic v2 (when installed) and msgspec (when installed), and by Pydantic v1 clients building
+responses without validation (`validate=False`).
+
+Run with: python -m benchmarks.bench_decode [--items 1000]
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pydantic
+
+from python_client_generator.generate_apis import (
+    TaggedEndpointDefinition,
+    get_endpoints,
+    get_response_parser,
+)
+from python_client_generator.main import generate, get_parser
+from python_client_generator.utils import (
+    add_schema_title_if_missing,
+    dereference_swagger,
+)
+
+
+ROOT_PATH = Path(os.path.dirname(os.path.realpath(__file__))).parent
+PETSTORE_PATH = ROOT_PATH / "tests" / "inputs" / "swagger-petstore.json"
+
+PET = {
+    "id": 1,
+    "name": "doggie",
+    "category": {"id": 1, "name": "Dogs"},
+    "photoUrls": ["https://domain.tld/doggie.png"],
+    "tags": [{"id": 1, "name": "good"}],
+    "status": "available",
+}
+FOO = {
+    "field_1": "foo",
+    "field_2": 1,
+    "field_3": 1.5,
+    "field_4": True,
+    "field_5": "five",
+    "field_6": "six",
+    "field_7": {"field_1": "bar", "field_2": False},
+    "field_8": "option_1",
+}
+
+EVENT_KINDS = 20
+
+
+def get_events_spec(kinds: int) -> Dict[str, Any]:
+    """
+    Spec of an operation listing events, a union of `kinds` schemas told apart by a discriminator
+    """
+    schemas: Dict[str, Any] = {
+        f"Event{i}": {
+            "type": "object",
+            "properties": {
+                "kind": {"type": "string"},
+                "id": {"type": "integer"},
+                "payload": {"type": "object", "properties": {"value": {"type": "string"}}},
+            },
+            "required": ["kind", "id"],
+        }
+        for i in range(kinds)
+    }
+    schemas["Event"] = {
+        "title": "Event",
+        "oneOf": [{"$ref": f"#/components/schemas/Event{i}"} for i in range(kinds)],
+        "discriminator": {
+            "propertyName": "kind",
+            "mapping": {f"kind_{i}": f"#/components/schemas/Event{i}" for i in range(kinds)},
+        },
+    }
+    response = {"type": "array", "items": {"$ref": "#/components/schemas/Event"}}
+    return {
+        "openapi": "3.0.2",
+        "info": {"title": "Events", "version": "1.0.0"},
+        "paths": {
+            "/events": {
+                "get": {
+                    "operationId": "list_events",
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            "content": {"application/json": {"schema": response}},
+                        }
+                    },
+                }
+            }
+        },
+        "components": {"schemas": schemas},
+    }
+
+
+# Model backends available in this environment, as options of the generator and whether
+# responses are validated
+Backend = Tuple[str, List[str], bool]
+
+
+def get_backends() -> List[Backend]:
+    backends = [
+        ("pydantic v1", ["--pydantic", "v1"], True),
+        ("pydantic v1 unvalidated", ["--pydantic", "v1"], False),
+    ]
+    if pydantic.VERSION.startswith("2."):
+        backends.append(("pydantic v2", ["--pydantic", "v2"], True))
+    if importlib.util.find_spec("msgspec"):
+        backends.append(("msgspec", ["--model-backend", "msgspec"], True))
+    return backends
+
+
+def get_cases(tmp_dir: Path, items: int) -> List[Tuple[str, Path, str, bytes]]:
+    """
+    Cases as their name, spec, operation and response content
+    """
+    # The app of the test fixture, which requires FastAPI (a development dependency)
+    app = importlib.import_module("tests.inputs.fastapi_app").app
+
+    fastapi_path = tmp_dir / "fastapi_app_openapi.json"
+    with open(fastapi_path, "w") as f:
+        json.dump(app.openapi(), f)
+
+    paginated_foos = {"results": [FOO] * items, "offset": 0, "limit": items, "size": items}
+
+    events_path = tmp_dir / "events_openapi.json"
+    with open(events_path, "w") as f:
+        json.dump(get_events_spec(EVENT_KINDS), f)
+    events = [
+        {"kind": f"kind_{i % EVENT_KINDS}", "id": i, "payload": {"value": str(i)}}
+        for i in range(items)
+    ]
+    return [
+        ("petstore pet", PETSTORE_PATH, "getPetById", json.dumps(PET).encode()),
+        (
+            f"petstore {items} pets",
+            PETSTORE_PATH,
+            "findPetsByStatus",
+            json.dumps([PET] * items).encode(),
+        ),
+        (
+            f"fastapi {items} foos",
+            fastapi_path,
+            "list_foos_api_foo_get",
+            json.dumps(paginated_foos).encode(),
+        ),
+        (f"{items} events", events_path, "list_events", json.dumps(events).encode()),
+    ]
+
+
+def get_decoder(
+    spec_path: Path,
+    operation_id: str,
+    options: List[str],
+    validate: bool,
+    out_dir: Path,
+    package_name: str,
+) -> Callable[[bytes], Any]:
+    """
+    Generate a client and get the function its operation parses responses with
+    """
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", "bench"]
+        + ["--outdir", str(out_dir), "--no-cache"]
+        + options
+    )
+    generate(args)
+
+    sys.path.insert(0, str(out_dir))
+    try:
+        apis = importlib.import_module(f"{package_name}.apis")
+    finally:
+        sys.path.remove(str(out_dir))
+
+    with open(spec_path, "r") as f:
+        swagger = json.load(f)
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+    swagger = dereference_swagger(swagger, swagger)
+    e_def = next(
+        TaggedEndpointDefinition(path_name, method_name, method)
+        for path_name, path in swagger["paths"].items()
+        for method_name, method in path.items()
+        if method["operationId"] == operation_id
+    )
+    pydantic_v2 = args.pydantic == "v2"
+    (endpoint,) = get_endpoints([e_def], True, pydantic_v2, args.model_backend)
+    parser = get_response_parser(endpoint["return_type"], pydantic_v2, args.model_backend)
+    assert parser is not None
+    parse: Callable[[Any], Any] = eval(parser, vars(apis))
+    if not endpoint["json_codec"]:
+        return parse
+    if not validate:
+        return_type = eval(endpoint["return_type"], vars(apis))
+        parse = partial(apis.construct, return_type)
+
+    # Pydantic v1 models are parsed from the content decoded by the client JSON codec
+    json_codec = importlib.import_module(f"{package_name}.base_client").default_json_codec
+    return lambda content: parse(json_codec.loads(content))
+
+
+def best_time(decode: Callable[[bytes], Any], content: bytes, repeat: int, number: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            decode(content)
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def benchmark(items: int, repeat: int, number: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case, spec_path, operation_id, content in get_cases(Path(tmp_dir), items):
+            for backend, options, validate in get_backends():
+                package_name = f"bench_{len(results)}_client"
+                decode = get_decoder(
+                    spec_path, operation_id, options, validate, Path(tmp_dir), package_name
+                )
+                results.append(
+                    {
+                        "case": case,
+                        "backend": backend,
+                        "decode_s": best_time(decode, content, repeat, number),
+                    }
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response decoding per model backend.")
+    parser.add_argument("--items", type=int, default=1000, help="Number of items of list responses")
+    parser.add_argument("--repeat", type=int, default=5, help="Keep the best of N timings")
+    parser.add_argument("--number", type=int, default=100, help="Decodes per timing")
+    args = parser.parse_args()
+
+    results = benchmark(args.items, args.repeat, args.number)
+
+    baselines = {r["case"]: r["decode_s"] for r in results if r["backend"] == "pydantic v1"}
+    print(f"{'case':<20}  {'backend':<24}  {'decode (us)':>12}  {'speedup':>8}")
+    for r in results:
+        speedup = baselines[r["case"]] / r["decode_s"]
+        print(
+            f"{r['case']:<20}  {r['backend']:<24}  {r['decode_s'] * 1e6:>12.1f}  {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark of the models generated with and without `--deduplicate-schemas`, off a synthetic spec
+whose schemas nest inline objects of a few shapes and are partly copied under another name.
+
+Run with: python -m benchmarks.bench_deduplication [--schemas 1000] [--copies 500] [--depth 2]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.spec_factory import make_spec
+
+from python_client_generator.main import generate, get_parser
+
+
+# Imports the models and prints the time it took and the growth of the peak memory of the process
+IMPORT_SCRIPT = """
+import json, resource, time
+memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+print(json.dumps({{"import_s": duration, "memory_kb": memory}}))
+"""
+
+
+def run_import(out_dir: Path, module: str) -> Dict[str, Any]:
+    script = IMPORT_SCRIPT.format(module=module)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=out_dir, check=True, capture_output=True, text=True
+    ).stdout
+    result: Dict[str, Any] = json.loads(output)
+    return result
+
+
+def benchmark(
+    schemas: int,
+    operations: int,
+    copies: int,
+    depth: int,
+    repeat: int,
+    options: Sequence[str] = (),
+) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = Path(tmp_dir) / "openapi.json"
+        spec = make_spec(
+            schemas,
+            operations,
+            depth=depth,
+            ref_reuse=1,
+            union_fan_out=0,
+            acyclic=True,
+            copies=copies,
+        )
+        with open(spec_path, "w") as f:
+            json.dump(spec, f)
+
+        for deduplicate in [False, True]:
+            package_name = f"bench_{'deduplicated' if deduplicate else 'default'}_client"
+            args = get_parser().parse_args(
+                ["--open-api", str(spec_path), "--package-name", package_name]
+                + ["--project-name", "bench", "--outdir", tmp_dir, "--no-cache"]
+                + (["--deduplicate-schemas"] if deduplicate else [])
+                + list(options)
+            )
+            start = time.perf_counter()
+            generate(args)
+            duration = time.perf_counter() - start
+
+            with open(Path(tmp_dir) / package_name / "models.py", "r") as f:
+                models = f.read()
+
+            # Imports in new processes, the first one compiling the module
+            module = f"{package_name}.models"
+            run_import(Path(tmp_dir), module)
+            runs = [run_import(Path(tmp_dir), module) for _ in range(repeat)]
+            results.append(
+                {
+                    "deduplicate": deduplicate,
+                    "generate_s": duration,
+                    "classes": len(re.findall(r"^class ", models, re.MULTILINE)),
+                    "aliases": len(re.findall(r"^\w+ = \w+$", models, re.MULTILINE)),
+                    "size_b": len(models.encode()),
+                    "import_s": min(r["import_s"] for r in runs),
+                    "memory_kb": min(r["memory_kb"] for r in runs),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the deduplication of schemas.")
+    parser.add_argument("--schemas", type=int, default=1000, help="Number of schemas")
+    parser.add_argument("--operations", type=int, default=200, help="Number of operations")
+    parser.add_argument("--copies", type=int, default=500, help="Schemas copied under a new name")
+    parser.add_argument("--depth", type=int, default=2, help="Depth of the inline objects")
+    parser.add_argument("--repeat", type=int, default=5, help="Keep the best of N imports")
+    args, options = parser.parse_known_args()
+
+    print(
+        f"{'deduplicate':<12}  {'generate (s)':>12}  {'classes':>8}  {'aliases':>8}  "
+        f"{'size (KB)':>10}  {'import (ms)':>12}  {'memory (MB)':>12}"
+    )
+    for r in benchmark(
+        args.schemas, args.operations, args.copies, args.depth, args.repeat, options
+    ):
+        print(
+            f"{str(r['deduplicate']):<12}  {r['generate_s']:>12.2f}  {r['classes']:>8}  "
+            f"{r['aliases']:>8}  {r['size_b'] / 1e3:>10.0f}  {r['import_s'] * 1e3:>12.1f}  "
+            f"{r['memory_kb'] / 1e3:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
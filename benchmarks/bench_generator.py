@@ -0,0 +1,146 @@
+"""
+Benchmark of each phase of the generation of a client off synthetic specs.
+
+Run with: python -m benchmarks.bench_generator --schemas 100 1000 --operations 200 2000
+Results are printed (or written to --output) as JSON.
+"""
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+import tracemalloc
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.spec_factory import make_spec
+
+from python_client_generator.generate_apis import generate_apis
+from python_client_generator.generate_models import generate_models
+from python_client_generator.profiling import Profiler, Timing, profiling
+from python_client_generator.schema_cache import schema_cache
+from python_client_generator.utils import (
+    add_schema_title_if_missing,
+    dereference_swagger,
+)
+
+
+Phase = Tuple[str, Callable[[], None]]
+
+
+def get_phases(spec_path: Path, out_dir: Path) -> List[Phase]:
+    """
+    Phases of the generation, each one working off the results of the previous ones
+    """
+    state: Dict[str, Any] = {}
+
+    def load() -> None:
+        with open(spec_path, "r") as f:
+            state["swagger"] = json.load(f)
+
+    def add_titles() -> None:
+        add_schema_title_if_missing(state["swagger"]["components"]["schemas"])
+
+    def dereference() -> None:
+        state["dereferenced"] = dereference_swagger(state["swagger"], state["swagger"])
+
+    def models() -> None:
+        generate_models(state["dereferenced"], out_dir / "models.py")
+
+    def apis() -> None:
+        generate_apis(state["dereferenced"], out_dir / "apis.py", group_by_tags=True, sync=False)
+
+    return [
+        ("load", load),
+        ("add_schema_title_if_missing", add_titles),
+        ("dereference_swagger", dereference),
+        ("generate models.py", models),
+        ("generate apis.py", apis),
+    ]
+
+
+def run(spec_path: Path, trace_memory: bool) -> Dict[str, Timing]:
+    profiler = Profiler()
+    with tempfile.TemporaryDirectory() as out_dir, schema_cache(), profiling(profiler):
+        phases = get_phases(spec_path, Path(out_dir))
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            for name, phase in phases:
+                with profiler.phase(name):
+                    phase()
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+    # Followed by the nested phases timed by the generator itself (analysis, renders, writes)
+    top_level = [name for name, _ in phases]
+    nested = [name for name in profiler.phases if name not in top_level]
+    return {name: profiler.phases[name] for name in top_level + nested}
+
+
+def benchmark(params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = Path(tmp_dir) / "openapi.json"
+        with open(spec_path, "w") as f:
+            json.dump(make_spec(**params), f)
+
+        # Time phases without tracing memory allocations, which slows them down
+        runs = [run(spec_path, trace_memory=False) for _ in range(repeat)]
+        memory = run(spec_path, trace_memory=True)
+
+        phases = {
+            name: {
+                "wall_s": min(r[name].wall_s for r in runs),
+                "cpu_s": min(r[name].cpu_s for r in runs),
+                "peak_mb": timing.peak_mb,
+            }
+            for name, timing in memory.items()
+        }
+        return {
+            "params": params,
+            "spec_size_mb": spec_path.stat().st_size / 1e6,
+            "phases": phases,
+            "total_wall_s": sum(p["wall_s"] for p in phases.values()),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the generator phases.")
+    parser.add_argument("--schemas", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--operations", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--depth", type=int, nargs="+", default=[2])
+    parser.add_argument("--union-fan-out", type=int, nargs="+", default=[3])
+    parser.add_argument("--ref-reuse", type=int, nargs="+", default=[3])
+    parser.add_argument("--repeat", type=int, default=3, help="Keep the best of N timings")
+    parser.add_argument("--output", type=str, default=None, help="JSON file to write results to")
+    args = parser.parse_args()
+
+    grid = itertools.product(
+        args.schemas, args.operations, args.depth, args.union_fan_out, args.ref_reuse
+    )
+    results = [
+        benchmark(
+            {
+                "schemas": schemas,
+                "operations": operations,
+                "depth": depth,
+                "union_fan_out": union_fan_out,
+                "ref_reuse": ref_reuse,
+            },
+            args.repeat,
+        )
+        for schemas, operations, depth, union_fan_out, ref_reuse in grid
+    ]
+
+    report = {"python": sys.version.split()[0], "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of the time to import the api of one tag of clients generated with each layout, off a
+synthetic spec whose schemas reference a few others, as most real specs do.
+
+Run with: python -m benchmarks.bench_import [--schemas 1000] [--operations 2000]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.spec_factory import make_spec
+
+from python_client_generator.main import generate, get_parser
+
+
+# Imports the api of the first tag and prints the time it took and the modules it imported
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from {module} import Tag_0Api
+duration = time.perf_counter() - start
+modules = [m for m in sys.modules if m.startswith("{package}.")]
+print(json.dumps({{"import_s": duration, "modules": len(modules)}}))
+"""
+
+
+def time_import(out_dir: Path, package_name: str, module: str) -> Dict[str, Any]:
+    script = IMPORT_SCRIPT.format(module=module, package=package_name)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=out_dir, check=True, capture_output=True, text=True
+    ).stdout
+    result: Dict[str, Any] = json.loads(output)
+    return result
+
+
+def benchmark(
+    schemas: int, operations: int, ref_reuse: int, repeat: int, options: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = Path(tmp_dir) / "openapi.json"
+        spec = make_spec(schemas, operations, ref_reuse=ref_reuse, union_fan_out=0, acyclic=True)
+        with open(spec_path, "w") as f:
+            json.dump(spec, f)
+
+        for layout, module in [("single", "apis"), ("modular", "")]:
+            package_name = f"bench_{layout}_client"
+            args = get_parser().parse_args(
+                ["--open-api", str(spec_path), "--package-name", package_name]
+                + ["--project-name", "bench", "--outdir", tmp_dir, "--no-cache"]
+                + ["--group-by-tags", "--layout", layout]
+                + list(options)
+            )
+            generate(args)
+
+            # Imports in new processes, the first one compiling the modules
+            time_import(Path(tmp_dir), package_name, package_name)
+            runs = [
+                time_import(Path(tmp_dir), package_name, f"{package_name}.{module}".rstrip("."))
+                for _ in range(repeat)
+            ]
+            results.append(
+                {
+                    "layout": layout,
+                    "import_s": min(r["import_s"] for r in runs),
+                    "modules": runs[0]["modules"],
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the import of clients per layout.")
+    parser.add_argument("--schemas", type=int, default=1000, help="Number of schemas")
+    parser.add_argument("--operations", type=int, default=2000, help="Number of operations")
+    parser.add_argument("--ref-reuse", type=int, default=1, help="References of each schema")
+    parser.add_argument("--repeat", type=int, default=5, help="Keep the best of N imports")
+    args, options = parser.parse_known_args()
+
+    print(f"{'layout':<8}  {'import (ms)':>12}  {'modules':>8}")
+    for r in benchmark(args.schemas, args.operations, args.ref_reuse, args.repeat, options):
+        print(f"{r['layout']:<8}  {r['import_s'] * 1e3:>12.1f}  {r['modules']:>8}")
+
+
+if __name__ == "__main__":
+    main()
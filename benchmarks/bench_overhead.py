@@ -0,0 +1,107 @@
+"""
+Microbenchmark of the per-call overhead of a generated client, excluding the network. Calls are
+timed with the requests of the client stubbed out ("client"), i.e. only the generated code
+building requests and parsing responses, and through a mock transport ("client + httpx"), adding
+the request handling of httpx.
+
+Run with: python -m benchmarks.bench_overhead [--number 10000]
+"""
+import argparse
+import importlib
+import json
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from python_client_generator.main import generate, get_parser
+
+
+ROOT_PATH = Path(__file__).parent.parent
+PETSTORE_PATH = ROOT_PATH / "tests" / "inputs" / "swagger-petstore.json"
+
+PET = {"id": 1, "name": "doggie", "photoUrls": [], "status": "available"}
+
+
+def get_cases(apis: Any) -> List[Tuple[str, str, Dict[str, Any], bytes]]:
+    """
+    Cases as their name, operation, arguments and response content
+    """
+    return [
+        ("path param", "getPetById", {"petId": 1}, json.dumps(PET).encode()),
+        ("query params", "updatePetWithForm", {"petId": 1, "name": "a", "status": "b"}, b""),
+        ("header param", "deletePet", {"petId": 1, "api_key": "key"}, b""),
+        ("json body", "addPet", {"body": apis.Pet.parse_obj(PET)}, json.dumps(PET).encode()),
+    ]
+
+
+def get_apis(out_dir: Path) -> Any:
+    """
+    Generate a sync client of the petstore, whose calls don't involve an event loop
+    """
+    args = get_parser().parse_args(
+        ["--open-api", str(PETSTORE_PATH), "--package-name", "overhead_client"]
+        + ["--project-name", "overhead", "--outdir", str(out_dir), "--no-cache", "--sync"]
+    )
+    generate(args)
+
+    sys.path.insert(0, str(out_dir))
+    try:
+        return importlib.import_module("overhead_client.apis")
+    finally:
+        sys.path.remove(str(out_dir))
+
+
+def best_time(call: Callable[[], Any], repeat: int, number: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def benchmark(repeat: int, number: int) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        apis = get_apis(Path(tmp_dir))
+        for case, operation_id, kwargs, content in get_cases(apis):
+            response = httpx.Response(200, content=content, request=httpx.Request("GET", "/"))
+            transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+            transport_client = apis.Api(base_url="https://domain.tld", transport=transport)
+            stubbed_client = apis.Api(base_url="https://domain.tld")
+            stubbed_client.request = lambda *args, **kwargs: response
+            stubbed_client.send = lambda *args, **kwargs: response
+
+            def call(client: Any) -> Callable[[], Any]:
+                method = getattr(client, operation_id)
+                return lambda: method(**kwargs)
+
+            results.append(
+                {
+                    "case": case,
+                    "client_s": best_time(call(stubbed_client), repeat, number),
+                    "httpx_s": best_time(call(transport_client), repeat, number),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the per-call overhead of a client.")
+    parser.add_argument("--repeat", type=int, default=5, help="Keep the best of N timings")
+    parser.add_argument("--number", type=int, default=10000, help="Calls per timing")
+    args = parser.parse_args()
+
+    print(f"{'case':<14}  {'client (us)':>12}  {'client + httpx (us)':>20}")
+    for r in benchmark(args.repeat, args.number):
+        print(f"{r['case']:<14}  {r['client_s'] * 1e6:>12.2f}  {r['httpx_s'] * 1e6:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Scaling benchmark for the model dependency sorting.
+
+Run with: python -m benchmarks.bench_sort_models
+"""
+import argparse
+import random
+import time
+
+from typing import Any, Dict, List
+
+from python_client_generator.generate_models import _sort_models
+
+
+def make_models(count: int, refs_per_model: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build `count` models each referencing `refs_per_model` random other models.
+
+    References point to any model, so the graph contains cycles of various sizes.
+    """
+    rng = random.Random(seed)
+    names = [f"Model{i}" for i in range(count)]
+    return [
+        {
+            "name": name,
+            "refs": rng.sample(names, min(refs_per_model, count)),
+            "fields": [{"name": "field", "type": "int"}],
+        }
+        for name in names
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark model dependency sorting.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument("--refs-per-model", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'models':>8} {'best (ms)':>10} {'us/model':>9}")
+    for size in args.sizes:
+        timings = []
+        for _ in range(args.repeat):
+            models = make_models(size, args.refs_per_model)
+            start = time.perf_counter()
+            _sort_models(models)
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        print(f"{size:>8} {best * 1e3:>10.2f} {best * 1e6 / size:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of rendering templates from their tokens, compared to rendering them from their files.
+
+Run with: python -m benchmarks.bench_templates [--open-api openapi.json]
+"""
+import argparse
+import json
+import os
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import chevron
+
+from python_client_generator.generate_apis import get_api_groups, get_endpoints
+from python_client_generator.generate_models import get_models
+from python_client_generator.template_engine import render_template, templates_path
+from python_client_generator.utils import (
+    add_schema_title_if_missing,
+    dereference_swagger,
+)
+
+
+PETSTORE_PATH = (
+    Path(os.path.dirname(os.path.realpath(__file__))).parent
+    / "tests"
+    / "inputs"
+    / "swagger-petstore.json"
+)
+
+
+def render_from_file(name: str, data: Dict[str, Any]) -> str:
+    with open(templates_path / name, "r") as f:
+        return chevron.render(f, data)
+
+
+def get_renders(swagger: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    endpoint_defs = [e for defs in get_api_groups(swagger, False).values() for e in defs]
+    return [("apis_endpoint.py.mustache", e) for e in get_endpoints(endpoint_defs, False)] + [
+        ("models_model.py.mustache", m) for m in get_models(swagger["components"]["schemas"])
+    ]
+
+
+def best_time(
+    render: Callable[[str, Dict[str, Any]], str],
+    renders: List[Tuple[str, Dict[str, Any]]],
+    repeat: int,
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, data in renders:
+            render(name, data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark template rendering.")
+    parser.add_argument("--open-api", type=str, default=str(PETSTORE_PATH))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.open_api, "r") as f:
+        swagger = json.load(f)
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+    renders = get_renders(dereference_swagger(swagger, swagger))
+
+    from_file = best_time(render_from_file, renders, args.repeat)
+    from_tokens = best_time(render_template, renders, args.repeat)
+
+    print(f"{len(renders)} renders")
+    print(f"{'from file':>12}: {from_file * 1e3:8.2f} ms")
+    print(f"{'from tokens':>12}: {from_tokens * 1e3:8.2f} ms ({from_file / from_tokens:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
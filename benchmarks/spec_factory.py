@@ -0,0 +1,153 @@
+"""
+Factory of synthetic OpenAPI specs to benchmark the generator with.
+"""
+import copy
+import random
+
+from typing import Any, Dict, List
+
+
+SCALAR_SCHEMAS: List[Dict[str, Any]] = [
+    {"type": "string"},
+    {"type": "integer"},
+    {"type": "number"},
+    {"type": "boolean"},
+    {"type": "string", "format": "date-time"},
+    {"type": "string", "format": "uuid"},
+    {"type": "string", "maxLength": 255},
+]
+
+
+def _ref(name: str) -> Dict[str, Any]:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _nested_object(depth: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    Inline (untitled) object nested `depth` levels deep
+    """
+    properties: Dict[str, Any] = {f"leaf_{i}": rng.choice(SCALAR_SCHEMAS) for i in range(3)}
+    if depth > 1:
+        properties["nested"] = _nested_object(depth - 1, rng)
+    return {"type": "object", "properties": properties}
+
+
+def make_spec(
+    schemas: int = 100,
+    operations: int = 200,
+    depth: int = 2,
+    union_fan_out: int = 3,
+    ref_reuse: int = 3,
+    fields: int = 8,
+    seed: int = 0,
+    acyclic: bool = False,
+    copies: int = 0,
+) -> Dict[str, Any]:
+    """
+    Build an OpenAPI 3 spec.
+
+    :param int schemas: number of object schemas, plus one enum for every ten of them
+    :param int operations: number of operations, spread over paths of up to four methods
+    :param int depth: nesting depth of the inline object property of each schema
+    :param int union_fan_out: number of members of the union property of each schema
+    :param int ref_reuse: number of `$ref`s to other schemas in the properties of each schema
+    :param int fields: number of scalar properties of each schema
+    :param int seed: seed of the random choices, the same parameters give the same spec
+    :param bool acyclic: whether schemas only reference the schemas before them, as most real
+        specs do, rather than any schema which makes most of them mutually referencing
+    :param int copies: number of schemas copied under another name, as FastAPI does for the input
+        and output variants of models
+    """
+    rng = random.Random(seed)
+    model_names = [f"Model{i}" for i in range(schemas)]
+    enum_names = [f"Enum{i}" for i in range(max(1, schemas // 10))]
+
+    components: Dict[str, Any] = {}
+    for name in enum_names:
+        components[name] = {"type": "string", "enum": [f"{name}_value_{i}" for i in range(5)]}
+
+    for index, name in enumerate(model_names):
+        referenced = model_names[:index] if acyclic else model_names
+        properties: Dict[str, Any] = {
+            f"field_{i}": rng.choice(SCALAR_SCHEMAS) for i in range(fields)
+        }
+        properties["status"] = _ref(rng.choice(enum_names))
+        for i, ref in enumerate(rng.sample(referenced, min(ref_reuse, len(referenced)))):
+            properties[f"ref_{i}"] = (
+                _ref(ref) if i % 2 == 0 else {"type": "array", "items": _ref(ref)}
+            )
+        if union_fan_out and referenced:
+            properties["union"] = {
+                "anyOf": [
+                    _ref(n) for n in rng.sample(referenced, min(union_fan_out, len(referenced)))
+                ]
+            }
+        if depth:
+            properties["inline"] = _nested_object(depth, rng)
+
+        components[name] = {
+            "type": "object",
+            "properties": properties,
+            "required": [f"field_{i}" for i in range(fields // 2)],
+        }
+
+    for name in model_names[:copies]:
+        components[f"{name}Output"] = copy.deepcopy(components[name])
+
+    methods = ["get", "post", "put", "delete"]
+    paths: Dict[str, Any] = {}
+    for i in range(operations):
+        path = paths.setdefault(f"/api/resource_{i // len(methods)}/{{resource_id}}", {})
+        method = methods[i % len(methods)]
+        model = rng.choice(model_names)
+        operation: Dict[str, Any] = {
+            "operationId": f"{method}_resource_{i}",
+            "tags": [f"tag_{i % 10}"],
+            "description": f"Operation {i}",
+            "parameters": [
+                {
+                    "name": "resource_id",
+                    "in": "path",
+                    "required": True,
+                    "schema": SCALAR_SCHEMAS[5],
+                },
+                {"name": "limit", "in": "query", "required": False, "schema": {"type": "integer"}},
+                {
+                    "name": "status",
+                    "in": "query",
+                    "required": False,
+                    "schema": _ref(rng.choice(enum_names)),
+                },
+                {
+                    "name": "X-Request-Id",
+                    "in": "header",
+                    "required": False,
+                    "schema": {"type": "string"},
+                },
+            ],
+            "responses": {
+                "200": {
+                    "description": "OK",
+                    "content": {
+                        "application/json": {
+                            "schema": (
+                                {"type": "array", "items": _ref(model)} if i % 3 else _ref(model)
+                            )
+                        }
+                    },
+                },
+                "404": {"description": "Not found"},
+            },
+        }
+        if method in ("post", "put"):
+            operation["requestBody"] = {
+                "content": {"application/json": {"schema": _ref(rng.choice(model_names))}}
+            }
+        path[method] = operation
+
+    return {
+        "openapi": "3.0.2",
+        "info": {"title": "Synthetic API", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": components},
+    }
@@ -0,0 +1,72 @@
+import argparse
+import json
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+# Options holding paths, which are relative to the manifest
+PATH_OPTIONS = ["open_api", "outdir", "cache_dir"]
+
+
+def entry_to_argv(entry: Dict[str, Any], base_path: Path) -> List[str]:
+    """
+    Convert a manifest entry, whose keys are the CLI options in snake case, to CLI arguments
+    """
+    argv = []
+    for key, value in entry.items():
+        if key in PATH_OPTIONS:
+            value = str(base_path / value)
+
+        flag = f"--{key.replace('_', '-')}"
+        if value is True:
+            argv.append(flag)
+        elif isinstance(value, list):
+            argv += [flag, *[str(v) for v in value]]
+        elif value is not False and value is not None:
+            argv += [flag, str(value)]
+
+    return argv
+
+
+def load_manifest(path: Path) -> List[List[str]]:
+    """
+    Load the clients of a batch manifest as CLI arguments.
+
+    The manifest is a JSON file listing the options of each client, e.g.:
+
+        {
+            "clients": [
+                {
+                    "open_api": "specs/foo.json",
+                    "package_name": "foo",
+                    "project_name": "foo",
+                    "outdir": "clients/foo",
+                    "group_by_tags": true
+                }
+            ]
+        }
+
+    Paths are relative to the manifest.
+    """
+    with open(path, "r") as f:
+        manifest = json.load(f)
+
+    return [entry_to_argv(entry, path.parent) for entry in manifest["clients"]]
+
+
+def format_summary(
+    clients: List[argparse.Namespace], results: List[Tuple[List[Path], float]]
+) -> str:
+    """
+    Format a table of the generation time and updated files of each client
+    """
+    rows = [("client", "time (s)", "updated files")]
+    for args, (changed, duration) in zip(clients, results):
+        rows.append((args.project_name or args.package_name, f"{duration:.2f}", str(len(changed))))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join([row[0].ljust(widths[0]), *[c.rjust(w) for c, w in zip(row[1:], widths[1:])]])
+        for row in rows
+    )
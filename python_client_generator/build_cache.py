@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .utils import collect_refs, dereference
+
+
+dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+CACHE_FILE_NAME = "build-cache.json"
+
+
+def hash_json(obj: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def hash_package(path: Path) -> str:
+    """
+    Hash of the modules of a package, so that editing or deleting any of them changes it.
+    """
+    return hash_json({p.name: hash_file(p) for p in sorted(path.glob("*.py"))})
+
+
+def generator_fingerprint() -> str:
+    """
+    Hash of the generator's own sources and templates, so that upgrading it invalidates caches.
+    """
+    files = sorted(p for p in dir_path.rglob("*") if p.is_file() and p.suffix != ".pyc")
+    return hash_json({str(p.relative_to(dir_path)): hash_file(p) for p in files})
+
+
+def get_fingerprints(
+    swagger: Dict[str, Any],
+    path: Path,
+    package_path: Path,
+    project_name: str,
+    group_by_tags: bool,
+    sync: bool,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+    layout: str = "single",
+) -> Dict[Path, str]:
+    """
+    Fingerprint the inputs of each generated file.
+
+    Files only depend on the parts of the spec they are rendered from: `apis.py`, for instance,
+    depends on the paths and on the schemas they reference but not on any other schema. With the
+    modular `layout`, the apis and models subpackages are fingerprinted by their `__init__.py`
+    (see `BuildCache`).
+    """
+    generator = generator_fingerprint()
+    models = [pydantic_v2, model_backend]
+    version = swagger["info"]["version"]
+    schemas = swagger["components"]["schemas"]
+    paths = swagger["paths"]
+    modular = layout == "modular"
+    return {
+        path / "pyproject.toml": hash_json([generator, version, project_name, models]),
+        package_path / "__init__.py": hash_json([generator, layout]),
+        package_path / "base_client.py": hash_json([generator, sync, models]),
+        package_path
+        / ("models/__init__.py" if modular else "models.py"): hash_json(
+            [generator, schemas, models, layout]
+        ),
+        package_path
+        / ("apis/__init__.py" if modular else "apis.py"): hash_json(
+            [
+                generator,
+                group_by_tags,
+                sync,
+                models,
+                layout,
+                paths,
+                {r: dereference(swagger, r) for r in sorted(collect_refs(paths, swagger))},
+            ]
+        ),
+    }
+
+
+class BuildCache:
+    """
+    Record of the fingerprints of the inputs each generated file was last rendered from,
+    along with the hash of the file contents so that edited or deleted files are rendered
+    again.
+
+    The `__init__.py` of each of the `packages`, which are generated as a whole, stands for all
+    of their modules: the hash of its contents is that of every module of the package.
+    """
+
+    def __init__(self, cache_dir: Path, packages: Iterable[Path] = ()) -> None:
+        self.path = cache_dir / CACHE_FILE_NAME
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.packages = {p / "__init__.py" for p in packages}
+
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+
+    def _key(self, out_file: Path) -> str:
+        return Path(os.path.relpath(out_file, self.path.parent)).as_posix()
+
+    def _hash_contents(self, out_file: Path) -> str:
+        if out_file in self.packages:
+            return hash_package(out_file.parent)
+        return hash_file(out_file)
+
+    def is_fresh(self, out_file: Path, fingerprint: str) -> bool:
+        entry: Optional[Dict[str, str]] = self.entries.get(self._key(out_file))
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and out_file.exists()
+            and self._hash_contents(out_file) == entry["content"]
+        )
+
+    def is_recorded(self, out_file: Path) -> bool:
+        return self._key(out_file) in self.entries
+
+    def forget(self, out_files: Iterable[Path]) -> None:
+        for out_file in out_files:
+            self.entries.pop(self._key(out_file), None)
+
+    def record(self, out_files: Iterable[Path], fingerprints: Dict[Path, str]) -> None:
+        for out_file in out_files:
+            self.entries[self._key(out_file)] = {
+                "fingerprint": fingerprints[out_file],
+                "content": self._hash_contents(out_file),
+            }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
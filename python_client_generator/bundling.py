@@ -0,0 +1,220 @@
+import json
+import os
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from .exceptions import UnsupportedOpenAPISpec
+from .utils import lookup_by_ref_parts, split_ref
+
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+# Section of the components the `$ref`s found under a key point to, e.g. a `$ref` under
+# `requestBody` points to a request body. Everything below a schema is a schema.
+SECTIONS = {
+    "schema": "schemas",
+    "schemas": "schemas",
+    "parameters": "parameters",
+    "requestBody": "requestBodies",
+    "requestBodies": "requestBodies",
+    "responses": "responses",
+    "headers": "headers",
+    "examples": "examples",
+    "links": "links",
+    "callbacks": "callbacks",
+    "securitySchemes": "securitySchemes",
+}
+
+
+if yaml is not None:
+    _BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    class _YAMLLoader(_BaseLoader):  # type: ignore[misc,valid-type]
+        """
+        Safe loader keeping timestamps as strings, as JSON documents do
+        """
+
+    _YAMLLoader.yaml_implicit_resolvers = {
+        key: [(tag, regexp) for tag, regexp in resolvers if tag != "tag:yaml.org,2002:timestamp"]
+        for key, resolvers in _BaseLoader.yaml_implicit_resolvers.items()
+    }
+
+
+def load_document(path: Path) -> Any:
+    """
+    Parse a JSON document or, if PyYAML is installed, a YAML one
+    """
+    with open(path, "r") as f:
+        if path.suffix not in YAML_SUFFIXES:
+            return json.load(f)
+        if yaml is None:
+            raise ImportError(
+                f"PyYAML is required to load {path}, install python-client-generator[yaml]"
+            )
+        return yaml.load(f, Loader=_YAMLLoader)
+
+
+class DocumentCache:
+    """
+    Parsed documents by absolute path, reparsed when their modification time changes.
+
+    Split specs reference the same few files from many places, and the specs of a batch often
+    share them, so each file is only parsed once per process.
+    """
+
+    def __init__(self) -> None:
+        self._documents: Dict[Path, Tuple[int, Any]] = {}
+
+    def load(self, path: Path) -> Any:
+        path = path.resolve()
+        mtime = path.stat().st_mtime_ns
+        cached = self._documents.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load_document(path))
+            self._documents[path] = cached
+        return cached[1]
+
+
+document_cache = DocumentCache()
+
+
+def _has_external_refs(node: Any) -> bool:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#"):
+                return True
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return False
+
+
+class RefBundler:
+    """
+    Copy the targets of the `$ref`s of an OpenAPI document to other files into the document.
+
+    Targets are added to the section of the components their `$ref`s point to, named after the
+    last token of their JSON pointer (or their file, when they are whole files) without clashing
+    with other components, and `$ref`s to them become local. Their own `$ref`s, relative to their
+    file, are bundled in turn. Targets which can't be components, such as path items, are inlined.
+    """
+
+    def __init__(self, swagger: Dict[str, Any], path: Path, cache: DocumentCache) -> None:
+        self.swagger = swagger
+        self.path = Path(os.path.abspath(path))
+        self.cache = cache
+        self.taken: Dict[str, Set[str]] = {
+            section: set(entries) for section, entries in swagger.get("components", {}).items()
+        }
+        # (File, `$ref`, section) of each target -> name of its component
+        self._names: Dict[Tuple[Path, str, str], str] = {}
+        self._pending: Deque[Tuple[Path, str, str, str]] = deque()
+        self.bundled: Dict[str, Dict[str, Any]] = {}
+        # Absolute paths of the files referenced from each file, and the documents of the files,
+        # so that paths are only normalized and files checked for modifications once
+        self._paths: Dict[Tuple[Path, str], Path] = {}
+        self._documents: Dict[Path, Any] = {}
+
+    def _get_target_path(self, ref: str, path: Path) -> Path:
+        file = ref.partition("#")[0]
+        if not file:
+            return path
+        if (path, file) not in self._paths:
+            if "://" in file:
+                raise UnsupportedOpenAPISpec(f"Remote $ref {ref!r} is not supported")
+            self._paths[path, file] = Path(os.path.normpath(path.parent / unquote(file)))
+        return self._paths[path, file]
+
+    def _lookup(self, ref: str, path: Path) -> Any:
+        try:
+            if path not in self._documents:
+                self._documents[path] = self.cache.load(path)
+            return lookup_by_ref_parts(self._documents[path], split_ref(ref))
+        except OSError as e:
+            raise UnsupportedOpenAPISpec(f"Can't load $ref {ref!r}: {e}")
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise UnsupportedOpenAPISpec(f"Unresolvable $ref {ref!r} in {path}")
+
+    def _add_component(self, ref: str, path: Path, section: str) -> str:
+        """
+        Name of the component of the target of a `$ref` to another file
+        """
+        key = (path, ref, section)
+        if key not in self._names:
+            parts = split_ref(ref)
+            base = parts[-1] if parts else path.name.split(".")[0]
+            taken = self.taken.setdefault(section, set())
+            name, i = base, 2
+            while name in taken:
+                name, i = f"{base}{i}", i + 1
+            taken.add(name)
+            self._names[key] = name
+            self._pending.append((path, ref, section, name))
+        return self._names[key]
+
+    def _bundle_node(self, node: Any, path: Path, section: Optional[str]) -> Any:
+        if isinstance(node, list):
+            return [self._bundle_node(v, path, section) for v in node]
+        if not isinstance(node, dict):
+            return node
+
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            target_path = self._get_target_path(ref, path)
+            fragment = f"#{ref.partition('#')[2]}"
+            if target_path == self.path:
+                return {**node, "$ref": fragment}
+            if section is None:
+                return self._bundle_node(self._lookup(fragment, target_path), target_path, None)
+            name = self._add_component(fragment, target_path, section)
+            return {**node, "$ref": f"#/components/{section}/{name}"}
+
+        return {
+            k: self._bundle_node(
+                v, path, "schemas" if section == "schemas" else SECTIONS.get(k, section)
+            )
+            for k, v in node.items()
+        }
+
+    def bundle(self) -> Dict[str, Any]:
+        swagger: Dict[str, Any] = self._bundle_node(self.swagger, self.path, None)
+
+        # Targets are bundled breadth first, adding the targets they reference in turn
+        while self._pending:
+            path, ref, section, name = self._pending.popleft()
+            self.bundled.setdefault(section, {})[name] = self._bundle_node(
+                self._lookup(ref, path), path, section
+            )
+
+        components = dict(swagger.get("components", {}))
+        for section, entries in self.bundled.items():
+            components[section] = {**components.get(section, {}), **entries}
+        return {**swagger, "components": components}
+
+
+def bundle_external_refs(
+    swagger: Dict[str, Any], path: Path, cache: DocumentCache = document_cache
+) -> Dict[str, Any]:
+    """
+    Bundle the files the `$ref`s of an OpenAPI document at `path` reference, relative to the file
+    they are in (e.g. `common.yaml#/components/schemas/Money`), into its components (see
+    `RefBundler`), so that the rest of the generation only deals with local `$ref`s.
+
+    Referenced files are parsed once, through `cache`. Returns a new document, or `swagger`
+    itself if it has no `$ref` to another file.
+    """
+    if not _has_external_refs(swagger):
+        return swagger
+    return RefBundler(swagger, path, cache).bundle()
@@ -0,0 +1,363 @@
+import json
+import re
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+
+from .utils import UNION_KEYS, sanitize_name, strongly_connected_components
+
+
+SCHEMAS_PREFIX = "#/components/schemas/"
+
+# Keywords which don't change what a schema validates, nor the code generated from it
+ANNOTATIONS = ("description", "example", "examples")
+
+
+@lru_cache(maxsize=None)
+def _to_pascal_case(name: str) -> str:
+    return "".join(w[:1].upper() + w[1:] for w in re.split(r"[^A-Za-z0-9]+", name))
+
+
+def _is_named_type(schema: Dict[str, Any]) -> bool:
+    """
+    Whether an inline schema would be generated as an enum or a model if it was named. Enums of a
+    single value are left inline as they resolve to literals.
+    """
+    if "$ref" in schema or "type" not in schema:
+        return False
+    if "enum" in schema:
+        return len(schema["enum"]) > 1
+    properties = schema.get("properties")
+    return (
+        schema["type"] == "object"
+        and isinstance(properties, dict)
+        and len(properties) > 0
+        and not any(p.get("format") == "binary" for p in properties.values())
+    )
+
+
+def _is_generated(schema: Dict[str, Any]) -> bool:
+    """
+    Whether a schema of the components is generated as an enum or a model
+    """
+    if "$ref" in schema or "type" not in schema:
+        return False
+    return "enum" in schema or (
+        schema["type"] == "object" and len(schema.get("properties", {})) > 0
+    )
+
+
+def _get_local_refs(node: Any) -> Set[str]:
+    """
+    Names of the schemas a node references directly, without following the references
+    """
+    refs: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref.startswith(SCHEMAS_PREFIX):
+                refs.add(ref.replace(SCHEMAS_PREFIX, "", 1))
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+def _get_discriminated_refs(node: Any) -> Set[str]:
+    """
+    Names of the schemas which are members or mapping targets of the discriminated unions of a
+    node, as only their tag tells them apart
+    """
+    refs: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            discriminator = current.get("discriminator")
+            if isinstance(discriminator, dict):
+                for union_key in UNION_KEYS:
+                    for member in current.get(union_key, []):
+                        if isinstance(member, dict) and isinstance(member.get("$ref"), str):
+                            refs.add(member["$ref"].replace(SCHEMAS_PREFIX, "", 1))
+                for target in discriminator.get("mapping", {}).values():
+                    refs.add(target.replace(SCHEMAS_PREFIX, "", 1))
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+class SchemaDeduplicator:
+    """
+    Hash-consing of the schemas of a (non-dereferenced) OpenAPI document.
+
+    Schemas are canonicalized bottom-up: the inline object and enum schemas nested in a schema are
+    replaced by a `$ref` to the named schema of their structure before the key of the schema is
+    computed, so that keys stay shallow and two schemas get the same key when they only differ by
+    their title, their annotations or the names of the structurally identical schemas they
+    reference. Each structure then gets a single named schema: the first schema of the
+    components with that structure or, for inline schemas only, a new schema named after where it
+    was first found.
+
+    The members and mapping targets of discriminated unions only share a structure with schemas of
+    the same name, as their tags default to their names and merging them would merge their tags.
+    """
+
+    def __init__(self, swagger: Dict[str, Any]) -> None:
+        self.swagger = swagger
+        self.schemas: Dict[str, Any] = swagger.get("components", {}).get("schemas", {})
+        self._indexes = {n: i for i, n in enumerate(self.schemas)}
+        self.taken = {sanitize_name(k) for k in self.schemas} | {
+            sanitize_name(s["title"]) for s in self.schemas.values() if "title" in s
+        }
+        # Canonical key -> structure index
+        self._structures: Dict[str, int] = {}
+        # Names of the schemas of each structure, in the order they were found
+        self._members: List[List[str]] = []
+        # Schema name -> structure index
+        self._structure_of: Dict[str, int] = {}
+        # Canonicalized schemas of the components and new schemas of inline ones, by name
+        self._canonical: Dict[str, Any] = {}
+        self._inline_names: List[str] = []
+        self._discriminated = _get_discriminated_refs(swagger)
+
+    def _key(self, schema: Any, root: bool = True) -> Any:
+        if not isinstance(schema, dict):
+            return schema
+        if "$ref" in schema:
+            # References to schemas already registered are keyed by their structure
+            ref = schema["$ref"]
+            name = ref.replace(SCHEMAS_PREFIX, "", 1)
+            if ref.startswith(SCHEMAS_PREFIX) and name in self._structure_of:
+                return {"$ref": self._structure_of[name]}
+            return {"$ref": ref}
+
+        key: Dict[str, Any] = {}
+        for k, v in schema.items():
+            # Nested titles are kept as they name the type of array items and union members
+            if k in ANNOTATIONS or (root and k == "title"):
+                continue
+            elif k == "properties" and isinstance(v, dict):
+                key[k] = {p: self._key(s, False) for p, s in v.items()}
+            elif k in ("items", "additionalProperties", "not"):
+                key[k] = self._key(v, False)
+            elif k in UNION_KEYS and isinstance(v, list):
+                key[k] = [self._key(s, False) for s in v]
+            else:
+                key[k] = v
+        return key
+
+    def _register(
+        self, schema: Dict[str, Any], name: str, inline: bool, shared: bool = True
+    ) -> str:
+        """
+        Add a schema to the structure of its key, returns the name it's referenced by. Schemas
+        which aren't `shared` are keyed by their name as well.
+        """
+        key = json.dumps(self._key(schema), sort_keys=True)
+        if not shared:
+            key = json.dumps([name, key])
+        index = self._structures.setdefault(key, len(self._structures))
+        if index == len(self._members):
+            self._members.append([])
+
+        if inline:
+            if self._members[index]:
+                return self._members[index][0]
+
+            base, i = sanitize_name(name) or "Schema", 2
+            name = base
+            while name in self.taken:
+                name, i = f"{base}{i}", i + 1
+            self.taken.add(name)
+            self._canonical[name] = {
+                "title": name,
+                **{k: v for k, v in schema.items() if k != "title"},
+            }
+            self._inline_names.append(name)
+
+        self._structure_of[name] = index
+        self._members[index].append(name)
+        return name
+
+    def _canonicalize(self, schema: Any, name: str) -> Any:
+        """
+        Copy of a schema whose nested inline object and enum schemas are named
+        """
+        if not isinstance(schema, dict) or "$ref" in schema:
+            return schema
+
+        result = dict(schema)
+        if isinstance(schema.get("properties"), dict):
+            result["properties"] = {
+                p: self.hoist(s, f"{name}{_to_pascal_case(p)}")
+                for p, s in schema["properties"].items()
+            }
+        if "items" in schema:
+            result["items"] = self.hoist(schema["items"], f"{name}Item")
+        shared = "discriminator" not in schema
+        for union_key in UNION_KEYS:
+            if isinstance(schema.get(union_key), list):
+                result[union_key] = [
+                    self.hoist(s, f"{name}{union_key[0].upper()}{union_key[1:]}{i}", shared)
+                    for i, s in enumerate(schema[union_key], 1)
+                ]
+        return result
+
+    def hoist(self, schema: Any, name: str, shared: bool = True) -> Any:
+        """
+        Replace an inline object or enum schema by a `$ref` to the named schema of its structure,
+        `name` (or its title) naming it if it's the first of its structure (see `_register`)
+        """
+        if not isinstance(schema, dict) or "$ref" in schema:
+            return schema
+
+        name = schema.get("title", name)
+        schema = self._canonicalize(schema, name)
+        if not _is_named_type(schema):
+            return schema
+        return {"$ref": f"{SCHEMAS_PREFIX}{self._register(schema, name, True, shared)}"}
+
+    def _hoist_media_types(self, content: Any, name: str) -> Any:
+        if not isinstance(content, dict) or "application/json" not in content:
+            return content
+
+        media_type = content["application/json"]
+        if "schema" not in media_type:
+            return content
+        return {
+            **content,
+            "application/json": {**media_type, "schema": self.hoist(media_type["schema"], name)},
+        }
+
+    def _hoist_request_body(self, request_body: Any, name: str) -> Any:
+        if not isinstance(request_body, dict) or "content" not in request_body:
+            return request_body
+        return {
+            **request_body,
+            "content": self._hoist_media_types(request_body["content"], f"{name}Request"),
+        }
+
+    def _hoist_response(self, response: Any, name: str) -> Any:
+        if not isinstance(response, dict) or "content" not in response:
+            return response
+        return {
+            **response,
+            "content": self._hoist_media_types(response["content"], f"{name}Response"),
+        }
+
+    def _canonicalize_components(self) -> None:
+        names = list(self.schemas)
+        edges = [
+            [
+                self._indexes[r]
+                for r in sorted(_get_local_refs(self.schemas[n]))
+                if r in self._indexes
+            ]
+            for n in names
+        ]
+        # Referenced schemas first, so that the keys of the schemas referencing them are
+        # computed from their structure rather than from their names
+        for component in strongly_connected_components(edges):
+            for i in component:
+                schema = self.schemas[names[i]]
+                if isinstance(schema, dict):
+                    schema = self._canonicalize(schema, schema.get("title", names[i]))
+                self._canonical[names[i]] = schema
+                if isinstance(schema, dict) and _is_generated(schema):
+                    shared = names[i] not in self._discriminated
+                    self._register(schema, names[i], inline=False, shared=shared)
+
+    def _get_representative(self, name: str) -> Optional[str]:
+        """
+        Name of the schema generated for the structure of a schema, components coming first
+        """
+        if name not in self._structure_of:
+            return None
+        members = self._members[self._structure_of[name]]
+        components = [m for m in members if m in self._indexes]
+        return min(components, key=self._indexes.__getitem__) if components else members[0]
+
+    def _rewrite_refs(self, node: Any, renamed: Dict[str, str]) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith(SCHEMAS_PREFIX):
+                name = ref.replace(SCHEMAS_PREFIX, "", 1)
+                if name in renamed:
+                    return {**node, "$ref": f"{SCHEMAS_PREFIX}{renamed[name]}"}
+            return {k: self._rewrite_refs(v, renamed) for k, v in node.items()}
+        elif isinstance(node, list):
+            return [self._rewrite_refs(v, renamed) for v in node]
+        return node
+
+    def deduplicate(self) -> Dict[str, Any]:
+        self._canonicalize_components()
+
+        paths: Dict[str, Any] = {}
+        for path_name, path in self.swagger["paths"].items():
+            paths[path_name] = {}
+            for method_name, method in path.items():
+                if isinstance(method, dict) and "operationId" in method:
+                    name = _to_pascal_case(method["operationId"])
+                    method = dict(method)
+                    if "requestBody" in method:
+                        method["requestBody"] = self._hoist_request_body(
+                            method["requestBody"], name
+                        )
+                    if isinstance(method.get("responses"), dict):
+                        method["responses"] = {
+                            status: self._hoist_response(r, f"{name}{_to_pascal_case(status)}")
+                            for status, r in method["responses"].items()
+                        }
+                paths[path_name][method_name] = method
+
+        components = dict(self.swagger.get("components", {}))
+        if "requestBodies" in components:
+            components["requestBodies"] = {
+                k: self._hoist_request_body(v, _to_pascal_case(k))
+                for k, v in components["requestBodies"].items()
+            }
+        if "responses" in components:
+            components["responses"] = {
+                k: self._hoist_response(v, _to_pascal_case(k))
+                for k, v in components["responses"].items()
+            }
+
+        # Duplicated components become references to the first of their structure, so that
+        # their names remain, and new schemas are only added for structures of inline schemas
+        schemas: Dict[str, Any] = {}
+        for name in self.schemas:
+            representative = self._get_representative(name)
+            if representative is None or representative == name:
+                schemas[name] = self._canonical[name]
+            else:
+                schemas[name] = {"$ref": f"{SCHEMAS_PREFIX}{representative}"}
+        for name in self._inline_names:
+            if self._get_representative(name) == name:
+                schemas[name] = self._canonical[name]
+        components["schemas"] = schemas
+
+        swagger = {**self.swagger, "paths": paths, "components": components}
+
+        # Point the references to duplicates to the schema generated for their structure
+        renamed = {}
+        for name in self._structure_of:
+            representative = self._get_representative(name)
+            if representative is not None and representative != name:
+                renamed[name] = representative
+        return self._rewrite_refs(swagger, renamed) if renamed else swagger
+
+
+def deduplicate_schemas(swagger: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Give structurally identical object and enum schemas of a (non-dereferenced) OpenAPI document a
+    single named schema (see `SchemaDeduplicator`).
+
+    Inline object and enum schemas, nested in schemas or the roots of JSON request and response
+    bodies, are moved to the components, named after their title or where they were first found,
+    and duplicated components become `$ref`s to the first component of their structure. Returns a
+    new document, `swagger` is left untouched.
+    """
+    return SchemaDeduplicator(swagger).deduplicate()
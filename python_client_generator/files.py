@@ -0,0 +1,66 @@
+import filecmp
+import os
+
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, TextIO, Type
+from uuid import uuid4
+
+from .profiling import phase
+
+
+class AtomicWriter:
+    """
+    Write a text file through a temporary file in the same directory, which atomically replaces
+    the target on exit only if their contents differ.
+
+    Leaving identical files untouched keeps their modification time, and therefore the caches of
+    downstream tools (mypy, pytest, Docker layers, ...), valid.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.changed = False
+        self._tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        self._file: Optional[TextIO] = None
+
+    def __enter__(self) -> "AtomicWriter":
+        # Exclusive creation rather than `tempfile` so that the file mode follows the umask
+        self._file = open(self._tmp_path, "x")
+        return self
+
+    def write(self, s: str) -> None:
+        assert self._file is not None
+        with phase(f"write {self.path.name}"):
+            self._file.write(s)
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        assert self._file is not None
+        with phase(f"write {self.path.name}"):
+            self._file.close()
+
+            try:
+                if exc_type is None and not (
+                    self.path.exists() and filecmp.cmp(self._tmp_path, self.path, shallow=False)
+                ):
+                    os.replace(self._tmp_path, self.path)
+                    self.changed = True
+            finally:
+                if not self.changed:
+                    os.remove(self._tmp_path)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Atomically write a text file unless it already has the given content.
+
+    Returns whether the file was written.
+    """
+    with AtomicWriter(path) as f:
+        f.write(content)
+    return f.changed
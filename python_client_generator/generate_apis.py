@@ -1,16 +1,33 @@
-import os
+import re
 
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import chevron
+from .files import AtomicWriter
+from .generate_models import get_discriminator, get_model_names
+from .modular import get_referenced_names, to_module_name, write_package
+from .parallel import SwaggerPool, imap_chunks
+from .profiling import phase, profile_item
+from .schema_cache import schema_cache
+from .template_engine import render_template
+from .utils import (
+    get_union_key,
+    resolve_type,
+    sanitize_name,
+    serialize_to_python_code,
+    to_python_name,
+)
 
-from .utils import resolve_type, sanitize_name, serialize_to_python_code, to_python_name
 
+# Names of the query parameters and response properties of paginated endpoints
+CURSOR_PARAMS = ("cursor", "page_token", "next_token", "after")
+NEXT_CURSOR_PROPERTIES = ("next_cursor", "next_page_token", "next_token", "next")
+TOTAL_PROPERTIES = ("total", "total_count", "count")
 
-dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
-templates_path = dir_path / "templates"
+# Header of the requests with a JSON body
+JSON_CONTENT_TYPE = {"name": "Content-Type", "value": '"application/json"', "nullable": False}
 
 
 def resolve_property_type(property: Dict[str, Any]) -> str:
@@ -32,7 +49,7 @@ def resolve_property_default(property: Dict[str, Any]) -> Optional[str]:
     return "None"
 
 
-def get_return_type(responses: Dict[str, Any]) -> Optional[str]:
+def get_response_schema(responses: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     def check_if_valid_success_response(key: str) -> bool:
         if key == "default":
             return True
@@ -69,7 +86,11 @@ def get_return_type(responses: Dict[str, Any]) -> Optional[str]:
     if "application/json" not in content:
         return None
 
-    schema = successful_responses[0]["content"]["application/json"].get("schema")
+    return successful_responses[0]["content"]["application/json"].get("schema")
+
+
+def get_return_type(responses: Dict[str, Any]) -> Optional[str]:
+    schema = get_response_schema(responses)
     if schema is None:
         return None
 
@@ -79,11 +100,153 @@ def get_return_type(responses: Dict[str, Any]) -> Optional[str]:
     if schema["type"] == "array":
         return f"List[{resolve_type(schema['items'])}]"
     if schema["type"] == "object":
-        return sanitize_name(schema.get("title", "Dict[str, Any]"))
+        return sanitize_name(schema["title"]) if "title" in schema else "Dict[str, Any]"
+
+    return None
+
+
+def get_item_type(responses: Dict[str, Any]) -> Optional[str]:
+    """
+    Type of the items of array responses
+    """
+    schema = get_response_schema(responses)
+    if schema is None or schema.get("type") != "array":
+        return None
+    return resolve_type(schema["items"])
+
+
+def get_parser_item_type(responses: Dict[str, Any]) -> Optional[str]:
+    """
+    Type of the items of array responses which are a discriminated union (see
+    `get_discriminator`), annotated with its discriminator so that Pydantic parsers select the
+    member of each item from its tag rather than trying every member in turn
+    """
+    schema = get_response_schema(responses)
+    if schema is None or schema.get("type") != "array":
+        return None
+    property_name = get_discriminator(schema["items"])
+    if property_name is None:
+        return None
+    return f'Annotated[{resolve_type(schema["items"])}, Field(discriminator="{property_name}")]'
+
+
+def _get_parser_name(type_: str, suffix: str) -> str:
+    return f"_{re.sub(r'[^A-Za-z0-9]+', '_', type_).strip('_')}_{suffix}"
+
+
+def get_module_parser(
+    return_type: Optional[str],
+    pydantic_v2: bool,
+    model_backend: str,
+    parser_type: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Module-level parser of the responses of type `return_type`, built once and shared by all calls
+    rather than built on every call: a msgspec decoder for any type, a TypeAdapter (Pydantic v2)
+    or a RootParser (Pydantic v1) for types which are not models. Pydantic parsers validate
+    `parser_type` instead, if given.
+    """
+    if return_type is None:
+        return None
+
+    if model_backend == "msgspec":
+        return {
+            "name": _get_parser_name(return_type, "decoder"),
+            "factory": "msgspec.json.Decoder",
+            "type": return_type,
+        }
+    if return_type.isidentifier():
+        return None
+    if pydantic_v2:
+        return {
+            "name": _get_parser_name(return_type, "adapter"),
+            "factory": "TypeAdapter",
+            "type": parser_type or return_type,
+        }
+    return {
+        "name": _get_parser_name(return_type, "parser"),
+        "factory": "RootParser",
+        "type": parser_type or return_type,
+    }
+
+
+def get_response_parser(
+    return_type: Optional[str], pydantic_v2: bool, model_backend: str
+) -> Optional[str]:
+    """
+    Function parsing a response into `return_type`, from its content or, with Pydantic v1, from
+    its content decoded by the JSON codec of the client
+    """
+    module_parser = get_module_parser(return_type, pydantic_v2, model_backend)
+    if return_type is None:
+        return None
+    if model_backend == "msgspec":
+        return f"{module_parser['name']}.decode" if module_parser else None
+    if pydantic_v2:
+        return (
+            f"{module_parser['name']}.validate_json"
+            if module_parser
+            else f"{return_type}.model_validate_json"
+        )
+    return f"{module_parser['name'] if module_parser else return_type}.parse_obj"
+
+
+def get_pagination(method: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Offset/limit or cursor pagination of an endpoint, detected from its query parameters and the
+    envelope of its response: a model with a single array property, holding the items
+    """
+    schema = get_response_schema(method["responses"])
+    if schema is None or schema.get("type") != "object" or "title" not in schema:
+        return None
+
+    properties = schema.get("properties", {})
+    arrays = [k for k, v in properties.items() if v.get("type") == "array"]
+    if len(arrays) != 1 or not arrays[0].isidentifier():
+        return None
+
+    # Resolved as nested, like the array items of the model field, so titled items keep their name
+    item_type = resolve_type(properties[arrays[0]]["items"], depth=1)
+    pagination = {"items": arrays[0], "item_type": item_type}
+    query_params = {p["name"] for p in method.get("parameters", []) if p["in"] == "query"}
+    if {"offset", "limit"} <= query_params:
+        total = next((p for p in TOTAL_PROPERTIES if p in properties), None)
+        return {**pagination, "offset": True, "total": total}
+
+    cursor = next((p for p in CURSOR_PARAMS if p in query_params), None)
+    next_cursor = next((p for p in NEXT_CURSOR_PROPERTIES if p in properties), None)
+    if cursor and next_cursor:
+        return {**pagination, "cursor": cursor, "next_cursor": next_cursor}
 
     return None
 
 
+def get_item_parser(
+    item_type: Optional[str],
+    pydantic_v2: bool,
+    model_backend: str,
+    parser_type: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Module-level parser validating the decoded items of streamed array responses, whether they
+    are models or not, as `parser_type` if given. msgspec clients convert items with
+    `msgspec.convert` instead.
+    """
+    if item_type is None or model_backend == "msgspec":
+        return None
+    if pydantic_v2:
+        return {
+            "name": _get_parser_name(item_type, "adapter"),
+            "factory": "TypeAdapter",
+            "type": parser_type or item_type,
+        }
+    return {
+        "name": _get_parser_name(item_type, "parser"),
+        "factory": "RootParser",
+        "type": parser_type or item_type,
+    }
+
+
 def _get_request_body_params(method: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Supported media types are:
@@ -144,7 +307,27 @@ def get_function_args(method: Dict[str, Any]) -> List[Dict[str, Any]]:
     ]
 
 
-def get_params_by_type(method: Dict[str, Any], type_: str) -> List[Dict[str, str]]:
+def get_param_value(python_name: str, schema: Dict[str, Any]) -> str:
+    """
+    Expression serializing the argument of a parameter into a request, picked from its schema
+    rather than checking the type of the value on every call
+    """
+    union_key = get_union_key(schema)
+    if union_key and len(schema[union_key]) == 1:
+        schema = schema[union_key][0]
+
+    if "enum" in schema:
+        # Enum members, or their values when the parameter is typed by its base type
+        return f'getattr({python_name}, "value", {python_name})'
+    elif schema.get("format") == "uuid":
+        return f"str({python_name})"
+    elif schema.get("type") in ("string", "integer", "number", "boolean", "array"):
+        return python_name
+    else:
+        return f"self._serialize_param({python_name})"
+
+
+def get_params_by_type(method: Dict[str, Any], type_: str) -> List[Dict[str, Any]]:
     """
     :param str type_: `query` or `header`
     """
@@ -153,6 +336,9 @@ def get_params_by_type(method: Dict[str, Any], type_: str) -> List[Dict[str, str
         {
             "name": p["name"],
             "python_name": to_python_name(p["name"]),
+            "value": get_param_value(to_python_name(p["name"]), p["schema"]),
+            # Optional arguments are only sent when set
+            "nullable": p.get("required") is False,
         }
         for p in params
         if p["in"] == type_
@@ -169,7 +355,7 @@ def has_json_body(method: Dict[str, Any]) -> bool:
 
 def get_multipart_properties(
     method: Dict[str, Any]
-) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Parse method for any multipart form upload file and data properties.
     """
@@ -183,11 +369,34 @@ def get_multipart_properties(
         if v.get("type") == "string" and v.get("format") == "binary":
             files.append({"name": k})
         else:
-            data.append({"name": k})
+            data.append(
+                {
+                    "name": k,
+                    "python_name": k,
+                    "value": get_param_value(k, v),
+                    "nullable": k not in schema.get("required", []),
+                }
+            )
 
     return (files, data)
 
 
+def get_request_dict(params: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Entries of the dict of query parameters, headers or form data built by an endpoint: those
+    always sent, and the optional ones only added when set
+    """
+    if not params:
+        return None
+
+    entries = [p for p in params if not p["nullable"]]
+    return {
+        "entries": entries,
+        "has_entries": len(entries) > 0,
+        "optional": [p for p in params if p["nullable"]],
+    }
+
+
 @dataclass
 class TaggedEndpointDefinition:
     path_name: str
@@ -196,7 +405,10 @@ class TaggedEndpointDefinition:
 
 
 def get_endpoints(
-    endpoint_defs: Iterable[TaggedEndpointDefinition], sync: bool
+    endpoint_defs: Iterable[TaggedEndpointDefinition],
+    sync: bool,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
 ) -> List[Dict[str, Any]]:
     endpoints: List[Dict[str, Any]] = []
 
@@ -209,14 +421,35 @@ def get_endpoints(
         e["args"] = get_function_args(e_def.method)
         e["path"] = f'f"{e_def.path_name}"' if "{" in e_def.path_name else f'"{e_def.path_name}"'
         e["return_type"] = get_return_type(e_def.method["responses"])
+        e["parse_response"] = get_response_parser(e["return_type"], pydantic_v2, model_backend)
+        e["item_type"] = get_item_type(e_def.method["responses"])
+        parser_item_type = get_parser_item_type(e_def.method["responses"])
+        e["module_parser"] = get_module_parser(
+            e["return_type"],
+            pydantic_v2,
+            model_backend,
+            f"List[{parser_item_type}]" if parser_item_type else None,
+        )
+        e["item_parser"] = get_item_parser(
+            e["item_type"], pydantic_v2, model_backend, parser_item_type
+        )
+        e["parse_item"] = (
+            f"{e['item_parser']['name']}.{'validate_python' if pydantic_v2 else 'parse_obj'}"
+            if e["item_parser"]
+            else None
+        )
+        e["stream"] = False
+        e["pagination"] = get_pagination(e_def.method)
+        e["msgspec"] = model_backend == "msgspec"
+        e["json_codec"] = not pydantic_v2 and model_backend != "msgspec"
         e["docs"] = e_def.method.get("description", "").replace("\n", "\n        ")
-        e["query_params"] = get_params_by_type(e_def.method, "query")
-        e["has_query_params"] = len(e["query_params"]) > 0
-        e["header_params"] = get_params_by_type(e_def.method, "header")
-        e["has_header_params"] = len(e["header_params"]) > 0
         e["has_json_body"] = has_json_body(e_def.method)
-        e["multipart_data"] = data
-        e["has_multipart_data"] = len(data) > 0
+        e["query_dict"] = get_request_dict(get_params_by_type(e_def.method, "query"))
+        e["headers_dict"] = get_request_dict(
+            ([JSON_CONTENT_TYPE] if e["has_json_body"] else [])
+            + get_params_by_type(e_def.method, "header")
+        )
+        e["data_dict"] = get_request_dict(data)
         e["multipart_files"] = files
         e["has_multipart_files"] = len(files) > 0
 
@@ -225,12 +458,53 @@ def get_endpoints(
     return endpoints
 
 
-def get_apis(swagger: Dict[str, Any], group_by_tags: bool, sync: bool) -> List[Dict[str, Any]]:
-    paths = swagger["paths"]
+def get_streaming_endpoint(endpoint: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Companion `iter_<operation>` endpoint of an array endpoint, yielding the items of the response
+    one at a time as it is streamed
+    """
+    docs = f"Streams the items of the response of `{endpoint['name']}` one at a time"
+    return {
+        **endpoint,
+        "name": f"iter_{endpoint['name']}",
+        "docs": f"{docs}\n\n        {endpoint['docs']}" if endpoint["docs"] else docs,
+        "stream": True,
+    }
+
+
+def get_paginator(endpoint: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Companion `paginate_<operation>` endpoint of a paginated endpoint, yielding the items of all
+    its pages
+    """
+    pagination = endpoint["pagination"]
+    page_param = "offset" if pagination.get("offset") else pagination["cursor"]
+    return {
+        **pagination,
+        "name": f"paginate_{endpoint['name']}",
+        "endpoint": endpoint["name"],
+        "async": endpoint["async"],
+        "args": endpoint["args"],
+        "call_args": [a["name"] for a in endpoint["args"] if a["name"] != page_param],
+        "return_type": endpoint["return_type"],
+    }
 
-    # Group endpoints by tags
+
+def has_discriminated_items(endpoint_defs: Iterable[TaggedEndpointDefinition]) -> bool:
+    """
+    Whether Pydantic parsers of the endpoints annotate their items (see `get_parser_item_type`)
+    """
+    return any(get_parser_item_type(e_def.method["responses"]) for e_def in endpoint_defs)
+
+
+def get_api_groups(
+    swagger: Dict[str, Any], group_by_tags: bool
+) -> Dict[Optional[str], List[TaggedEndpointDefinition]]:
+    """
+    Group endpoints by tags, or all in a single untagged group
+    """
     api_groups: Dict[Optional[str], List[TaggedEndpointDefinition]] = {}
-    for path_name, path in paths.items():
+    for path_name, path in swagger["paths"].items():
         for method_name, method in path.items():
             tags = method.get("tags", []) if group_by_tags else [None]
             for tag in tags:
@@ -238,26 +512,214 @@ def get_apis(swagger: Dict[str, Any], group_by_tags: bool, sync: bool) -> List[D
                     api_groups[tag] = []
                 api_groups[tag].append(TaggedEndpointDefinition(path_name, method_name, method))
 
-    # Create groups of "apis":
-    return [
-        {
-            "class_name": f"{tag.capitalize() if tag else ''}Api",
-            "tag": tag,
-            "async": not sync,
-            "endpoints": get_endpoints(endpoint_defs, sync),
-        }
-        for tag, endpoint_defs in api_groups.items()
-    ]
+    return api_groups
+
+
+def get_api(tag: Optional[str], sync: bool) -> Dict[str, Any]:
+    return {
+        "class_name": f"{tag.capitalize() if tag else ''}Api",
+        "attribute_name": to_python_name(re.sub(r"\W+", "_", tag).strip("_").lower())
+        if tag
+        else None,
+        "tag": tag,
+        "async": not sync,
+    }
 
 
-def generate_apis(swagger: Dict[str, Any], out_file: Path, group_by_tags: bool, sync: bool) -> None:
+def _render_endpoints(
+    swagger: Dict[str, Any],
+    endpoint_keys: List[Tuple[str, str]],
+    sync: bool,
+    pydantic_v2: bool,
+    model_backend: str,
+) -> List[Tuple[str, List[Dict[str, str]], List[str]]]:
+    """
+    Render the endpoints given by their path and method names, with the streaming companions of
+    array endpoints and the paginators of paginated endpoints, along with the module-level
+    parsers of their responses and the types they use
+    """
+    rendered = []
+    with schema_cache():
+        for path_name, method_name in endpoint_keys:
+            e_def = TaggedEndpointDefinition(
+                path_name, method_name, swagger["paths"][path_name][method_name]
+            )
+            with profile_item("operation", e_def.method["operationId"]):
+                with phase("get_endpoints"):
+                    (endpoint,) = get_endpoints([e_def], sync, pydantic_v2, model_backend)
+                text = render_template("apis_endpoint.py.mustache", endpoint)
+                parsers = [endpoint["module_parser"]]
+                if endpoint["item_type"]:
+                    text += render_template(
+                        "apis_endpoint.py.mustache", get_streaming_endpoint(endpoint)
+                    )
+                    parsers.append(endpoint["item_parser"])
+                if endpoint["pagination"]:
+                    text += render_template("apis_paginator.py.mustache", get_paginator(endpoint))
+                types = [a["type"] for a in endpoint["args"]]
+                types += [t for t in (endpoint["return_type"], endpoint["item_type"]) if t]
+                rendered.append((text, [p for p in parsers if p], types))
+    return rendered
+
+
+def generate_apis(
+    swagger: Dict[str, Any],
+    out_file: Path,
+    group_by_tags: bool,
+    sync: bool,
+    pool: Optional[SwaggerPool] = None,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+) -> bool:
     """
     Generate functions for each path in the dereferenced OpenAPI input file.
+
+    Endpoints are rendered, in chunks in the workers of `pool` if given, and written to the file
+    one after the other. Returns whether `out_file` changed.
+    """
+    api_groups = get_api_groups(swagger, group_by_tags)
+    msgspec = model_backend == "msgspec"
+    pydantic_v2 = pydantic_v2 and not msgspec
+
+    # Render the endpoints of all apis at once so that they are evenly distributed among workers
+    endpoint_keys = [(e.path_name, e.method_name) for defs in api_groups.values() for e in defs]
+
+    # Parsers of the responses which need one are defined once, at the end of the module
+    module_parsers: Dict[str, Dict[str, str]] = {}
+
+    # Stream endpoints to the file as they are rendered, holding a single one (or a few chunks,
+    # with a pool) in memory at a time
+    with schema_cache(), AtomicWriter(out_file) as f:
+        endpoints = imap_chunks(
+            pool,
+            swagger,
+            partial(
+                _render_endpoints, sync=sync, pydantic_v2=pydantic_v2, model_backend=model_backend
+            ),
+            endpoint_keys,
+        )
+
+        options = {
+            "pydantic_v2": pydantic_v2,
+            "msgspec": msgspec,
+            "json_codec": not pydantic_v2 and not msgspec,
+        }
+        discriminated_unions = not msgspec and any(
+            has_discriminated_items(defs) for defs in api_groups.values()
+        )
+        f.write(
+            render_template(
+                "apis.py.mustache", {"discriminated_unions": discriminated_unions, **options}
+            )
+        )
+        apis = []
+        for tag, endpoint_defs in api_groups.items():
+            apis.append(get_api(tag, sync))
+            f.write(render_template("apis_class.py.mustache", apis[-1]))
+            for _ in endpoint_defs:
+                endpoint, parsers, _ = next(endpoints)
+                f.write(endpoint)
+                for module_parser in parsers:
+                    module_parsers.setdefault(module_parser["name"], module_parser)
+            f.write("\n")
+
+        if group_by_tags:
+            f.write(
+                render_template("apis_root_client.py.mustache", {"apis": apis, "async": not sync})
+            )
+
+        if module_parsers:
+            f.write(
+                render_template(
+                    "apis_footer.py.mustache",
+                    {"parsers": list(module_parsers.values()), **options},
+                )
+            )
+
+    return f.changed
+
+
+def generate_api_modules(
+    swagger: Dict[str, Any],
+    out_dir: Path,
+    group_by_tags: bool,
+    sync: bool,
+    pool: Optional[SwaggerPool] = None,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+) -> bool:
+    """
+    Generate the apis like `generate_apis`, but in a module each within the `out_dir`
+    subpackage, which imports them on first access. Modules only import the models their
+    endpoints use, through the `models` subpackage which in turn only imports their modules.
+    Returns whether any file changed.
     """
-    apis = get_apis(swagger, group_by_tags, sync)
+    api_groups = get_api_groups(swagger, group_by_tags)
+    msgspec = model_backend == "msgspec"
+    pydantic_v2 = pydantic_v2 and not msgspec
+    model_names = get_model_names(swagger["components"]["schemas"])
+
+    endpoint_keys = [(e.path_name, e.method_name) for defs in api_groups.values() for e in defs]
+    options = {
+        "pydantic_v2": pydantic_v2,
+        "msgspec": msgspec,
+        "json_codec": not pydantic_v2 and not msgspec,
+        "modular": True,
+    }
 
-    with open(templates_path / "apis.py.mustache", "r") as f:
-        models_str = chevron.render(f, {"apis": apis})
+    modules: Dict[str, str] = {}
+    exports: Dict[str, str] = {}
+    taken = {"root_client"}
+    apis = []
+    with schema_cache():
+        endpoints = imap_chunks(
+            pool,
+            swagger,
+            partial(
+                _render_endpoints, sync=sync, pydantic_v2=pydantic_v2, model_backend=model_backend
+            ),
+            endpoint_keys,
+        )
+        for tag, endpoint_defs in api_groups.items():
+            api = get_api(tag, sync)
+            api["module"] = to_module_name(api["attribute_name"] or "api", taken)
+            apis.append(api)
+
+            content = [render_template("apis_class.py.mustache", api)]
+            module_parsers: Dict[str, Dict[str, str]] = {}
+            types: List[str] = []
+            for _ in endpoint_defs:
+                endpoint, parsers, endpoint_types = next(endpoints)
+                content.append(endpoint)
+                types += endpoint_types
+                for module_parser in parsers:
+                    module_parsers.setdefault(module_parser["name"], module_parser)
+                    types.append(module_parser["type"])
+            content.append("\n")
+            if module_parsers:
+                content.append(
+                    render_template(
+                        "apis_footer.py.mustache",
+                        {"parsers": list(module_parsers.values()), **options},
+                    )
+                )
+
+            imports = ", ".join(get_referenced_names(types, model_names))
+            header = render_template(
+                "apis.py.mustache",
+                {
+                    "model_imports": imports,
+                    "discriminated_unions": not msgspec and has_discriminated_items(endpoint_defs),
+                    **options,
+                },
+            )
+            modules[api["module"]] = header + "".join(content)
+            exports[api["class_name"]] = api["module"]
+
+    if group_by_tags:
+        modules["root_client"] = render_template(
+            "apis_root_client.py.mustache", {"apis": apis, "async": not sync, "modular": True}
+        )
+        exports["RootClient"] = "root_client"
 
-    with open(out_file, "w+") as f:
-        f.write(models_str)
+    return write_package(out_dir, modules, exports)
@@ -1,20 +1,26 @@
-import os
-
 from pathlib import Path
 
-import chevron
-
+from .files import write_if_changed
+from .template_engine import render_template
 
-dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
-templates_path = dir_path / "templates"
 
-
-def generate_base_client(out_file: Path, sync: bool) -> None:
+def generate_base_client(
+    out_file: Path, sync: bool, pydantic_v2: bool = False, model_backend: str = "pydantic"
+) -> bool:
     """
     Generate the root API client to be used by all other functions.
+
+    Returns whether `out_file` changed.
     """
-    with open(templates_path / "base_client.py.mustache", "r") as f:
-        toml_str = chevron.render(f, {"async": not sync})
+    toml_str = render_template(
+        "base_client.py.mustache",
+        {
+            "async": not sync,
+            "msgspec": model_backend == "msgspec",
+            "pydantic_v2": pydantic_v2 and model_backend != "msgspec",
+            # Pydantic v1 models are (de)serialized by a pluggable codec
+            "json_codec": not pydantic_v2 and model_backend != "msgspec",
+        },
+    )
 
-    with open(out_file, "w+") as f:
-        f.write(toml_str)
+    return write_if_changed(out_file, toml_str)
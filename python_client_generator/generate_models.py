@@ -1,16 +1,23 @@
-import os
 import re
 
+from functools import partial
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List
-
-import chevron
-
-from .utils import resolve_type, sanitize_name, serialize_to_python_code
-
-
-dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
-templates_path = dir_path / "templates"
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .files import write_if_changed
+from .modular import get_imports, to_module_name, write_package
+from .parallel import SwaggerPool, map_chunks
+from .profiling import phase, profile_item
+from .schema_cache import get_schema_cache, schema_cache
+from .template_engine import render_template
+from .utils import (
+    get_union_key,
+    resolve_type,
+    sanitize_name,
+    serialize_to_python_code,
+    strongly_connected_components,
+)
 
 
 def resolve_field_args(property: Dict[str, Any]) -> Dict[str, Any]:
@@ -36,17 +43,49 @@ def serialize_args_dict(args_dict: Dict[str, Any]) -> str:
     return ", ".join(args_list)
 
 
-def _get_schema_references(schema: Dict[str, Any]) -> List[str]:
-    union_keys = list(set(["allOf", "anyOf", "oneOf"]) & set(schema.keys()))
-    if union_keys:
+def _get_schema_references(
+    schema: Dict[str, Any],
+    _ancestors: FrozenSet[int] = frozenset(),
+    _fallbacks: Optional[List[int]] = None,
+) -> List[str]:
+    if id(schema) in _ancestors:
+        # Untitled recursive schema, any named schema along the cycle was already collected
+        if _fallbacks is not None:
+            _fallbacks.append(id(schema))
+        return []
+
+    fallbacks: List[int] = []
+    cache = get_schema_cache()
+    if cache is None:
+        refs = _find_schema_references(schema, _ancestors | {id(schema)}, fallbacks)
+    else:
+        key = cache.key(schema)
+        if key in cache.references:
+            return cache.references[key]
+        refs = _find_schema_references(schema, _ancestors | {id(schema)}, fallbacks)
+        if not fallbacks:
+            # References cut short along a cycle depend on where the collection started, so
+            # they aren't memoized
+            cache.references[key] = refs
+
+    if _fallbacks is not None:
+        _fallbacks += fallbacks
+    return refs
+
+
+def _find_schema_references(
+    schema: Dict[str, Any], _ancestors: FrozenSet[int], _fallbacks: List[int]
+) -> List[str]:
+    union_key = get_union_key(schema)
+    if union_key:
         arr = []
-        for p_sub_schema in schema[union_keys[0]]:
-            arr += _get_schema_references(p_sub_schema)
+        for p_sub_schema in schema[union_key]:
+            arr += _get_schema_references(p_sub_schema, _ancestors, _fallbacks)
         return arr
     elif "type" not in schema:
         return []
     elif schema["type"] == "array":
-        return _get_schema_references(schema["items"])
+        return _get_schema_references(schema["items"], _ancestors, _fallbacks)
     elif schema["type"] == "object" or (schema["type"] == "string" and "enum" in schema):
         # As some nested enums may not have a title, we need to check for it.
         # This is observed to happen inside the properties of a schema that uses an enum with referencing to another enum schema (raw values instead)  # noqa E501
@@ -93,9 +132,8 @@ def get_references(model: Dict[str, Any]) -> List[str]:
     These come from either their properties or unionized referencing.
     """
     refs = []
-    union_keys = list(set(["allOf", "anyOf", "oneOf"]) & set(model.keys()))
-    if union_keys:
-        return _get_schema_references(model)
+    if get_union_key(model):
+        return list(_get_schema_references(model))
     else:
         # Must have properties
         for p_schema in model["properties"].values():
@@ -104,36 +142,126 @@ def get_references(model: Dict[str, Any]) -> List[str]:
     return [sanitize_name(r) for r in refs]
 
 
-def get_fields(schema: Dict[str, Any]) -> List[Dict[str, Any]]:
-    union_keys = list(set(["allOf", "anyOf", "oneOf"]) & set(schema.keys()))
-    if union_keys:
-        # Handle union cases by creating a __root__ defined model
-        return [{"name": "__root__", "type": resolve_type(schema)}]
-    else:
+def get_discriminator(schema: Dict[str, Any]) -> Optional[str]:
+    """
+    Property of the discriminator of a `oneOf` or `anyOf` union, if it has one and all its
+    members are models with that property
+    """
+    union_key = get_union_key(schema)
+    discriminator = schema.get("discriminator")
+    if union_key not in ("oneOf", "anyOf") or not isinstance(discriminator, dict):
+        return None
+
+    property_name = discriminator.get("propertyName")
+    members = schema[union_key]
+    if property_name and len(members) > 1:
+        if all(
+            "title" in m and not get_union_key(m) and property_name in m.get("properties", {})
+            for m in members
+        ):
+            return str(property_name)
+    return None
+
+
+def get_discriminator_tags(schemas: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Values of the discriminators of the unions (see `get_discriminator`) among the schemas and
+    their properties, by model name and property of the members they select.
+
+    Members take the values the mapping of the discriminator gives them or, when it doesn't
+    mention them, the name of their schema.
+    """
+    unique = get_unique_schemas(schemas)
+    names = {id(v): k for k, v in unique.items()}
+    tags: Dict[str, Dict[str, List[str]]] = {}
+    for schema in unique.values():
+        for union in [schema, *schema.get("properties", {}).values()]:
+            property_name = get_discriminator(union)
+            if property_name is None:
+                continue
+
+            mapping = union["discriminator"].get("mapping", {})
+            for member in union[get_union_key(union)]:  # type: ignore[index]
+                values = [
+                    k for k, ref in mapping.items() if schemas.get(ref.split("/")[-1]) is member
+                ]
+                member_tags = tags.setdefault(sanitize_name(member["title"]), {}).setdefault(
+                    property_name, []
+                )
+                for value in values or [names.get(id(member), member["title"])]:
+                    if value not in member_tags:
+                        member_tags.append(value)
+    return tags
+
+
+def get_fields(
+    schema: Dict[str, Any],
+    pydantic_v2: bool = False,
+    tags: Optional[Dict[str, List[str]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fields of a model. The fields of discriminated unions dispatch on their discriminator, and
+    the discriminator properties of their members are given the literal `tags` which select them
+    (see `get_discriminator_tags`).
+    """
+    if get_union_key(schema):
+        # Handle union cases by creating a root model
+        discriminator = get_discriminator(schema)
         return [
             {
-                "name": k,
-                "type": resolve_type(v, use_literals=True),
-                "optional": "required" not in schema or k not in schema["required"],
-                "field_args": serialize_args_dict(resolve_field_args(v)),
+                "name": "root" if pydantic_v2 else "__root__",
+                "type": resolve_type(schema),
+                "field_args": serialize_args_dict({"discriminator": discriminator})
+                if discriminator
+                else "",
             }
-            for k, v in schema["properties"].items()
         ]
 
+    fields = []
+    for k, v in schema["properties"].items():
+        optional = "required" not in schema or k not in schema["required"]
+        type_ = resolve_type(v, use_literals=True)
+        field_args = resolve_field_args(v)
+        if tags and k in tags:
+            # Members of discriminated unions default to their tag
+            type_ = f"Literal[{', '.join(repr(t) for t in tags[k])}]"
+            optional = False
+            field_args = {"default": tags[k][0]}
+        default = (
+            serialize_to_python_code(field_args["default"]) if "default" in field_args else None
+        )
+        # Pydantic v2 no longer defaults optional fields to None
+        default_none = pydantic_v2 and optional and "default" not in field_args
+        discriminator = get_discriminator(v)
+        if discriminator:
+            field_args["discriminator"] = discriminator
+        if default_none and field_args:
+            field_args = {"default": None, **field_args}
+        constraints = {a: v for a, v in field_args.items() if a not in ("default", "discriminator")}
+        fields.append(
+            {
+                "name": k,
+                "type": type_,
+                "optional": optional,
+                "default_none": default_none,
+                "field_args": serialize_args_dict(field_args),
+                # Backends other than Pydantic declare the default and constraints separately
+                "default": default,
+                "constraints": serialize_args_dict(constraints),
+            }
+        )
+    return fields
+
 
 def _strip_nonexistant_refs(objects: List[Dict[str, Any]]) -> None:
     """
     Remove any references to names not in the objects list
     """
-    names = [o["name"] for o in objects]
+    names = {o["name"] for o in objects}
     for o in objects:
         o["refs"] = [ref for ref in o["refs"] if ref in names]
 
 
-def _get_ref_index(objects: List[Dict[str, Any]], name: str) -> int:
-    return next(i for i, o in enumerate(objects) if o["name"] == name)
-
-
 def _object_has_binary_properties(object: Dict[str, Any]) -> bool:
     """
     Determine if an object has some properties which are binary
@@ -144,46 +272,121 @@ def _object_has_binary_properties(object: Dict[str, Any]) -> bool:
     return False
 
 
+def _mark_forward_refs(models: List[Dict[str, Any]]) -> None:
+    """
+    Flag the fields of mutually (or self) referencing models which need forward references
+    """
+    names = {m["name"] for m in models}
+    for m in models:
+        m["has_forward_refs"] = True
+        for f in m["fields"]:
+            f["forward_ref"] = not names.isdisjoint(re.findall(r"\w+", f["type"]))
+
+
 def _sort_models(objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Resolve object dependencies by walking through the objects list
-    and moving any dependencies which are further along in the list
-    ahead of us.
+    Order models so that every model is defined after the models it references.
+
+    Mutually referencing models can't be ordered that way, they are kept together in their
+    original order and flagged to be defined with forward references.
     """
-    i = 0
-    while i < len(objects):
-        sorted = False
-        for ref in objects[i]["refs"]:
-            ref_index = _get_ref_index(objects, ref)
-            if ref_index > i:
-                objects.insert(i, objects.pop(ref_index))
-                sorted = True
+    indexes: Dict[str, int] = {}
+    for i, o in enumerate(objects):
+        indexes.setdefault(o["name"], i)
+
+    # Visit references last to first to keep the order of the previous sorting implementation
+    edges = [[indexes[ref] for ref in reversed(o["refs"])] for o in objects]
+
+    sorted_objects = []
+    for c, component in enumerate(strongly_connected_components(edges)):
+        models = [objects[i] for i in component]
+        for m in models:
+            m["component"] = c
+        if len(component) > 1 or component[0] in edges[component[0]]:
+            _mark_forward_refs(models)
+        sorted_objects += models
+
+    return sorted_objects
+
+
+def _is_model(schema: Dict[str, Any]) -> bool:
+    # Skip models with "binary" properties as these are related to file uploads
+    # and we handle them with function arguments on the API
+    return (
+        "type" not in schema or schema["type"] == "object"
+    ) and not _object_has_binary_properties(schema)
+
+
+def get_model(
+    schema: Dict[str, Any],
+    pydantic_v2: bool = False,
+    tags: Optional[Dict[str, Dict[str, List[str]]]] = None,
+) -> Dict[str, Any]:
+    p: Dict[str, Any] = {}
+    p["refs"] = get_references(schema)
+    p["name"] = sanitize_name(schema["title"])
+    p["root"] = get_union_key(schema) is not None
+    p["base"] = "RootModel" if pydantic_v2 and p["root"] else "BaseModel"
+    model_tags = (tags or {}).get(p["name"], {})
+    p["fields"] = get_fields(schema, pydantic_v2, model_tags)
+    # Structs only support a single tag, from the first discriminated union they are a member of
+    p["tag_field"] = next(iter(model_tags), None)
+    p["tag"] = serialize_to_python_code(model_tags[p["tag_field"]][0]) if model_tags else None
+    return p
+
+
+def _order_models(models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    _strip_nonexistant_refs(models)
+    return _sort_models(models)
 
-        if not sorted:
-            i += 1  # Ensure shifted references reprocessed
 
-    return objects
+def _is_generated(schema: Dict[str, Any]) -> bool:
+    return "enum" in schema or _is_model(schema)
 
 
-def get_models(schemas: Dict[str, Any]) -> List[Dict[str, Any]]:
-    objects = (v for v in schemas.values() if "type" not in v or v["type"] == "object")
+def get_unique_schemas(schemas: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Schemas of the dereferenced OpenAPI file without the references to other schemas, which
+    dereference to the very same schema
+    """
+    unique: Dict[int, Tuple[str, Any]] = {}
+    for k, v in schemas.items():
+        unique.setdefault(id(v), (k, v))
+    return dict(unique.values())
 
-    models = []
-    for o in objects:
-        # Skip models with "binary" properties as these are related to file uploads
-        # and we handle them with function arguments on the API
-        if _object_has_binary_properties(o):
-            continue
 
-        p: Dict[str, Any] = {}
-        p["refs"] = get_references(o)
-        p["name"] = sanitize_name(o["title"])
-        p["fields"] = get_fields(o)
-        models.append(p)
+def get_aliases(schemas: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Names of the schemas which are references to the schema of another enum or model (see
+    `deduplicate_schemas`), along with the name of that enum or model
+    """
+    unique = get_unique_schemas(schemas)
+    aliases = []
+    for k, v in schemas.items():
+        name, target = sanitize_name(k), sanitize_name(v.get("title", k))
+        if unique.get(k) is not v and _is_generated(v) and name != target:
+            aliases.append({"name": name, "target": target})
+    return aliases
 
-    _strip_nonexistant_refs(models)
-    _sort_models(models)
-    return models
+
+def get_model_names(schemas: Dict[str, Any]) -> Set[str]:
+    """
+    Names of the enums and models generated from the schemas, and of their aliases
+    """
+    return {
+        sanitize_name(s["title"]) for s in get_unique_schemas(schemas).values() if _is_generated(s)
+    } | {a["name"] for a in get_aliases(schemas)}
+
+
+def get_models(schemas: Dict[str, Any], pydantic_v2: bool = False) -> List[Dict[str, Any]]:
+    tags = get_discriminator_tags(schemas)
+    return _order_models(
+        [
+            get_model(o, pydantic_v2, tags)
+            for o in get_unique_schemas(schemas).values()
+            if _is_model(o)
+        ]
+    )
 
 
 def _enum_val_to_name(value: Any) -> str:
@@ -204,7 +407,7 @@ def _enum_val_to_name(value: Any) -> str:
 
 
 def get_enums(schemas: Dict[str, Any]) -> List[Dict[str, Any]]:
-    objects = {k: v for k, v in schemas.items() if "enum" in v}
+    objects = {k: v for k, v in get_unique_schemas(schemas).items() if "enum" in v}
 
     enums = []
     for _, o in objects.items():
@@ -223,17 +426,204 @@ def get_enums(schemas: Dict[str, Any]) -> List[Dict[str, Any]]:
     return enums
 
 
-def generate_models(swagger: Dict[str, Any], out_file: Path) -> None:
-    """
-    Generate enums and Pydantic models from the dereferenced OpenAPI file.
-    """
+def _get_models(
+    swagger: Dict[str, Any],
+    names: List[str],
+    pydantic_v2: bool,
+    tags: Dict[str, Dict[str, List[str]]],
+) -> List[Dict[str, Any]]:
     schemas = swagger["components"]["schemas"]
+    models = []
+    with schema_cache():
+        for name in names:
+            with profile_item("schema", sanitize_name(schemas[name]["title"])):
+                models.append(get_model(schemas[name], pydantic_v2, tags))
+    return models
 
-    models = get_models(schemas)
-    enums = get_enums(schemas)
 
-    with open(templates_path / "models.py.mustache", "r") as f:
-        models_str = chevron.render(f, {"enums": enums, "models": models})
+def _to_struct(model: Dict[str, Any], struct_tags: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Adapt a model to msgspec, which can only tell apart the Structs of a union by a tag field
+    (given by Struct name in `struct_tags`): unions of several Structs are decoded as dictionaries
+    instead, unless the Structs share their tag field. The tag field of a Struct is set by
+    msgspec rather than declared.
+    """
+
+    def replace_union(match: "re.Match[str]") -> str:
+        members = [m.strip() for m in match.group(1).split(",")]
+        tag_fields = {struct_tags[m] for m in members if m in struct_tags}
+        if sum(m in struct_tags for m in members) > 1 and (
+            None in tag_fields or len(tag_fields) > 1
+        ):
+            return "Dict[str, Any]"
+        return match.group(0)
+
+    return {
+        **model,
+        "fields": [
+            {**f, "type": re.sub(r"Union\[([^\[\]]*)\]", replace_union, f["type"])}
+            for f in model["fields"]
+            if f["name"] != model.get("tag_field")
+        ],
+    }
+
+
+def _render_models(
+    swagger: Dict[str, Any],
+    models: List[Dict[str, Any]],
+    model_backend: str,
+    struct_tags: Dict[str, Optional[str]],
+) -> List[str]:
+    rendered = []
+    for m in models:
+        with profile_item("schema", m["name"]):
+            if model_backend == "msgspec":
+                rendered.append(
+                    render_template("models_struct.py.mustache", _to_struct(m, struct_tags))
+                )
+            else:
+                rendered.append(render_template("models_model.py.mustache", m))
+    return rendered
+
+
+def _analyse_and_render(
+    swagger: Dict[str, Any],
+    pool: Optional[SwaggerPool],
+    pydantic_v2: bool,
+    model_backend: str,
+) -> Tuple[List[Dict[str, Any]], List[str], List[Dict[str, Any]], List[str]]:
+    """
+    Enums and models of the dereferenced OpenAPI file, in dependency order, along with their
+    rendering
+    """
+    schemas = swagger["components"]["schemas"]
+    names = [k for k, v in get_unique_schemas(schemas).items() if _is_model(v)]
+    with schema_cache():
+        with phase("get_models"):
+            tags = get_discriminator_tags(schemas)
+            models = _order_models(
+                map_chunks(
+                    pool, swagger, partial(_get_models, pydantic_v2=pydantic_v2, tags=tags), names
+                )
+            )
+        with phase("get_enums"):
+            enums = get_enums(schemas)
+
+    rendered_enums = [render_template("models_enum.py.mustache", e) for e in enums]
+    struct_tags = {m["name"]: m["tag_field"] for m in models if not m["root"]}
+    rendered_models = map_chunks(
+        pool,
+        swagger,
+        partial(_render_models, model_backend=model_backend, struct_tags=struct_tags),
+        models,
+    )
+    return enums, rendered_enums, models, rendered_models
+
+
+def generate_models(
+    swagger: Dict[str, Any],
+    out_file: Path,
+    pool: Optional[SwaggerPool] = None,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+) -> bool:
+    """
+    Generate enums and models from the dereferenced OpenAPI file.
 
-    with open(out_file, "w+") as f:
-        f.write(models_str)
+    Models are Pydantic models (v1, or v2 if `pydantic_v2`) or, with the "msgspec"
+    `model_backend`, msgspec Structs, unions becoming type aliases. They are analysed and rendered
+    in chunks in the workers of `pool`, if given. Returns whether `out_file` changed.
+    """
+    msgspec = model_backend == "msgspec"
+    pydantic_v2 = pydantic_v2 and not msgspec
+    _, rendered_enums, models, rendered_models = _analyse_and_render(
+        swagger, pool, pydantic_v2, model_backend
+    )
+
+    options = {"pydantic_v2": pydantic_v2, "msgspec": msgspec}
+    content = [render_template("models.py.mustache", options)]
+    content += rendered_enums + rendered_models
+    content.append(
+        render_template(
+            "models_aliases.py.mustache", {"aliases": get_aliases(swagger["components"]["schemas"])}
+        )
+    )
+    # Structs resolve their forward references by themselves
+    if not msgspec:
+        content.append(
+            render_template(
+                "models_footer.py.mustache",
+                {"forward_refs": [m for m in models if m.get("has_forward_refs")], **options},
+            )
+        )
+
+    return write_if_changed(out_file, "".join(content))
+
+
+def generate_model_modules(
+    swagger: Dict[str, Any],
+    out_dir: Path,
+    pool: Optional[SwaggerPool] = None,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+) -> bool:
+    """
+    Generate enums and models like `generate_models`, but in a module each within the `out_dir`
+    subpackage, which imports them on first access. Mutually referencing models share a module.
+    Returns whether any file changed.
+    """
+    msgspec = model_backend == "msgspec"
+    pydantic_v2 = pydantic_v2 and not msgspec
+    enums, rendered_enums, models, rendered_models = _analyse_and_render(
+        swagger, pool, pydantic_v2, model_backend
+    )
+
+    # Module of each enum and model, the models of a component being defined in the first one's
+    taken: Set[str] = set()
+    module_names: Dict[str, str] = {}
+    component_modules: Dict[int, str] = {}
+    for e in enums:
+        module_names[e["name"]] = to_module_name(e["name"], taken)
+    for m in models:
+        if m["component"] not in component_modules:
+            component_modules[m["component"]] = to_module_name(m["name"], taken)
+        module_names[m["name"]] = component_modules[m["component"]]
+
+    options = {"pydantic_v2": pydantic_v2, "msgspec": msgspec}
+    header = render_template("models.py.mustache", options)
+    modules: Dict[str, List[str]] = {}
+    for e, text in zip(enums, rendered_enums):
+        modules[module_names[e["name"]]] = [header, text]
+    for module, group in groupby(
+        zip(models, rendered_models), lambda m: module_names[m[0]["name"]]
+    ):
+        group_models, texts = zip(*group)
+        names = [m["name"] for m in group_models]
+        types = [f["type"] for m in group_models for f in m["fields"]]
+        imports = get_imports(types, module_names, exclude=names)
+        content = [
+            header,
+            render_template(
+                "models_imports.py.mustache", {"imports": imports, "has_imports": len(imports) > 0}
+            ),
+        ]
+        content += texts
+        if not msgspec:
+            forward_refs = [m for m in group_models if m.get("has_forward_refs")]
+            content.append(
+                render_template(
+                    "models_footer.py.mustache", {"forward_refs": forward_refs, **options}
+                )
+            )
+        modules[module] = content
+
+    # Aliases are defined along with the enum or model they refer to
+    for alias in get_aliases(swagger["components"]["schemas"]):
+        module_names[alias["name"]] = module_names[alias["target"]]
+        modules[module_names[alias["target"]]].append(
+            render_template("models_aliases.py.mustache", {"aliases": [alias]})
+        )
+
+    return write_package(
+        out_dir, {name: "".join(content) for name, content in modules.items()}, module_names
+    )
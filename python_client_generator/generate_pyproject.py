@@ -1,23 +1,33 @@
-import os
-
 from pathlib import Path
 from typing import Any, Dict
 
-import chevron
-
-
-dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
-templates_path = dir_path / "templates"
+from .files import write_if_changed
+from .template_engine import render_template
 
 
-def generate_pyproject(swagger: Dict[str, Any], out_file: Path, project_name: str) -> None:
+def generate_pyproject(
+    swagger: Dict[str, Any],
+    out_file: Path,
+    project_name: str,
+    pydantic_v2: bool = False,
+    model_backend: str = "pydantic",
+) -> bool:
     """
     Generate `pyproject.toml` file.
+
+    Returns whether `out_file` changed.
     """
     version = swagger["info"]["version"]
 
-    with open(templates_path / "pyproject.toml.mustache", "r") as f:
-        toml_str = chevron.render(f, {"version": version, "project_name": project_name})
-
-    with open(out_file, "w+") as f:
-        f.write(toml_str)
+    toml_str = render_template(
+        "pyproject.toml.mustache",
+        {
+            "version": version,
+            "project_name": project_name,
+            "msgspec": model_backend == "msgspec",
+            "pydantic_v2": pydantic_v2 and model_backend != "msgspec",
+            "json_codec": not pydantic_v2 and model_backend != "msgspec",
+        },
+    )
+
+    return write_if_changed(out_file, toml_str)
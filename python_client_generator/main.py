@@ -1,9 +1,14 @@
 import argparse
 import json
-import os
-import shutil
+import sys
+import time
+import tracemalloc
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
 from pathlib import Path
+from typing import Callable, List, Tuple
 
 from python_client_generator.utils import (
     add_schema_title_if_missing,
@@ -11,17 +16,27 @@ from python_client_generator.utils import (
     dereference_swagger,
 )
 
-from .generate_apis import generate_apis
+from .batch import format_summary, load_manifest
+from .build_cache import BuildCache, get_fingerprints
+from .bundling import bundle_external_refs, load_document
+from .deduplication import deduplicate_schemas
+from .files import write_if_changed
+from .generate_apis import generate_api_modules, generate_apis
 from .generate_base_client import generate_base_client
-from .generate_models import generate_models
+from .generate_models import generate_model_modules, generate_models
 from .generate_pyproject import generate_pyproject
+from .modular import remove_package
+from .parallel import SwaggerPool
+from .profiling import Profiler, cprofile, phase, profiling
+from .schema_cache import schema_cache
+from .selection import select_operations
+from .template_engine import load_template
 
 
-dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
-templates_path = dir_path / "templates"
+DEFAULT_CACHE_DIR = ".python-client-generator-cache"
 
 
-def main() -> None:
+def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Generates an httpx-based Python client.")
     parser.add_argument("--open-api", type=str)
     parser.add_argument("--package-name", type=str)
@@ -29,28 +44,343 @@ def main() -> None:
     parser.add_argument("--outdir", type=str, default="clients/")
     parser.add_argument("--group-by-tags", action="store_true")
     parser.add_argument("--sync", action="store_true")
+    parser.add_argument(
+        "--layout",
+        choices=["single", "modular"],
+        default="single",
+        help=(
+            "Layout of the generated package: single apis.py and models.py modules, or apis and "
+            "models subpackages with a module per tag and per schema, imported on first access"
+        ),
+    )
+    parser.add_argument(
+        "--include-operations",
+        nargs="+",
+        default=None,
+        help="Only generate these operations (by id, glob patterns) and the models they use",
+    )
+    parser.add_argument(
+        "--include-tags",
+        nargs="+",
+        default=None,
+        help="Only generate the operations of these tags (glob patterns) and the models they use",
+    )
+    parser.add_argument(
+        "--exclude-operations",
+        nargs="+",
+        default=None,
+        help="Don't generate these operations (by id, glob patterns)",
+    )
+    parser.add_argument(
+        "--exclude-tags",
+        nargs="+",
+        default=None,
+        help="Don't generate the operations of these tags (glob patterns)",
+    )
+    parser.add_argument(
+        "--deduplicate-schemas",
+        action="store_true",
+        help=(
+            "Generate a single enum or model for structurally identical schemas, and name the "
+            "inline object and enum schemas rather than typing them as dictionaries and strings"
+        ),
+    )
+    parser.add_argument(
+        "--pydantic",
+        choices=["v1", "v2"],
+        default="v1",
+        help=(
+            "Pydantic version of the generated models: v1 models also run on Pydantic v2 through "
+            "its pydantic.v1 module, v2 models are validated by pydantic-core"
+        ),
+    )
+    parser.add_argument(
+        "--model-backend",
+        choices=["pydantic", "msgspec"],
+        default="pydantic",
+        help=(
+            "Library of the generated models: msgspec Structs decode responses faster than "
+            "Pydantic models, --pydantic is then ignored"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help=f"Directory of the build cache (defaults to '<outdir>/{DEFAULT_CACHE_DIR}')",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Render all files, ignoring the build cache"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of processes to render models and endpoints with, "
+            "or to generate clients with in batch mode"
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help="Generate all the clients of a JSON manifest, other options are ignored",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        default=None,
+        help=(
+            "Report the wall time, CPU time and peak memory of each phase of the generation, and "
+            "the schemas and operations which took longest to process, as a table (default) or "
+            "as JSON, on stderr. Generation runs in a single process"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Run the generation under cProfile and dump its stats (see pstats) to this file",
+    )
+
+    return parser
+
+
+def _remove_other_layout(cache: BuildCache, package_path: Path, modular: bool) -> List[Path]:
+    """
+    Remove the models and apis of the other layout which a previous generation wrote, as the
+    subpackages shadow the modules of the same name. Those which weren't generated are left as
+    they are, with a warning. Returns the removed files.
+    """
+    removed = []
+    for name in ("models", "apis"):
+        out_file = package_path / (f"{name}.py" if modular else f"{name}/__init__.py")
+        if not out_file.exists():
+            continue
+        if not cache.is_recorded(out_file):
+            print(f"Warning: leaving {out_file} of the other layout as is", file=sys.stderr)
+            continue
 
-    args = parser.parse_args()
+        if modular:
+            out_file.unlink()
+        else:
+            remove_package(out_file.parent)
+        removed.append(out_file)
 
-    with open(args.open_api, "r") as f:
-        swagger = json.load(f)
+    cache.forget(removed)
+    return removed
+
+
+def generate(args: argparse.Namespace) -> List[Path]:
+    """
+    Generate a client, returns the files which changed.
+    """
+    with phase("load"):
+        swagger = load_document(Path(args.open_api))
+    with phase("bundle_external_refs"):
+        swagger = bundle_external_refs(swagger, Path(args.open_api))
 
     assert_openapi_version(swagger)
-    add_schema_title_if_missing(swagger["components"]["schemas"])
-    dereferenced_swagger = dereference_swagger(swagger, swagger)
 
-    # Create root directory
+    # Only generate the selected operations and the models they use
+    filters = [
+        args.include_operations,
+        args.include_tags,
+        args.exclude_operations,
+        args.exclude_tags,
+    ]
+    if any(filters):
+        with phase("select_operations"):
+            swagger = select_operations(swagger, *filters)
+    if args.deduplicate_schemas:
+        with phase("deduplicate_schemas"):
+            swagger = deduplicate_schemas(swagger)
+
+    pydantic_v2 = args.pydantic == "v2"
     path = Path(args.outdir)
-    path.mkdir(parents=True, exist_ok=True)
+    package_path = path / Path(args.package_name)
 
-    generate_pyproject(dereferenced_swagger, path / "pyproject.toml", args.project_name)
+    # Only render the files whose inputs changed since the last generation
+    modular = args.layout == "modular"
+    cache = BuildCache(
+        Path(args.cache_dir) if args.cache_dir else path / DEFAULT_CACHE_DIR,
+        [package_path / "models", package_path / "apis"] if modular else [],
+    )
+    with phase("get_fingerprints"):
+        fingerprints = get_fingerprints(
+            swagger,
+            path,
+            package_path,
+            args.project_name,
+            args.group_by_tags,
+            args.sync,
+            pydantic_v2,
+            args.model_backend,
+            args.layout,
+        )
+    stale = [p for p, fp in fingerprints.items() if args.no_cache or not cache.is_fresh(p, fp)]
+    if not stale:
+        return []
 
-    # Create package directory
-    package_path = path / Path(args.package_name)
+    with phase("add_schema_title_if_missing"):
+        add_schema_title_if_missing(swagger["components"]["schemas"])
+    with phase("dereference_swagger"):
+        dereferenced_swagger = dereference_swagger(swagger, swagger)
+
+    # Create root and package directories
     package_path.mkdir(parents=True, exist_ok=True)
+    removed = _remove_other_layout(cache, package_path, modular)
+
+    pool = SwaggerPool(dereferenced_swagger, args.jobs) if args.jobs > 1 else None
+
+    generators: List[Tuple[Path, Callable[[Path], bool]]] = [
+        (
+            path / "pyproject.toml",
+            lambda f: generate_pyproject(
+                dereferenced_swagger, f, args.project_name, pydantic_v2, args.model_backend
+            ),
+        ),
+        (
+            package_path / "__init__.py",
+            lambda f: write_if_changed(
+                f, load_template("__init__modular.py" if modular else "__init__.py")
+            ),
+        ),
+        (
+            package_path / "base_client.py",
+            lambda f: generate_base_client(f, args.sync, pydantic_v2, args.model_backend),
+        ),
+    ]
+    if modular:
+        # Subpackages are generated as a whole, and cached by their __init__.py along with the
+        # contents of all of their modules
+        generators += [
+            (
+                package_path / "models" / "__init__.py",
+                lambda f: generate_model_modules(
+                    dereferenced_swagger, f.parent, pool, pydantic_v2, args.model_backend
+                ),
+            ),
+            (
+                package_path / "apis" / "__init__.py",
+                lambda f: generate_api_modules(
+                    dereferenced_swagger,
+                    f.parent,
+                    args.group_by_tags,
+                    args.sync,
+                    pool,
+                    pydantic_v2,
+                    args.model_backend,
+                ),
+            ),
+        ]
+    else:
+        generators += [
+            (
+                package_path / "models.py",
+                lambda f: generate_models(
+                    dereferenced_swagger, f, pool, pydantic_v2, args.model_backend
+                ),
+            ),
+            (
+                package_path / "apis.py",
+                lambda f: generate_apis(
+                    dereferenced_swagger,
+                    f,
+                    args.group_by_tags,
+                    args.sync,
+                    pool,
+                    pydantic_v2,
+                    args.model_backend,
+                ),
+            ),
+        ]
+
+    # Generate files, sharing the analysis of schemas between generators
+    with schema_cache():
+        if pool is None:
+            changed = []
+            for out_file, generate_file in generators:
+                if out_file in stale:
+                    with phase(f"generate {out_file.name}"):
+                        if generate_file(out_file):
+                            changed.append(out_file)
+        else:
+            # Run the generators concurrently, each dispatching its chunks to the process pool.
+            # Threads don't inherit context variables, so each generator runs in a copy of the
+            # current context to share its schema cache (and profiler)
+            with pool, ThreadPoolExecutor(len(generators)) as executor:
+                futures = [
+                    (o, executor.submit(copy_context().run, g, o))
+                    for o, g in generators
+                    if o in stale
+                ]
+                changed = [o for o, future in futures if future.result()]
+
+    cache.record(stale, fingerprints)
+    cache.save()
+
+    return removed + changed
+
+
+def _generate_batch_entry(argv: List[str]) -> Tuple[List[Path], float]:
+    start = time.perf_counter()
+    changed = generate(get_parser().parse_args(argv))
+    return changed, time.perf_counter() - start
+
+
+def generate_batch(manifest_path: Path, jobs: int) -> None:
+    """
+    Generate all the clients of a manifest in this process or, with `jobs` > 1, on a pool of
+    processes, then print a summary of the generation of each client.
+    """
+    entries = load_manifest(manifest_path)
+
+    start = time.perf_counter()
+    if jobs > 1:
+        # Entries are already spread over processes, don't nest pools
+        with ProcessPoolExecutor(jobs) as executor:
+            results = list(
+                executor.map(_generate_batch_entry, [e + ["--jobs", "1"] for e in entries])
+            )
+    else:
+        results = [_generate_batch_entry(e) for e in entries]
+
+    print(format_summary([get_parser().parse_args(e) for e in entries], results))
+    print(f"Generated {len(entries)} clients in {time.perf_counter() - start:.2f}s")
+
+
+def main() -> None:
+    args = get_parser().parse_args()
+
+    if args.batch:
+        generate_batch(Path(args.batch), args.jobs)
+        return
+
+    profiler = Profiler() if args.timings else None
+    with ExitStack() as stack:
+        if profiler is not None:
+            # Phases are timed in this process only
+            args.jobs = 1
+            stack.enter_context(profiling(profiler))
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+        if args.profile:
+            stack.enter_context(cprofile(Path(args.profile)))
+
+        changed = generate(args)
+
+    for out_file in changed:
+        print(f"Updated {out_file}")
+    if not changed:
+        print(f"{args.outdir} is up to date")
 
-    # Generate package files
-    generate_models(dereferenced_swagger, package_path / "models.py")
-    generate_base_client(package_path / "base_client.py", sync=args.sync)
-    generate_apis(dereferenced_swagger, package_path / "apis.py", args.group_by_tags, args.sync)
-    shutil.copyfile(templates_path / "__init__.py", package_path / "__init__.py")
+    # Reports go to stderr to be told apart from the list of updated files
+    if profiler is not None:
+        if args.timings == "json":
+            print(json.dumps(profiler.report(), indent=2), file=sys.stderr)
+        else:
+            print(profiler.format_table(), file=sys.stderr)
@@ -0,0 +1,115 @@
+import ast
+import keyword
+import re
+import shutil
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from .files import write_if_changed
+from .template_engine import render_template
+
+
+def to_module_name(name: str, taken: Set[str]) -> str:
+    """
+    Snake case module name of a model or api, not in `taken` (which it's added to)
+    """
+    base = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name).lower()
+    base = re.sub(r"\W+", "_", base).strip("_") or "module"
+    if keyword.iskeyword(base) or base[0].isdigit():
+        base = f"_{base}"
+
+    module, i = base, 2
+    while module in taken:
+        module, i = f"{base}_{i}", i + 1
+    taken.add(module)
+    return module
+
+
+def get_referenced_names(types: Iterable[str], names: Iterable[str]) -> List[str]:
+    """
+    Names among `names` which `types` refer to, in alphabetical order
+    """
+    known = set(names)
+    return sorted({n for t in types for n in re.findall(r"\w+", t) if n in known})
+
+
+def get_imports(
+    types: Iterable[str], modules: Dict[str, str], exclude: Iterable[str] = ()
+) -> List[Dict[str, str]]:
+    """
+    Imports of the names defined in `modules` (their module by name) which `types` refer to,
+    grouped by module in alphabetical order
+    """
+    excluded = set(exclude)
+    by_module: Dict[str, List[str]] = {}
+    for name in get_referenced_names(types, modules):
+        if name not in excluded:
+            by_module.setdefault(modules[name], []).append(name)
+    return [{"module": m, "names": ", ".join(by_module[m])} for m in sorted(by_module)]
+
+
+def get_generated_modules(init_path: Path) -> Set[str]:
+    """
+    Modules which the `__init__.py` of a subpackage, as generated by `write_package`, imports
+    names from
+    """
+    try:
+        tree = ast.parse(init_path.read_text())
+    except (OSError, SyntaxError):
+        return set()
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and [getattr(t, "id", None) for t in node.targets] == ["_modules"]
+            and isinstance(node.value, ast.Dict)
+        ):
+            return {str(v.value) for v in node.value.values if isinstance(v, ast.Constant)}
+    return set()
+
+
+def write_package(out_dir: Path, modules: Dict[str, str], exports: Dict[str, str]) -> bool:
+    """
+    Write the modules of a subpackage given their contents by name, and its `__init__.py` which
+    imports the module of each of the `exports` (their module by name) on first access. Modules
+    of the previous generation which are no longer generated are removed, other files are left
+    as they are. Returns whether any file changed.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = get_generated_modules(out_dir / "__init__.py")
+
+    changed = False
+    for module, content in modules.items():
+        changed |= write_if_changed(out_dir / f"{module}.py", content.rstrip("\n") + "\n")
+
+    for module in sorted(previous - set(modules)):
+        path = out_dir / f"{module}.py"
+        if path.exists():
+            path.unlink()
+            changed = True
+
+    init = render_template(
+        "lazy_init.py.mustache",
+        {
+            "exports": [{"name": n, "module": exports[n]} for n in sorted(exports)],
+            "has_exports": len(exports) > 0,
+        },
+    )
+    changed |= write_if_changed(out_dir / "__init__.py", init)
+    return changed
+
+
+def remove_package(out_dir: Path) -> bool:
+    """
+    Remove a subpackage written by `write_package`: its modules, its `__init__.py` and, when no
+    other file is left, the subpackage itself. Returns whether any file was removed.
+    """
+    init_path = out_dir / "__init__.py"
+    paths = [out_dir / f"{m}.py" for m in sorted(get_generated_modules(init_path))] + [init_path]
+    removed = [p for p in paths if p.exists()]
+    for path in removed:
+        path.unlink()
+
+    if out_dir.is_dir() and {p.name for p in out_dir.iterdir()} <= {"__pycache__"}:
+        shutil.rmtree(out_dir)
+    return len(removed) > 0
@@ -0,0 +1,111 @@
+import math
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Number of chunks each worker gets, more chunks balance the load better but cost more IPC
+CHUNKS_PER_JOB = 4
+
+_worker_swagger: Dict[str, Any] = {}
+
+
+def _init_worker(swagger: Dict[str, Any]) -> None:
+    global _worker_swagger
+    _worker_swagger = swagger
+
+
+def _call_in_worker(func: Callable[[Dict[str, Any], List[T]], List[R]], chunk: List[T]) -> List[R]:
+    return func(_worker_swagger, chunk)
+
+
+class SwaggerPool:
+    """
+    Pool of processes which each hold a copy of the same dereferenced OpenAPI file.
+
+    The file is sent once to each worker, tasks then only refer to the parts of it they process
+    (e.g. by path and method names), so that large schema graphs aren't pickled with each task.
+    """
+
+    def __init__(self, swagger: Dict[str, Any], jobs: int) -> None:
+        self.swagger = swagger
+        self.jobs = jobs
+        self._executor = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(swagger,))
+
+    def __enter__(self) -> "SwaggerPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self._executor.shutdown()
+
+    def imap_chunks(
+        self, func: Callable[[Dict[str, Any], List[T]], List[R]], items: Sequence[T]
+    ) -> Iterator[R]:
+        size = max(1, math.ceil(len(items) / (self.jobs * CHUNKS_PER_JOB)))
+        iterator = iter(items)
+
+        # Only keep a couple of chunks per worker in flight so that results which weren't
+        # consumed yet don't pile up in memory
+        pending: Deque["Future[List[R]]"] = deque()
+        for chunk in iter(lambda: list(islice(iterator, size)), []):
+            pending.append(self._executor.submit(_call_in_worker, func, chunk))
+            if len(pending) >= 2 * self.jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def imap_chunks(
+    pool: Optional[SwaggerPool],
+    swagger: Dict[str, Any],
+    func: Callable[[Dict[str, Any], List[T]], List[R]],
+    items: Sequence[T],
+) -> Iterator[R]:
+    """
+    Lazily call `func(swagger, chunk)` on chunks of `items`, in the pool's workers if a pool
+    (created for the same `swagger`) is given, and yield the results in order.
+
+    Without a pool, items are processed one at a time as results are consumed.
+    `func` must be picklable, i.e. a module-level function or a `partial` of one.
+    """
+    if pool is None:
+        for item in items:
+            yield from func(swagger, [item])
+    else:
+        yield from pool.imap_chunks(func, items)
+
+
+def map_chunks(
+    pool: Optional[SwaggerPool],
+    swagger: Dict[str, Any],
+    func: Callable[[Dict[str, Any], List[T]], List[R]],
+    items: Sequence[T],
+) -> List[R]:
+    """
+    Call `func(swagger, chunk)` on chunks of `items` (see `imap_chunks`) and return the results.
+    """
+    if pool is None:
+        return func(swagger, list(items))
+    return list(pool.imap_chunks(func, items))
@@ -0,0 +1,139 @@
+import cProfile
+import time
+import tracemalloc
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+
+# Number of schemas and operations listed in reports
+TOP_ITEMS = 10
+
+
+@dataclass
+class Timing:
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    # Only measured for top-level phases, when tracing memory allocations
+    peak_mb: Optional[float] = None
+
+
+class Profiler:
+    """
+    Wall time, CPU time and peak memory of the phases of a generation, along with the time spent
+    processing each schema and operation.
+
+    Phases can be nested and entered several times, their timings are accumulated. Peak memory is
+    measured for top-level phases when `tracemalloc` is tracing.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, Timing] = {}
+        self.items: Dict[str, Dict[str, float]] = {"schema": {}, "operation": {}}
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        top_level = self._depth == 0
+        trace_memory = top_level and tracemalloc.is_tracing()
+        if trace_memory and hasattr(tracemalloc, "reset_peak"):  # Python >= 3.9
+            tracemalloc.reset_peak()
+
+        self._depth += 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            timing = self.phases.setdefault(name, Timing())
+            timing.calls += 1
+            timing.wall_s += time.perf_counter() - wall
+            timing.cpu_s += time.process_time() - cpu
+            if trace_memory:
+                peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+                timing.peak_mb = max(timing.peak_mb or 0.0, peak_mb)
+
+    @contextmanager
+    def item(self, kind: str, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            items = self.items[kind]
+            items[name] = items.get(name, 0.0) + time.perf_counter() - start
+
+    def top_items(self, kind: str) -> List[Tuple[str, float]]:
+        return sorted(self.items[kind].items(), key=lambda i: i[1], reverse=True)[:TOP_ITEMS]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases": {name: asdict(timing) for name, timing in self.phases.items()},
+            **{
+                f"top_{kind}s": [{"name": n, "wall_s": s} for n, s in self.top_items(kind)]
+                for kind in self.items
+            },
+        }
+
+    def format_table(self) -> str:
+        width = max([len("phase")] + [len(name) for name in self.phases])
+        lines = [f"{'phase':<{width}}  {'calls':>6}  {'wall (s)':>9}  {'cpu (s)':>9}  peak (MB)"]
+        for name, t in self.phases.items():
+            peak = f"{t.peak_mb:9.2f}" if t.peak_mb is not None else f"{'-':>9}"
+            lines.append(
+                f"{name:<{width}}  {t.calls:>6}  {t.wall_s:>9.4f}  {t.cpu_s:>9.4f}  {peak}"
+            )
+
+        for kind in self.items:
+            lines += ["", f"Top {kind}s by processing time:"]
+            lines += [f"  {s:9.4f}s  {name}" for name, s in self.top_items(kind)]
+
+        return "\n".join(lines)
+
+
+_current_profiler: ContextVar[Optional[Profiler]] = ContextVar("profiler", default=None)
+
+
+@contextmanager
+def profiling(profiler: Profiler) -> Iterator[Profiler]:
+    """
+    Collect the timings of the phases run within the block (in this process) into `profiler`
+    """
+    token = _current_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+
+
+def phase(name: str) -> ContextManager[None]:
+    """
+    Time a phase of the generation, if profiling
+    """
+    profiler = _current_profiler.get()
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def profile_item(kind: str, name: str) -> ContextManager[None]:
+    """
+    Time the processing of a schema or operation, if profiling
+    """
+    profiler = _current_profiler.get()
+    return profiler.item(kind, name) if profiler is not None else nullcontext()
+
+
+@contextmanager
+def cprofile(out_file: Path) -> Iterator[None]:
+    """
+    Run the block under cProfile and dump the stats (see `pstats`) to `out_file`
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(str(out_file))
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class SchemaCache:
+    """
+    Results of the analysis of schemas, keyed by schema identity.
+
+    Schemas of a dereferenced OpenAPI file are shared nodes (see `Dereferencer`), so a schema
+    used in many places is analysed only once per cache.
+    """
+
+    def __init__(self) -> None:
+        # (schema id, nested, use_literals) -> Python type
+        self.types: Dict[Tuple[int, bool, bool], str] = {}
+        # schema id -> names of the schemas it references
+        self.references: Dict[int, List[str]] = {}
+        # Keep analysed schemas alive so that their ids can't be reused by other objects
+        self._schemas: Dict[int, Any] = {}
+
+    def key(self, schema: Dict[str, Any]) -> int:
+        self._schemas[id(schema)] = schema
+        return id(schema)
+
+
+_current_cache: ContextVar[Optional[SchemaCache]] = ContextVar("schema_cache", default=None)
+
+
+def get_schema_cache() -> Optional[SchemaCache]:
+    return _current_cache.get()
+
+
+@contextmanager
+def schema_cache() -> Iterator[SchemaCache]:
+    """
+    Share schema analysis results for the duration of the block.
+
+    Nested blocks reuse the cache of the outermost one, so all generators run within a single
+    generation share the same results.
+    """
+    cache = _current_cache.get()
+    if cache is not None:
+        yield cache
+        return
+
+    cache = SchemaCache()
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
@@ -0,0 +1,81 @@
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Optional
+
+from .utils import collect_refs
+
+
+# Sections of the components which are only used through `$ref`s
+REFERENCED_COMPONENTS = (
+    "schemas",
+    "responses",
+    "parameters",
+    "examples",
+    "requestBodies",
+    "headers",
+    "links",
+    "callbacks",
+)
+
+
+def _matches(values: Iterable[str], patterns: Optional[List[str]]) -> bool:
+    return any(fnmatchcase(v, p) for v in values for p in patterns or [])
+
+
+def select_operations(
+    swagger: Dict[str, Any],
+    include_operations: Optional[List[str]] = None,
+    include_tags: Optional[List[str]] = None,
+    exclude_operations: Optional[List[str]] = None,
+    exclude_tags: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Select operations of a (non-dereferenced) OpenAPI document by their operation id or tags,
+    given as glob patterns, and keep only the components they reference, transitively.
+
+    Operations are included when they match any include pattern (all of them without include
+    patterns), unless they match an exclude pattern. Raises a ValueError if an include pattern
+    matches no operation, as it's most likely a typo. Returns a new document, `swagger` is left
+    untouched.
+    """
+    operations = [
+        (path_name, method_name, method)
+        for path_name, path in swagger["paths"].items()
+        for method_name, method in path.items()
+    ]
+
+    def get_operation_ids(method: Dict[str, Any]) -> List[str]:
+        return [method["operationId"]]
+
+    def get_tags(method: Dict[str, Any]) -> List[str]:
+        return method.get("tags", [])
+
+    for option, patterns, get_values in [
+        ("--include-operations", include_operations, get_operation_ids),
+        ("--include-tags", include_tags, get_tags),
+    ]:
+        for pattern in patterns or []:
+            if not any(_matches(get_values(method), [pattern]) for _, _, method in operations):
+                raise ValueError(f"No operation matches {option} {pattern!r}")
+
+    paths: Dict[str, Any] = {}
+    for path_name, method_name, method in operations:
+        included = not (include_operations or include_tags) or (
+            _matches(get_operation_ids(method), include_operations)
+            or _matches(get_tags(method), include_tags)
+        )
+        excluded = _matches(get_operation_ids(method), exclude_operations) or _matches(
+            get_tags(method), exclude_tags
+        )
+        if included and not excluded:
+            paths.setdefault(path_name, {})[method_name] = method
+
+    refs = collect_refs(paths, swagger)
+    components = {
+        section: {
+            name: component
+            for name, component in entries.items()
+            if section not in REFERENCED_COMPONENTS or f"#/components/{section}/{name}" in refs
+        }
+        for section, entries in swagger.get("components", {}).items()
+    }
+    return {**swagger, "paths": paths, "components": components}
@@ -0,0 +1,50 @@
+import os
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import chevron
+
+from chevron.tokenizer import tokenize
+
+from .profiling import phase
+
+
+dir_path = Path(os.path.dirname(os.path.realpath(__file__)))
+templates_path = dir_path / "templates"
+
+
+class Template:
+    """
+    Mustache template tokenized once and then rendered from its tokens, as rendering a template
+    from its source tokenizes it again on every call.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.tokens: List[Tuple[str, str]] = list(tokenize(source))
+
+    def render(self, data: Dict[str, Any]) -> str:
+        return chevron.render(self.tokens, data)
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> str:
+    """
+    Read a template, once per process
+    """
+    with open(templates_path / name, "r") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """
+    Get a template, tokenized once per process
+    """
+    return Template(load_template(name))
+
+
+def render_template(name: str, data: Dict[str, Any]) -> str:
+    with phase(f"render {name}"):
+        return get_template(name).render(data)
@@ -0,0 +1,30 @@
+import importlib
+
+from typing import TYPE_CHECKING, Any, List
+
+
+if TYPE_CHECKING:
+    from .apis import *  # noqa: F401,F403
+    from .models import *  # noqa: F401,F403
+
+    __all__: List[str]
+
+
+def __getattr__(name: str) -> Any:
+    # Apis and models are imported on first access by their subpackages, as are the names they
+    # export for `__all__` (only their `__init__.py`)
+    if name == "__all__":
+        value: Any = [
+            n
+            for subpackage in ("apis", "models")
+            for n in importlib.import_module(f".{subpackage}", __name__).__all__
+        ]
+        globals()[name] = value
+        return value
+    for subpackage in ("apis", "models"):
+        module = importlib.import_module(f".{subpackage}", __name__)
+        if name in module._modules:
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
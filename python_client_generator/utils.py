@@ -1,45 +1,152 @@
 import re
 
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+from urllib.parse import unquote
 
 import semver
 
 from python_client_generator.exceptions import UnsupportedOpenAPISpec
+from python_client_generator.schema_cache import get_schema_cache
 
 
-def lookup_by_ref_parts(obj: Dict[str, Any], ref_parts: List[str]) -> Dict[str, Any]:
-    child = obj[ref_parts[0]]
-    if len(ref_parts) == 1:
-        return child
-    else:
-        return lookup_by_ref_parts(child, ref_parts[1:])
+UNION_KEYS = ("allOf", "anyOf", "oneOf")
+
+
+@lru_cache(maxsize=None)
+def split_ref(ref: str) -> Tuple[str, ...]:
+    """
+    Unescaped tokens of the JSON pointer of a `$ref`, its fragment, e.g. `("components",
+    "schemas", "Pet")` for `#/components/schemas/Pet`. Memoized as documents reference the same
+    targets over and over.
+    """
+    pointer = unquote(ref.partition("#")[2])
+    return tuple(t.replace("~1", "/").replace("~0", "~") for t in pointer.split("/")[1:])
+
+
+def lookup_by_ref_parts(obj: Any, ref_parts: Sequence[str]) -> Any:
+    for part in ref_parts:
+        obj = obj[int(part)] if isinstance(obj, list) else obj[part]
+    return obj
 
 
 def dereference(schema: Dict[str, Any], ref: str) -> Dict[str, Any]:
-    ref_parts = ref.split("/")[1:]
-    return lookup_by_ref_parts(schema, ref_parts)
+    return lookup_by_ref_parts(schema, split_ref(ref))
 
 
-def dereference_swagger(current: Any, original: Dict[str, Any]) -> Any:
+def collect_refs(node: Any, document: Dict[str, Any]) -> Set[str]:
     """
-    Dereference an OpenAPI file in place.
-    Note: We only dereference the references that are values of a dict, not a list
+    Get all `$ref`s reachable from a node of a (non-dereferenced) OpenAPI document.
+
+    Discriminator mapping targets count as references, as some schemas may only be reached
+    through them.
+    """
+    refs: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            targets = [current.get("$ref")]
+            discriminator = current.get("discriminator")
+            if isinstance(discriminator, dict):
+                # Targets are either references or schema names
+                targets += [
+                    t if "/" in t else f"#/components/schemas/{t}"
+                    for t in discriminator.get("mapping", {}).values()
+                ]
+            for ref in targets:
+                if isinstance(ref, str) and ref not in refs:
+                    refs.add(ref)
+                    stack.append(dereference(document, ref))
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+class Dereferencer:
     """
-    if isinstance(current, dict):
-        if "$ref" in current:
-            current = dereference(original, current["$ref"])
+    Resolve the `$ref`s of an OpenAPI document into a graph of shared nodes.
 
-        return {k: dereference_swagger(v, original) for k, v in current.items()}
+    Every `$ref` target is looked up and resolved only once and is then shared by identity
+    wherever it is referenced. Recursive schemas produce a cyclic graph: a reference to a node
+    which is still being resolved returns that (partially built) node, which is completed by the
+    time the outer resolution returns.
+    """
 
-    elif isinstance(current, list):
-        return [dereference_swagger(v, original) for v in current]
-    else:
-        return current
+    def __init__(self, document: Dict[str, Any]) -> None:
+        self.document = document
+        self._targets: Dict[str, Any] = {}
+        self._nodes: Dict[int, Any] = {}
+        self._pending: List[Tuple[Any, Any]] = []
+
+    def lookup(self, ref: str) -> Any:
+        """
+        Get the raw target of a `$ref`, following chains of references to references.
+        """
+        chain: List[str] = []
+        while ref not in self._targets:
+            if ref in chain:
+                raise UnsupportedOpenAPISpec(f"Circular $ref chain: {' -> '.join(chain + [ref])}")
+            chain.append(ref)
+
+            target = dereference(self.document, ref)
+            if not (isinstance(target, dict) and "$ref" in target):
+                self._targets[ref] = target
+                break
+            ref = target["$ref"]
+
+        target = self._targets[ref]
+        for r in chain:
+            self._targets[r] = target
+        return target
+
+    def _resolve_node(self, node: Any) -> Any:
+        if isinstance(node, dict) and "$ref" in node:
+            node = self.lookup(node["$ref"])
+
+        if not isinstance(node, (dict, list)):
+            return node
+
+        if id(node) not in self._nodes:
+            # Register the (still empty) copy before visiting children so that cycles
+            # back to this node resolve to it rather than recursing
+            self._nodes[id(node)] = {} if isinstance(node, dict) else []
+            self._pending.append((node, self._nodes[id(node)]))
+
+        return self._nodes[id(node)]
+
+    def resolve(self, node: Any) -> Any:
+        """
+        Get the dereferenced counterpart of a node of the document.
+        """
+        result = self._resolve_node(node)
+
+        # Fill nodes iteratively, long chains of references would exhaust the recursion limit
+        while self._pending:
+            source, target = self._pending.pop()
+            if isinstance(source, dict):
+                for k, v in source.items():
+                    target[k] = self._resolve_node(v)
+            else:
+                target.extend(self._resolve_node(v) for v in source)
+
+        return result
+
+
+def dereference_swagger(current: Any, original: Dict[str, Any]) -> Any:
+    """
+    Dereference an OpenAPI file.
+
+    The input is left untouched. Each referenced node is resolved once and shared in the
+    returned graph, which is cyclic for recursive schemas (see `Dereferencer`).
+    """
+    return Dereferencer(original).resolve(current)
 
 
 def serialize_to_python_code(obj: Any) -> str:
     # TODO: Support List/Dict nesting
-    if isinstance(obj, (int, float, bool, list, dict)):
+    if obj is None or isinstance(obj, (int, float, bool, list, dict)):
         return str(obj)
     else:
         return f'"{obj}"'
@@ -55,22 +162,70 @@ def to_python_name(name: str) -> str:
     return name
 
 
-def resolve_type(schema: Dict[str, Any], depth: int = 0, use_literals: bool = False) -> str:
+def get_union_key(schema: Dict[str, Any]) -> Optional[str]:
     """
-    Resolve Python type for a given schema
+    Get which of `allOf`, `anyOf` or `oneOf` a schema is a union of, if any
+    """
+    return next((k for k in UNION_KEYS if k in schema), None)
+
+
+def resolve_type(
+    schema: Dict[str, Any],
+    depth: int = 0,
+    use_literals: bool = False,
+    _ancestors: FrozenSet[int] = frozenset(),
+    _fallbacks: Optional[List[int]] = None,
+) -> str:
     """
+    Resolve Python type for a given schema
 
+    Results are memoized in the current schema cache, if any (see `schema_cache`).
+    """
+    fallbacks: List[int] = []
+    cache = get_schema_cache()
+    if cache is None:
+        type_ = _resolve_type(schema, depth, use_literals, _ancestors, fallbacks)
+    else:
+        key = (cache.key(schema), depth > 0, use_literals)
+        if key in cache.types:
+            return cache.types[key]
+        type_ = _resolve_type(schema, depth, use_literals, _ancestors, fallbacks)
+        if not fallbacks:
+            # Types falling back to Any for recursive schemas depend on where the resolution
+            # started, so they aren't memoized
+            cache.types[key] = type_
+
+    if _fallbacks is not None:
+        _fallbacks += fallbacks
+    return type_
+
+
+def _resolve_type(
+    schema: Dict[str, Any],
+    depth: int,
+    use_literals: bool,
+    _ancestors: FrozenSet[int],
+    _fallbacks: List[int],
+) -> str:
     if "title" in schema and depth > 0:
         # Just return title for any nested types to prevent elaborating
         # Unions, etc.
         return schema["title"]
 
-    union_keys = list(set(["allOf", "anyOf", "oneOf"]) & set(schema.keys()))
-    if union_keys:
+    if id(schema) in _ancestors:
+        # Untitled recursive schema, it can't be named so fall back to Any
+        _fallbacks.append(id(schema))
+        return "Any"
+    _ancestors = _ancestors | {id(schema)}
+
+    union_key = get_union_key(schema)
+    if union_key:
         # Handle union cases
         result: List[str] = []
-        for sub_schema in schema[union_keys[0]]:
-            type_ = resolve_type(sub_schema, depth + 1)
+        for sub_schema in schema[union_key]:
+            type_ = resolve_type(
+                sub_schema, depth + 1, _ancestors=_ancestors, _fallbacks=_fallbacks
+            )
             result.append(type_)
         if len(result) > 1:
             return f"Union[{', '.join(result)}]"
@@ -124,7 +279,10 @@ def resolve_type(schema: Dict[str, Any], depth: int = 0, use_literals: bool = Fa
     elif schema["type"] == "number":
         return "float"
     elif schema["type"] == "array":
-        return "List[" + resolve_type(schema["items"], depth + 1) + "]"
+        items_type = resolve_type(
+            schema["items"], depth + 1, _ancestors=_ancestors, _fallbacks=_fallbacks
+        )
+        return f"List[{items_type}]"
 
     raise Exception("property: ", schema)
 
@@ -137,7 +295,7 @@ def assert_openapi_version(schema: Dict[str, Any]) -> None:
 def add_schema_title_if_missing(schemas: Dict[str, Any]) -> Dict[str, Any]:
     """
     Add 'title' key to schemas if missing to prevent issues with type resolution.
-    Only adds title to object and enum schemas.
+    Only adds title to object and enum schemas, references to other schemas are skipped.
 
     Args:
         schemas (Dict[str, Any]): Swagger schemas under components.schemas
@@ -149,7 +307,7 @@ def add_schema_title_if_missing(schemas: Dict[str, Any]) -> Dict[str, Any]:
     """
 
     for k, v in schemas.items():
-        if "title" not in v and isinstance(v, dict):
+        if "title" not in v and isinstance(v, dict) and "$ref" not in v:
             schema_type = v.get("type")
 
             if not schema_type:
@@ -159,3 +317,55 @@ def add_schema_title_if_missing(schemas: Dict[str, Any]) -> Dict[str, Any]:
                 v["title"] = k
 
     return schemas
+
+
+def strongly_connected_components(edges: List[List[int]]) -> List[List[int]]:
+    """
+    Tarjan's algorithm over the graph given as adjacency lists of node indexes.
+
+    Components are returned in dependency order (a component comes after every component
+    it has edges to) and are made of node indexes in ascending order. Implemented
+    iteratively as large specs would otherwise exceed the recursion limit.
+    """
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    stack: List[int] = []
+    on_stack: Set[int] = set()
+    components: List[List[int]] = []
+
+    for root in range(len(edges)):
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if w not in index:
+                    index[w] = lowlink[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(edges[w])))
+                    break
+                elif w in on_stack:
+                    lowlink[v] = min(lowlink[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+
+                if lowlink[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.remove(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(sorted(component))
+
+    return components
@@ -0,0 +1,51 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+from msgspec import Meta, Struct
+from typing_extensions import Annotated
+
+
+class FooEnum(str, Enum):
+    OPTION_1 = "option_1"
+    OPTION_2 = "option_2"
+
+
+class Bar(Struct, kw_only=True):
+    field_1: str
+    field_2: Optional[bool] = None
+
+
+class Document(Struct, kw_only=True):
+    field_1: str
+
+
+class Foo(Struct, kw_only=True):
+    field_1: str
+    field_2: int
+    field_3: Optional[float] = None
+    field_4: Optional[bool] = None
+    field_5: Optional[str] = "default"
+    field_6: Optional[str] = "default"
+    field_7: Optional[Bar] = None
+    field_8: Optional[str] = None
+
+
+class ValidationError(Struct, kw_only=True):
+    loc: List[Union[str, int]]
+    msg: str
+    type: str
+
+
+class HTTPValidationError(Struct, kw_only=True):
+    detail: Optional[List[ValidationError]] = None
+
+
+class PaginatedFoo(Struct, kw_only=True):
+    results: List[Foo]
+    offset: int
+    limit: int
+    size: int
+
+
@@ -0,0 +1,201 @@
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+from pydantic import TypeAdapter
+
+from .base_client import BaseClient
+from .models import *
+
+
+class Api(BaseClient):
+    """
+    Autogenerated httpx async client
+    """
+    async def read_foo_api_foo__foo_id__get(
+        self,
+        foo_id: UUID,
+        **kwargs: Any
+    ) -> Foo:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            f"/api/foo/{foo_id}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Foo.model_validate_json(response.content)
+
+    async def put_foo_api_foo__foo_id__put(
+        self,
+        foo_id: UUID,
+        **kwargs: Any
+    ) -> Foo:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "PUT",
+            f"/api/foo/{foo_id}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Foo.model_validate_json(response.content)
+
+    async def delete_foo_api_foo__foo_id__delete(
+        self,
+        foo_id: UUID,
+        **kwargs: Any
+    ) -> Foo:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "DELETE",
+            f"/api/foo/{foo_id}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Foo.model_validate_json(response.content)
+
+    async def update_foo_api_foo__foo_id__patch(
+        self,
+        foo_id: UUID,
+        **kwargs: Any
+    ) -> Foo:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "PATCH",
+            f"/api/foo/{foo_id}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Foo.model_validate_json(response.content)
+
+    async def list_foos_api_foo_get(
+        self,
+        some_field: Optional[str] = None,
+        show_deleted: bool = False,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 10,
+        **kwargs: Any
+    ) -> PaginatedFoo:
+        """
+        
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if some_field is not None:
+            _params["some_field"] = some_field
+        if show_deleted is not None:
+            _params["show_deleted"] = show_deleted
+        if offset is not None:
+            _params["offset"] = offset
+        if limit is not None:
+            _params["limit"] = limit
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "GET",
+            "/api/foo",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+        return PaginatedFoo.model_validate_json(response.content)
+
+    async def paginate_list_foos_api_foo_get(
+        self,
+        some_field: Optional[str] = None,
+        show_deleted: bool = False,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 10,
+        _prefetch: int = 4,
+        **kwargs: Any
+    ) -> AsyncIterator[Foo]:
+        """
+        Iterates over the `results` of the pages of `list_foos_api_foo_get`, from `offset`,
+        fetching up to `_prefetch` of the next pages concurrently
+        """ # noqa
+
+        def fetch_page(offset: int) -> Awaitable[PaginatedFoo]:
+            return self.list_foos_api_foo_get(
+                some_field=some_field,
+                show_deleted=show_deleted,
+                limit=limit,
+                offset=offset,
+                **kwargs
+            )
+
+        pages = self._paginate_offset(
+            fetch_page,
+            lambda page: page.results or [],
+            offset or 0,
+            limit,
+            None,
+            _prefetch,
+        )
+        async for page in pages:
+            for item in page.results or []:
+                yield item
+
+    async def create_foo_api_foo_post(
+        self,
+        body: Foo,
+        x_custom_header: Optional[str] = "default_value",
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> Foo:
+        """
+        
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if x_custom_header is not None:
+            _headers["x-custom-header"] = x_custom_header
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "POST",
+            "/api/foo",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return Foo.model_validate_json(response.content)
+
+    async def upload_doc_api_foo__foo_id__documents_post(
+        self,
+        file: httpx._types.FileTypes,
+        foo_id: UUID,
+        **kwargs: Any
+    ) -> Document:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "POST",
+            f"/api/foo/{foo_id}/documents",
+            files={
+                "file": file,
+            },
+            **kwargs
+        )
+        response.raise_for_status()
+        return Document.model_validate_json(response.content)
+
+
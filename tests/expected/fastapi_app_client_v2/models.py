@@ -0,0 +1,50 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, Field, RootModel
+
+
+class FooEnum(str, Enum):
+    OPTION_1 = "option_1"
+    OPTION_2 = "option_2"
+
+
+class Bar(BaseModel):
+    field_1: str
+    field_2: Optional[bool] = None
+
+
+class Document(BaseModel):
+    field_1: str
+
+
+class Foo(BaseModel):
+    field_1: str
+    field_2: int
+    field_3: Optional[float] = None
+    field_4: Optional[bool] = None
+    field_5: Optional[str] = Field(default="default")
+    field_6: Optional[str] = Field(default="default")
+    field_7: Optional[Bar] = None
+    field_8: Optional[str] = None
+
+
+class ValidationError(BaseModel):
+    loc: List[Union[str, int]]
+    msg: str
+    type: str
+
+
+class HTTPValidationError(BaseModel):
+    detail: Optional[List[ValidationError]] = None
+
+
+class PaginatedFoo(BaseModel):
+    results: List[Foo]
+    offset: int
+    limit: int
+    size: int
+
+
@@ -1,8 +1,8 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Union
 
 import httpx
 
-from .base_client import BaseClient
+from .base_client import BaseClient, RootParser, construct
 from .models import *
 
 
@@ -14,102 +14,196 @@ class Api(BaseClient):
         self,
         body: Pet,
         body_serializer_args: Dict[str, Any] = {},
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> Pet:
         """
         Update an existing pet by Id
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "PUT",
             "/pet",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
-        return Pet.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Pet, content)
+        return Pet.parse_obj(content)
 
     async def addPet(
         self,
         body: Pet,
         body_serializer_args: Dict[str, Any] = {},
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> Pet:
         """
         Add a new pet to the store
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "POST",
             "/pet",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
-        return Pet.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Pet, content)
+        return Pet.parse_obj(content)
 
     async def findPetsByStatus(
         self,
         status: Optional[str] = "available",
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> List[Pet]:
         """
         Multiple status values can be provided with comma separated strings
         """ # noqa 
 
-        _query_params = { 
-            "status": status,
-        }
+        _params: Dict[str, Any] = {}
+        if status is not None:
+            _params["status"] = getattr(status, "value", status)
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             "/pet/findByStatus",
-            _query_params=_query_params, 
+            params=_params,
             **kwargs
         )
         response.raise_for_status()
-        return List[Pet].parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(List[Pet], content)
+        return _List_Pet_parser.parse_obj(content)
+
+    async def iter_findPetsByStatus(
+        self,
+        status: Optional[str] = "available",
+        _validate: Optional[bool] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Pet]:
+        """
+        Streams the items of the response of `findPetsByStatus` one at a time
+
+        Multiple status values can be provided with comma separated strings
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if status is not None:
+            _params["status"] = getattr(status, "value", status)
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        async with self.stream(
+            "GET",
+            "/pet/findByStatus",
+            params=_params,
+            **kwargs
+        ) as response:
+            response.raise_for_status()
+            _validate = self.validate if _validate is None else _validate
+            async for item in self._iter_json_array(response):
+                yield _Pet_parser.parse_obj(item) if _validate else construct(Pet, item)
 
     async def findPetsByTags(
         self,
         tags: Optional[List[str]] = None,
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> List[Pet]:
         """
         Multiple tags can be provided with comma separated strings. Use tag1, tag2, tag3 for testing.
         """ # noqa 
 
-        _query_params = { 
-            "tags": tags,
-        }
+        _params: Dict[str, Any] = {}
+        if tags is not None:
+            _params["tags"] = tags
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             "/pet/findByTags",
-            _query_params=_query_params, 
+            params=_params,
             **kwargs
         )
         response.raise_for_status()
-        return List[Pet].parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(List[Pet], content)
+        return _List_Pet_parser.parse_obj(content)
+
+    async def iter_findPetsByTags(
+        self,
+        tags: Optional[List[str]] = None,
+        _validate: Optional[bool] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Pet]:
+        """
+        Streams the items of the response of `findPetsByTags` one at a time
+
+        Multiple tags can be provided with comma separated strings. Use tag1, tag2, tag3 for testing.
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if tags is not None:
+            _params["tags"] = tags
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        async with self.stream(
+            "GET",
+            "/pet/findByTags",
+            params=_params,
+            **kwargs
+        ) as response:
+            response.raise_for_status()
+            _validate = self.validate if _validate is None else _validate
+            async for item in self._iter_json_array(response):
+                yield _Pet_parser.parse_obj(item) if _validate else construct(Pet, item)
 
     async def getPetById(
         self,
         petId: int,
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> Pet:
         """
         Returns a single pet
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             f"/pet/{petId}",
             **kwargs
         )
         response.raise_for_status()
-        return Pet.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Pet, content)
+        return Pet.parse_obj(content)
 
     async def updatePetWithForm(
         self,
@@ -122,15 +216,17 @@ class Api(BaseClient):
         
         """ # noqa 
 
-        _query_params = { 
+        _params: Dict[str, Any] = {
             "name": name,
             "status": status,
         }
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
 
-        response = await self._request(
+        response = await self.request(
             "POST",
             f"/pet/{petId}",
-            _query_params=_query_params, 
+            params=_params,
             **kwargs
         )
         response.raise_for_status()
@@ -145,14 +241,16 @@ class Api(BaseClient):
         delete a pet
         """ # noqa 
 
-        _headers = { 
-            "api_key": api_key,
-        }
+        _headers: Dict[str, Any] = {}
+        if api_key is not None:
+            _headers["api_key"] = api_key
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
 
-        response = await self._request(
+        response = await self.request(
             "DELETE",
             f"/pet/{petId}",
-            _headers=_headers,
+            headers=_headers,
             **kwargs
         )
         response.raise_for_status()
@@ -161,77 +259,101 @@ class Api(BaseClient):
         self,
         petId: int,
         additionalMetadata: Optional[str] = None,
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> ApiResponse:
         """
         
         """ # noqa 
 
-        _query_params = { 
-            "additionalMetadata": additionalMetadata,
-        }
+        _params: Dict[str, Any] = {}
+        if additionalMetadata is not None:
+            _params["additionalMetadata"] = additionalMetadata
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
 
-        response = await self._request(
+        response = await self.request(
             "POST",
             f"/pet/{petId}/uploadImage",
-            _query_params=_query_params, 
+            params=_params,
             **kwargs
         )
         response.raise_for_status()
-        return ApiResponse.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(ApiResponse, content)
+        return ApiResponse.parse_obj(content)
 
     async def getInventory(
         self,
+        _validate: Optional[bool] = None,
         **kwargs: Any
-    ) -> DictstrAny:
+    ) -> Dict[str, Any]:
         """
         Returns a map of status codes to quantities
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             "/store/inventory",
             **kwargs
         )
         response.raise_for_status()
-        return DictstrAny.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Dict[str, Any], content)
+        return _Dict_str_Any_parser.parse_obj(content)
 
     async def placeOrder(
         self,
         body: Order,
         body_serializer_args: Dict[str, Any] = {},
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> Order:
         """
         Place a new order in the store
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "POST",
             "/store/order",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
-        return Order.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Order, content)
+        return Order.parse_obj(content)
 
     async def getOrderById(
         self,
         orderId: int,
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> Order:
         """
         For valid response try integer IDs with value &lt;= 5 or &gt; 10. Other values will generate exceptions.
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             f"/store/order/{orderId}",
             **kwargs
         )
         response.raise_for_status()
-        return Order.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(Order, content)
+        return Order.parse_obj(content)
 
     async def deleteOrder(
         self,
@@ -242,7 +364,7 @@ class Api(BaseClient):
         For valid response try integer IDs with value &lt; 1000. Anything above 1000 or nonintegers will generate API errors
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "DELETE",
             f"/store/order/{orderId}",
             **kwargs
@@ -253,41 +375,61 @@ class Api(BaseClient):
         self,
         body: User,
         body_serializer_args: Dict[str, Any] = {},
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> User:
         """
         This can only be done by the logged in user.
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "POST",
             "/user",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
-        return User.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(User, content)
+        return User.parse_obj(content)
 
     async def createUsersWithListInput(
         self,
         body: List[User],
         body_serializer_args: Dict[str, Any] = {},
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> User:
         """
         Creates list of users with given input array
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "POST",
             "/user/createWithList",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
-        return User.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(User, content)
+        return User.parse_obj(content)
 
     async def loginUser(
         self,
@@ -299,15 +441,18 @@ class Api(BaseClient):
         
         """ # noqa 
 
-        _query_params = { 
-            "username": username,
-            "password": password,
-        }
+        _params: Dict[str, Any] = {}
+        if username is not None:
+            _params["username"] = username
+        if password is not None:
+            _params["password"] = password
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             "/user/login",
-            _query_params=_query_params, 
+            params=_params,
             **kwargs
         )
         response.raise_for_status()
@@ -320,7 +465,7 @@ class Api(BaseClient):
         
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             "/user/logout",
             **kwargs
@@ -330,19 +475,23 @@ class Api(BaseClient):
     async def getUserByName(
         self,
         username: str,
+        _validate: Optional[bool] = None,
         **kwargs: Any
     ) -> User:
         """
         
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "GET",
             f"/user/{username}",
             **kwargs
         )
         response.raise_for_status()
-        return User.parse_raw(response.content)
+        content = self.json_codec.loads(response.content)
+        if not (self.validate if _validate is None else _validate):
+            return construct(User, content)
+        return User.parse_obj(content)
 
     async def updateUser(
         self,
@@ -355,11 +504,17 @@ class Api(BaseClient):
         This can only be done by the logged in user.
         """ # noqa 
 
-        response = await self._request(
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
             "PUT",
             f"/user/{username}",
-            _body=body,
-            body_serializer_args=body_serializer_args,
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
             **kwargs
         )
         response.raise_for_status()
@@ -373,7 +528,7 @@ class Api(BaseClient):
         This can only be done by the logged in user.
         """ # noqa 
 
-        response = await self._request(
+        response = await self.request(
             "DELETE",
             f"/user/{username}",
             **kwargs
@@ -381,3 +536,6 @@ class Api(BaseClient):
         response.raise_for_status()
 
 
+_List_Pet_parser = RootParser(List[Pet])
+_Pet_parser = RootParser(Pet)
+_Dict_str_Any_parser = RootParser(Dict[str, Any])
@@ -1,14 +1,291 @@
+import asyncio
+import codecs
+import json
+
+from collections import deque
 from enum import Enum
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import UUID
 
 import httpx
 
 
 try:
-    from pydantic.v1 import BaseModel
+    from pydantic.v1 import BaseModel, create_model
+    from pydantic.v1.json import pydantic_encoder
+except ImportError:
+    from pydantic import BaseModel, create_model
+    from pydantic.json import pydantic_encoder
+
+try:
+    import orjson
 except ImportError:
-    from pydantic import BaseModel
+    orjson = None  # type: ignore[assignment]
+
+
+class JSONCodec:
+    """
+    Serializes request bodies to JSON bytes and parses responses from JSON bytes, with the
+    standard library
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=pydantic_encoder, separators=(",", ":")).encode()
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Serializes request bodies to JSON bytes and parses responses from JSON bytes, with orjson
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, content: bytes) -> Any:
+        return orjson.loads(content)
+
+
+default_json_codec: JSONCodec = OrjsonCodec() if orjson is not None else JSONCodec()
+
+
+class RootParser:
+    """
+    Parses objects into a type which is not a model (e.g. `List[Model]`) with a root model built
+    once, unlike `parse_obj_as` which looks one up on every call
+    """
+
+    def __init__(self, type_: Any) -> None:
+        self._model = create_model(f"RootParser[{type_}]", __root__=(type_, ...))
+
+    def parse_obj(self, obj: Any) -> Any:
+        return self._model.parse_obj(obj).__root__  # type: ignore[attr-defined]
+
+
+@lru_cache(maxsize=None)
+def _get_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, str, Any, bool], ...]:
+    """
+    Name, alias, type and whether it's required of each field of a model
+    """
+    return tuple(
+        (name, field.alias, field.outer_type_, field.required is True)
+        for name, field in model.__fields__.items()
+    )
+
+
+def _is_model(type_: Any) -> bool:
+    return isinstance(type_, type) and issubclass(type_, BaseModel)
+
+
+def _is_root_model(model: Type[BaseModel]) -> bool:
+    return model.__custom_root_type__
+
+
+def _matches(type_: Any, obj: Any) -> bool:
+    """
+    Whether `obj` is the JSON of `type_`, to pick the member of a union to construct
+    """
+    origin = getattr(type_, "__origin__", None)
+    if origin is list:
+        return isinstance(obj, list)
+    if origin is dict:
+        return isinstance(obj, dict)
+    if not _is_model(type_):
+        return False
+    if _is_root_model(type_):
+        ((_, _, root_type, _),) = _get_fields(type_)
+        return _matches(root_type, obj)
+    if not isinstance(obj, dict):
+        return False
+    for _, alias, field_type, required in _get_fields(type_):
+        if alias not in obj:
+            if required:
+                return False
+        elif getattr(field_type, "__origin__", None) is Literal:
+            # Members of discriminated unions only match their tags
+            if obj[alias] not in field_type.__args__:
+                return False
+    return True
+
+
+# Builders of JSON into each type without validation, `None` when the JSON is kept as is
+_builders: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+
+
+def _get_builder(type_: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Function building the (not null) JSON of `type_` without validation, created once per type
+    """
+    if type_ in _builders:
+        return _builders[type_]
+
+    builder: Optional[Callable[[Any], Any]] = None
+    origin = getattr(type_, "__origin__", None)
+    if origin is Union:
+        builders = [(t, _get_builder(t)) for t in type_.__args__]
+        members = [(t, build) for t, build in builders if build is not None]
+        if members:
+
+            def builder(obj: Any) -> Any:
+                return next((build(obj) for t, build in members if _matches(t, obj)), obj)
+
+    elif origin is list:
+        build_item = _get_builder(type_.__args__[0])
+        if build_item is not None:
+
+            def builder(obj: Any) -> Any:
+                return [None if item is None else build_item(item) for item in obj]
+
+    elif origin is dict:
+        build_value = _get_builder(type_.__args__[1])
+        if build_value is not None:
+
+            def builder(obj: Any) -> Any:
+                return {k: None if v is None else build_value(v) for k, v in obj.items()}
+
+    elif _is_model(type_):
+        builder = _get_model_builder(type_)
+
+    _builders[type_] = builder
+    return builder
+
+
+def _get_model_builder(model: Type[BaseModel]) -> Callable[[Any], Any]:
+    fields: List[Tuple[str, str, Optional[Callable[[Any], Any]]]] = []
+    construct_model = model.construct
+
+    if _is_root_model(model):
+
+        def build_model(obj: Any) -> Any:
+            ((name, _, build),) = fields
+            return construct_model(**{name: obj if build is None else build(obj)})
+
+    else:
+
+        def build_model(obj: Any) -> Any:
+            values = {}
+            for name, alias, build in fields:
+                if alias in obj:
+                    value = obj[alias]
+                    values[name] = value if build is None or value is None else build(value)
+            return construct_model(**values)
+
+    # Registered before the builders of the fields are created, for recursive models
+    _builders[model] = build_model
+    fields.extend(
+        (name, alias, _get_builder(field_type)) for name, alias, field_type, _ in _get_fields(model)
+    )
+    return build_model
+
+
+def construct(type_: Any, obj: Any) -> Any:
+    """
+    Builds the JSON `obj` into `type_` without validation, recursively for nested models. Values
+    are neither checked nor converted, e.g. datetimes are kept as strings
+    """
+    build = _get_builder(type_)
+    return obj if build is None or obj is None else build(obj)
+
+
+class JSONArrayParser:
+    """
+    Incremental parser of the items of a top-level JSON array, fed with the chunks of its content
+    """
+
+    def __init__(self) -> None:
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        # Text left to parse, kept as a list of chunks joined once there is enough of it
+        self._chunks: List[str] = []
+        self._length = 0
+        # Length the text must reach before an incomplete item is parsed again, doubling each
+        # time so that large items are parsed in linear time
+        self._min_length = 0
+        self._started = False
+        self._ended = False
+        self._has_items = False
+        self._after_item = False
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in " \t\n\r":
+            pos += 1
+        return pos
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        """
+        Returns the items completed by `chunk`, `final` being whether it's the last chunk
+        """
+        text = self._text_decoder.decode(chunk, final)
+        self._chunks.append(text)
+        self._length += len(text)
+        if self._length < self._min_length and not final:
+            return []
+
+        buffer = "".join(self._chunks)
+        items = []
+        pos, incomplete = 0, False
+        while True:
+            pos = self._skip_whitespace(buffer, pos)
+            if pos == len(buffer):
+                break
+
+            char = buffer[pos]
+            if self._ended:
+                raise ValueError(f"Unexpected {char!r} after the JSON array")
+            elif not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._started = True
+                pos += 1
+            elif char == "]" and (self._after_item or not self._has_items):
+                self._ended = True
+                pos += 1
+            elif self._after_item:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' after an item, got {char!r}")
+                self._after_item = False
+                pos += 1
+            else:
+                try:
+                    item, end = self._json_decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    incomplete = True
+                    break
+                next_pos = self._skip_whitespace(buffer, end)
+                if not final and (next_pos == len(buffer) or buffer[next_pos] not in ",]"):
+                    # Numbers may be continued by the next chunk, e.g. "1" by ".5"
+                    incomplete = True
+                    break
+                items.append(item)
+                self._has_items = self._after_item = True
+                pos = end
+
+        # Parsing resumes from the first unparsed character, i.e. the start of an incomplete item
+        self._chunks = [buffer[pos:]] if pos < len(buffer) else []
+        self._length = len(buffer) - pos
+        self._min_length = 2 * self._length if incomplete else 0
+        if final and not self._ended:
+            raise ValueError("Incomplete JSON array")
+        return items
 
 
 class BaseClient(httpx.AsyncClient):
@@ -16,8 +293,28 @@ class BaseClient(httpx.AsyncClient):
     Base client for serializing Pydantic models and enums into httpx requests
     """
 
+    def __init__(
+        self,
+        *args: Any,
+        json_codec: Optional[JSONCodec] = None,
+        validate: bool = True,
+        **kwargs: Any
+    ) -> None:
+        """
+        `json_codec` serializes request bodies and parses responses, defaults to orjson when
+        installed and to the standard library otherwise. `validate=False` builds responses
+        without validating them, for trusted services, unless enabled again for a call with
+        `_validate=True`
+        """
+        super().__init__(*args, **kwargs)
+        self.json_codec = json_codec or default_json_codec
+        self.validate = validate
+
     @staticmethod
     def _serialize_param(v: Any) -> Any:
+        """
+        Serializes the enums and UUIDs of parameters whose type isn't known when generating
+        """
         if isinstance(v, Enum):
             return v.value
         elif isinstance(v, UUID):
@@ -25,41 +322,93 @@ class BaseClient(httpx.AsyncClient):
         else:
             return v
 
-    async def _request(
-        self,
-        *args: Any,
-        _query_params: Dict[str, Any] = {},
-        _headers: Dict[str, Any] = {},
-        _multipart_data: Dict[str, Any] = {},
-        _body: Optional[BaseModel] = None,
-        body_serializer_args: Dict[str, Any] = {},
-        **kwargs: Any
-    ) -> httpx.Response:
+    def _json_body(self, body: Any, serializer_args: Dict[str, Any]) -> bytes:
+        """
+        Serializes the body of a request, a model or e.g. a list of models, to JSON. The
+        serializer arguments only apply to models
         """
-        Wrapper class for serializing pydantic models and enums into params/header/body
-        and sending a request
+        if not isinstance(body, BaseModel):
+            return self.json_codec.dumps(body)
+        data = body.dict(**serializer_args)
+        return self.json_codec.dumps(data["__root__"] if body.__custom_root_type__ else data)
+
+    @staticmethod
+    async def _iter_json_array(
+        response: httpx.Response,
+    ) -> AsyncIterator[Any]:
+        """
+        Decodes the items of a JSON array response one at a time, as its content is streamed
+        """
+        parser = JSONArrayParser()
+        async for chunk in response.aiter_bytes():
+            for item in parser.feed(chunk):
+                yield item
+        for item in parser.feed(b"", final=True):
+            yield item
+
+    @staticmethod
+    async def _paginate_offset(
+        fetch_page: Callable[[int], Awaitable[Any]],
+        get_items: Callable[[Any], List[Any]],
+        offset: int,
+        limit: Optional[int],
+        get_total: Optional[Callable[[Any], Optional[int]]],
+        prefetch: int,
+    ) -> AsyncIterator[Any]:
         """
+        Pages of an offset/limit paginated endpoint from `offset`, fetching up to `prefetch` of the
+        next pages concurrently over the connection pool of the client, until the total is
+        reached or, without a total in the responses, until a page has fewer items than `limit`
+        (pages after the last one may then be fetched for nothing). Pages are fetched ahead at
+        the offsets of pages as large as the first one, which the server may cap below `limit`
+        """
+        page = await fetch_page(offset)
+        yield page
+
+        total = get_total(page) if get_total else None
+        step = received = len(get_items(page))
+        offset += received
+        next_offset = offset
+        pending: Deque["asyncio.Future[Any]"] = deque()
+        try:
+            while received and (
+                offset < total if total is not None else limit is None or received >= limit
+            ):
+                while len(pending) < max(prefetch, 1) and (total is None or next_offset < total):
+                    pending.append(asyncio.ensure_future(fetch_page(next_offset)))
+                    next_offset += step
+                page = await pending.popleft()
+                yield page
+
+                received = len(get_items(page))
+                offset += received
+                if received != step:
+                    # The pages fetched ahead don't start where this one ends
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+                    next_offset = offset
+        finally:
+            for future in pending:
+                future.cancel()
 
-        kwargs["params"] = {
-            **{k: self._serialize_param(v) for k, v in _query_params.items() if v is not None},
-            **kwargs.get("params", {}),
-        }
-
-        kwargs["headers"] = {
-            **{k: self._serialize_param(v) for k, v in _headers.items() if v is not None},
-            **kwargs.get("headers", {}),
-        }
-
-        kwargs["data"] = {
-            **{k: self._serialize_param(v) for k, v in _multipart_data.items() if v is not None},
-            **kwargs.get("data", {}),
-        }
-
-        if _body:
-            kwargs["content"] = _body.json(**body_serializer_args)
-            kwargs["headers"] = {
-                **{"Content-Type": "application/json"},
-                **kwargs.get("headers", {}),
-            }
-
-        return await self.request(*args, **kwargs)
+    @staticmethod
+    async def _paginate_cursor(
+        fetch_page: Callable[[Any], Awaitable[Any]],
+        get_next_cursor: Callable[[Any], Any],
+        cursor: Any,
+    ) -> AsyncIterator[Any]:
+        """
+        Pages of a cursor paginated endpoint from `cursor`, fetching each page while the previous
+        one is consumed
+        """
+        future: Optional["asyncio.Future[Any]"] = asyncio.ensure_future(fetch_page(cursor))
+        try:
+            while future is not None:
+                page = await future
+                cursor = get_next_cursor(page)
+                future = asyncio.ensure_future(fetch_page(cursor)) if cursor else None
+                yield page
+        finally:
+            if future is not None:
+                future.cancel()
@@ -0,0 +1,213 @@
+import asyncio
+import codecs
+import json
+
+from collections import deque
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+)
+from uuid import UUID
+
+import httpx
+import msgspec
+
+
+_encoder = msgspec.json.Encoder()
+
+
+class JSONArrayParser:
+    """
+    Incremental parser of the items of a top-level JSON array, fed with the chunks of its content
+    """
+
+    def __init__(self) -> None:
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        # Text left to parse, kept as a list of chunks joined once there is enough of it
+        self._chunks: List[str] = []
+        self._length = 0
+        # Length the text must reach before an incomplete item is parsed again, doubling each
+        # time so that large items are parsed in linear time
+        self._min_length = 0
+        self._started = False
+        self._ended = False
+        self._has_items = False
+        self._after_item = False
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in " \t\n\r":
+            pos += 1
+        return pos
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        """
+        Returns the items completed by `chunk`, `final` being whether it's the last chunk
+        """
+        text = self._text_decoder.decode(chunk, final)
+        self._chunks.append(text)
+        self._length += len(text)
+        if self._length < self._min_length and not final:
+            return []
+
+        buffer = "".join(self._chunks)
+        items = []
+        pos, incomplete = 0, False
+        while True:
+            pos = self._skip_whitespace(buffer, pos)
+            if pos == len(buffer):
+                break
+
+            char = buffer[pos]
+            if self._ended:
+                raise ValueError(f"Unexpected {char!r} after the JSON array")
+            elif not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._started = True
+                pos += 1
+            elif char == "]" and (self._after_item or not self._has_items):
+                self._ended = True
+                pos += 1
+            elif self._after_item:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' after an item, got {char!r}")
+                self._after_item = False
+                pos += 1
+            else:
+                try:
+                    item, end = self._json_decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    incomplete = True
+                    break
+                next_pos = self._skip_whitespace(buffer, end)
+                if not final and (next_pos == len(buffer) or buffer[next_pos] not in ",]"):
+                    # Numbers may be continued by the next chunk, e.g. "1" by ".5"
+                    incomplete = True
+                    break
+                items.append(item)
+                self._has_items = self._after_item = True
+                pos = end
+
+        # Parsing resumes from the first unparsed character, i.e. the start of an incomplete item
+        self._chunks = [buffer[pos:]] if pos < len(buffer) else []
+        self._length = len(buffer) - pos
+        self._min_length = 2 * self._length if incomplete else 0
+        if final and not self._ended:
+            raise ValueError("Incomplete JSON array")
+        return items
+
+
+class BaseClient(httpx.AsyncClient):
+    """
+    Base client for serializing msgspec Structs and enums into httpx requests
+    """
+
+    @staticmethod
+    def _serialize_param(v: Any) -> Any:
+        """
+        Serializes the enums and UUIDs of parameters whose type isn't known when generating
+        """
+        if isinstance(v, Enum):
+            return v.value
+        elif isinstance(v, UUID):
+            return str(v)
+        else:
+            return v
+
+    @staticmethod
+    def _json_body(body: Any) -> bytes:
+        """
+        Serializes the body of a request, a Struct or e.g. a list of Structs, to JSON
+        """
+        return _encoder.encode(body)
+
+    @staticmethod
+    async def _iter_json_array(
+        response: httpx.Response,
+    ) -> AsyncIterator[Any]:
+        """
+        Decodes the items of a JSON array response one at a time, as its content is streamed
+        """
+        parser = JSONArrayParser()
+        async for chunk in response.aiter_bytes():
+            for item in parser.feed(chunk):
+                yield item
+        for item in parser.feed(b"", final=True):
+            yield item
+
+    @staticmethod
+    async def _paginate_offset(
+        fetch_page: Callable[[int], Awaitable[Any]],
+        get_items: Callable[[Any], List[Any]],
+        offset: int,
+        limit: Optional[int],
+        get_total: Optional[Callable[[Any], Optional[int]]],
+        prefetch: int,
+    ) -> AsyncIterator[Any]:
+        """
+        Pages of an offset/limit paginated endpoint from `offset`, fetching up to `prefetch` of the
+        next pages concurrently over the connection pool of the client, until the total is
+        reached or, without a total in the responses, until a page has fewer items than `limit`
+        (pages after the last one may then be fetched for nothing). Pages are fetched ahead at
+        the offsets of pages as large as the first one, which the server may cap below `limit`
+        """
+        page = await fetch_page(offset)
+        yield page
+
+        total = get_total(page) if get_total else None
+        step = received = len(get_items(page))
+        offset += received
+        next_offset = offset
+        pending: Deque["asyncio.Future[Any]"] = deque()
+        try:
+            while received and (
+                offset < total if total is not None else limit is None or received >= limit
+            ):
+                while len(pending) < max(prefetch, 1) and (total is None or next_offset < total):
+                    pending.append(asyncio.ensure_future(fetch_page(next_offset)))
+                    next_offset += step
+                page = await pending.popleft()
+                yield page
+
+                received = len(get_items(page))
+                offset += received
+                if received != step:
+                    # The pages fetched ahead don't start where this one ends
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+                    next_offset = offset
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    async def _paginate_cursor(
+        fetch_page: Callable[[Any], Awaitable[Any]],
+        get_next_cursor: Callable[[Any], Any],
+        cursor: Any,
+    ) -> AsyncIterator[Any]:
+        """
+        Pages of a cursor paginated endpoint from `cursor`, fetching each page while the previous
+        one is consumed
+        """
+        future: Optional["asyncio.Future[Any]"] = asyncio.ensure_future(fetch_page(cursor))
+        try:
+            while future is not None:
+                page = await future
+                cursor = get_next_cursor(page)
+                future = asyncio.ensure_future(fetch_page(cursor)) if cursor else None
+                yield page
+        finally:
+            if future is not None:
+                future.cancel()
@@ -0,0 +1,67 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+from msgspec import Meta, Struct
+from typing_extensions import Annotated
+
+
+class Order(Struct, kw_only=True):
+    id: Optional[int] = None
+    petId: Optional[int] = None
+    quantity: Optional[int] = None
+    shipDate: Optional[datetime] = None
+    status: Optional[str] = None
+    complete: Optional[bool] = None
+
+
+class Address(Struct, kw_only=True):
+    street: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip: Optional[str] = None
+
+
+class Customer(Struct, kw_only=True):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    address: Optional[List[Address]] = None
+
+
+class Category(Struct, kw_only=True):
+    id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class User(Struct, kw_only=True):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    phone: Optional[str] = None
+    userStatus: Optional[int] = None
+
+
+class Tag(Struct, kw_only=True):
+    id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class Pet(Struct, kw_only=True):
+    id: Optional[int] = None
+    name: str
+    category: Optional[Category] = None
+    photoUrls: List[str]
+    tags: Optional[List[Tag]] = None
+    status: Optional[str] = None
+
+
+class ApiResponse(Struct, kw_only=True):
+    code: Optional[int] = None
+    type: Optional[str] = None
+    message: Optional[str] = None
+
+
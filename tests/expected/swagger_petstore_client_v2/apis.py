@@ -0,0 +1,491 @@
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+from pydantic import TypeAdapter
+
+from .base_client import BaseClient
+from .models import *
+
+
+class Api(BaseClient):
+    """
+    Autogenerated httpx async client
+    """
+    async def updatePet(
+        self,
+        body: Pet,
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> Pet:
+        """
+        Update an existing pet by Id
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "PUT",
+            "/pet",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return Pet.model_validate_json(response.content)
+
+    async def addPet(
+        self,
+        body: Pet,
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> Pet:
+        """
+        Add a new pet to the store
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "POST",
+            "/pet",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return Pet.model_validate_json(response.content)
+
+    async def findPetsByStatus(
+        self,
+        status: Optional[str] = "available",
+        **kwargs: Any
+    ) -> List[Pet]:
+        """
+        Multiple status values can be provided with comma separated strings
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if status is not None:
+            _params["status"] = getattr(status, "value", status)
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "GET",
+            "/pet/findByStatus",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+        return _List_Pet_adapter.validate_json(response.content)
+
+    async def iter_findPetsByStatus(
+        self,
+        status: Optional[str] = "available",
+        **kwargs: Any
+    ) -> AsyncIterator[Pet]:
+        """
+        Streams the items of the response of `findPetsByStatus` one at a time
+
+        Multiple status values can be provided with comma separated strings
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if status is not None:
+            _params["status"] = getattr(status, "value", status)
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        async with self.stream(
+            "GET",
+            "/pet/findByStatus",
+            params=_params,
+            **kwargs
+        ) as response:
+            response.raise_for_status()
+            async for item in self._iter_json_array(response):
+                yield _Pet_adapter.validate_python(item)
+
+    async def findPetsByTags(
+        self,
+        tags: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[Pet]:
+        """
+        Multiple tags can be provided with comma separated strings. Use tag1, tag2, tag3 for testing.
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if tags is not None:
+            _params["tags"] = tags
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "GET",
+            "/pet/findByTags",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+        return _List_Pet_adapter.validate_json(response.content)
+
+    async def iter_findPetsByTags(
+        self,
+        tags: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Pet]:
+        """
+        Streams the items of the response of `findPetsByTags` one at a time
+
+        Multiple tags can be provided with comma separated strings. Use tag1, tag2, tag3 for testing.
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if tags is not None:
+            _params["tags"] = tags
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        async with self.stream(
+            "GET",
+            "/pet/findByTags",
+            params=_params,
+            **kwargs
+        ) as response:
+            response.raise_for_status()
+            async for item in self._iter_json_array(response):
+                yield _Pet_adapter.validate_python(item)
+
+    async def getPetById(
+        self,
+        petId: int,
+        **kwargs: Any
+    ) -> Pet:
+        """
+        Returns a single pet
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            f"/pet/{petId}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Pet.model_validate_json(response.content)
+
+    async def updatePetWithForm(
+        self,
+        petId: int,
+        name: str,
+        status: str,
+        **kwargs: Any
+    ) -> None:
+        """
+        
+        """ # noqa 
+
+        _params: Dict[str, Any] = {
+            "name": name,
+            "status": status,
+        }
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "POST",
+            f"/pet/{petId}",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def deletePet(
+        self,
+        petId: int,
+        api_key: Optional[str] = None,
+        **kwargs: Any
+    ) -> None:
+        """
+        delete a pet
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {}
+        if api_key is not None:
+            _headers["api_key"] = api_key
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "DELETE",
+            f"/pet/{petId}",
+            headers=_headers,
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def uploadFile(
+        self,
+        petId: int,
+        additionalMetadata: Optional[str] = None,
+        **kwargs: Any
+    ) -> ApiResponse:
+        """
+        
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if additionalMetadata is not None:
+            _params["additionalMetadata"] = additionalMetadata
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "POST",
+            f"/pet/{petId}/uploadImage",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+        return ApiResponse.model_validate_json(response.content)
+
+    async def getInventory(
+        self,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Returns a map of status codes to quantities
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            "/store/inventory",
+            **kwargs
+        )
+        response.raise_for_status()
+        return _Dict_str_Any_adapter.validate_json(response.content)
+
+    async def placeOrder(
+        self,
+        body: Order,
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> Order:
+        """
+        Place a new order in the store
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "POST",
+            "/store/order",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return Order.model_validate_json(response.content)
+
+    async def getOrderById(
+        self,
+        orderId: int,
+        **kwargs: Any
+    ) -> Order:
+        """
+        For valid response try integer IDs with value &lt;= 5 or &gt; 10. Other values will generate exceptions.
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            f"/store/order/{orderId}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return Order.model_validate_json(response.content)
+
+    async def deleteOrder(
+        self,
+        orderId: int,
+        **kwargs: Any
+    ) -> None:
+        """
+        For valid response try integer IDs with value &lt; 1000. Anything above 1000 or nonintegers will generate API errors
+        """ # noqa 
+
+        response = await self.request(
+            "DELETE",
+            f"/store/order/{orderId}",
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def createUser(
+        self,
+        body: User,
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> User:
+        """
+        This can only be done by the logged in user.
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "POST",
+            "/user",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return User.model_validate_json(response.content)
+
+    async def createUsersWithListInput(
+        self,
+        body: List[User],
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> User:
+        """
+        Creates list of users with given input array
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "POST",
+            "/user/createWithList",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+        return User.model_validate_json(response.content)
+
+    async def loginUser(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        **kwargs: Any
+    ) -> None:
+        """
+        
+        """ # noqa 
+
+        _params: Dict[str, Any] = {}
+        if username is not None:
+            _params["username"] = username
+        if password is not None:
+            _params["password"] = password
+        if "params" in kwargs:
+            _params.update(kwargs.pop("params"))
+
+        response = await self.request(
+            "GET",
+            "/user/login",
+            params=_params,
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def logoutUser(
+        self,
+        **kwargs: Any
+    ) -> None:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            "/user/logout",
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def getUserByName(
+        self,
+        username: str,
+        **kwargs: Any
+    ) -> User:
+        """
+        
+        """ # noqa 
+
+        response = await self.request(
+            "GET",
+            f"/user/{username}",
+            **kwargs
+        )
+        response.raise_for_status()
+        return User.model_validate_json(response.content)
+
+    async def updateUser(
+        self,
+        body: User,
+        username: str,
+        body_serializer_args: Dict[str, Any] = {},
+        **kwargs: Any
+    ) -> None:
+        """
+        This can only be done by the logged in user.
+        """ # noqa 
+
+        _headers: Dict[str, Any] = {
+            "Content-Type": "application/json",
+        }
+        if "headers" in kwargs:
+            _headers.update(kwargs.pop("headers"))
+
+        response = await self.request(
+            "PUT",
+            f"/user/{username}",
+            headers=_headers,
+            content=self._json_body(body, body_serializer_args),
+            **kwargs
+        )
+        response.raise_for_status()
+
+    async def deleteUser(
+        self,
+        username: str,
+        **kwargs: Any
+    ) -> None:
+        """
+        This can only be done by the logged in user.
+        """ # noqa 
+
+        response = await self.request(
+            "DELETE",
+            f"/user/{username}",
+            **kwargs
+        )
+        response.raise_for_status()
+
+
+_List_Pet_adapter = TypeAdapter(List[Pet])
+_Pet_adapter = TypeAdapter(Pet)
+_Dict_str_Any_adapter = TypeAdapter(Dict[str, Any])
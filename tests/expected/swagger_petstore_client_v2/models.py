@@ -0,0 +1,66 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, Field, RootModel
+
+
+class Order(BaseModel):
+    id: Optional[int] = None
+    petId: Optional[int] = None
+    quantity: Optional[int] = None
+    shipDate: Optional[datetime] = None
+    status: Optional[str] = None
+    complete: Optional[bool] = None
+
+
+class Address(BaseModel):
+    street: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip: Optional[str] = None
+
+
+class Customer(BaseModel):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    address: Optional[List[Address]] = None
+
+
+class Category(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class User(BaseModel):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    phone: Optional[str] = None
+    userStatus: Optional[int] = None
+
+
+class Tag(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class Pet(BaseModel):
+    id: Optional[int] = None
+    name: str
+    category: Optional[Category] = None
+    photoUrls: List[str]
+    tags: Optional[List[Tag]] = None
+    status: Optional[str] = None
+
+
+class ApiResponse(BaseModel):
+    code: Optional[int] = None
+    type: Optional[str] = None
+    message: Optional[str] = None
+
+
@@ -0,0 +1,82 @@
+import filecmp
+import json
+import os
+
+from pathlib import Path
+
+import pytest
+
+from python_client_generator.batch import entry_to_argv
+from python_client_generator.main import main
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+def test_entry_to_argv() -> None:
+    entry = {
+        "open_api": "specs/foo.json",
+        "package_name": "foo",
+        "group_by_tags": True,
+        "sync": False,
+        "jobs": 2,
+    }
+
+    assert entry_to_argv(entry, Path("/manifests")) == [
+        "--open-api",
+        "/manifests/specs/foo.json",
+        "--package-name",
+        "foo",
+        "--group-by-tags",
+        "--jobs",
+        "2",
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_generation(
+    jobs: int,
+    fastapi_app_openapi_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    tmp_path: Path,
+) -> None:
+    manifest = {
+        "clients": [
+            {
+                "open_api": str(fastapi_app_openapi_file),
+                "package_name": "fastapi_app_client",
+                "project_name": "fastapi-project",
+                "outdir": "fastapi",
+            },
+            {
+                "open_api": str(PATH / "inputs" / "swagger-petstore.json"),
+                "package_name": "swagger_petstore_client",
+                "project_name": "test-project",
+                "outdir": "petstore",
+            },
+        ]
+    }
+    with open(tmp_path / "manifest.json", "w") as f:
+        json.dump(manifest, f)
+
+    monkeypatch.setattr(
+        "sys.argv", ["", "--batch", str(tmp_path / "manifest.json"), "--jobs", str(jobs)]
+    )
+    main()
+
+    for outdir, package in [
+        ("fastapi", "fastapi_app_client"),
+        ("petstore", "swagger_petstore_client"),
+    ]:
+        for name in ["models.py", "apis.py", "base_client.py"]:
+            assert filecmp.cmp(
+                PATH / "expected" / package / name,
+                tmp_path / outdir / package / name,
+                shallow=False,
+            )
+
+    summary = capsys.readouterr().out
+    assert "fastapi-project" in summary
+    assert "test-project" in summary
+    assert "Generated 2 clients" in summary
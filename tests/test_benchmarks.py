@@ -0,0 +1,76 @@
+from benchmarks.bench_bundling import benchmark as benchmark_bundling
+from benchmarks.bench_decode import benchmark as benchmark_decode
+from benchmarks.bench_deduplication import benchmark as benchmark_deduplication
+from benchmarks.bench_generator import benchmark
+from benchmarks.bench_import import benchmark as benchmark_import
+from benchmarks.bench_overhead import benchmark as benchmark_overhead
+
+
+def test_benchmark_generator_phases() -> None:
+    result = benchmark({"schemas": 20, "operations": 30, "depth": 2, "union_fan_out": 2}, repeat=1)
+
+    assert list(result["phases"])[:5] == [
+        "load",
+        "add_schema_title_if_missing",
+        "dereference_swagger",
+        "generate models.py",
+        "generate apis.py",
+    ]
+    assert {"get_models", "get_endpoints", "write models.py", "write apis.py"} <= set(
+        result["phases"]
+    )
+    for phase in result["phases"].values():
+        assert set(phase) == {"wall_s", "cpu_s", "peak_mb"}
+
+
+def test_benchmark_decode() -> None:
+    results = benchmark_decode(items=10, repeat=1, number=1)
+
+    assert {r["case"] for r in results} == {
+        "petstore pet",
+        "petstore 10 pets",
+        "fastapi 10 foos",
+        "10 events",
+    }
+    assert {"pydantic v1", "pydantic v1 unvalidated", "msgspec"} <= {r["backend"] for r in results}
+
+
+def test_benchmark_overhead() -> None:
+    results = benchmark_overhead(repeat=1, number=1)
+
+    assert [r["case"] for r in results] == [
+        "path param",
+        "query params",
+        "header param",
+        "json body",
+    ]
+    for r in results:
+        assert r["client_s"] > 0 and r["httpx_s"] > 0
+
+
+def test_benchmark_import() -> None:
+    results = benchmark_import(schemas=20, operations=20, ref_reuse=1, repeat=1)
+
+    assert [r["layout"] for r in results] == ["single", "modular"]
+    single, modular = results
+    assert single["modules"] == 3
+    assert modular["modules"] > 3
+
+
+def test_benchmark_deduplication() -> None:
+    results = benchmark_deduplication(schemas=20, operations=20, copies=5, depth=2, repeat=1)
+
+    assert [r["deduplicate"] for r in results] == [False, True]
+    default, deduplicated = results
+    assert default["aliases"] == 0
+    assert deduplicated["aliases"] == 5
+
+
+def test_benchmark_bundling() -> None:
+    results = benchmark_bundling(schemas=20, files=3, repeat=1)
+
+    assert [r["case"] for r in results] == [
+        "single file",
+        "4 files, cold cache",
+        "4 files, warm cache",
+    ]
@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+import typing as t
+
+from pathlib import Path
+
+import pytest
+
+from python_client_generator.main import main
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+def _generate(monkeypatch: pytest.MonkeyPatch, spec: Path, outdir: Path) -> None:
+    argv = ["python_client_generator", "--open-api", str(spec), "--outdir", str(outdir)]
+    argv += ["--package-name", "petstore", "--project-name", "petstore"]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+
+def _mtimes(outdir: Path) -> t.Dict[str, int]:
+    return {
+        str(p.relative_to(outdir)): p.stat().st_mtime_ns
+        for p in outdir.rglob("*")
+        if p.is_file() and "cache" not in p.parent.name
+    }
+
+
+def test_generation_is_incremental(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture, tmp_path: Path
+) -> None:
+    spec = tmp_path / "openapi.json"
+    shutil.copyfile(PATH / "inputs" / "swagger-petstore.json", spec)
+    outdir = tmp_path / "out"
+
+    _generate(monkeypatch, spec, outdir)
+    initial = _mtimes(outdir)
+    assert len(initial) == 5
+
+    # Nothing changed: generation is skipped altogether
+    _generate(monkeypatch, spec, outdir)
+    assert _mtimes(outdir) == initial
+    assert "is up to date" in capsys.readouterr().out
+
+    # Only the version changed: only pyproject.toml is rendered again
+    with open(spec, "r") as f:
+        swagger = json.load(f)
+    swagger["info"]["version"] = "2.0.0"
+    with open(spec, "w") as f:
+        json.dump(swagger, f)
+
+    _generate(monkeypatch, spec, outdir)
+    assert {k for k, v in _mtimes(outdir).items() if v != initial[k]} == {"pyproject.toml"}
+
+    # Edited files are rendered again
+    (outdir / "petstore" / "models.py").write_text("")
+    _generate(monkeypatch, spec, outdir)
+    assert (outdir / "petstore" / "models.py").read_text() != ""
@@ -0,0 +1,189 @@
+import copy
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from python_client_generator.bundling import DocumentCache, bundle_external_refs
+from python_client_generator.exceptions import UnsupportedOpenAPISpec
+from python_client_generator.main import generate, get_parser
+from python_client_generator.utils import split_ref
+
+
+COMMON_YAML = """
+components:
+  schemas:
+    Money:
+      type: object
+      properties:
+        amount:
+          type: number
+        currency:
+          $ref: '#/components/schemas/Currency'
+        since:
+          type: string
+          example: 2020-01-01
+      required: [amount, currency]
+    Currency:
+      type: string
+      enum: [EUR, USD]
+"""
+
+PETS_PATHS: Dict[str, Any] = {
+    "/pets": {
+        "get": {
+            "operationId": "list_pets",
+            "responses": {
+                "200": {
+                    "description": "",
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "array",
+                                "items": {"$ref": "../openapi.json#/components/schemas/Pet"},
+                            }
+                        }
+                    },
+                },
+                "default": {"$ref": "../errors.json"},
+            },
+        }
+    }
+}
+
+ERROR_RESPONSE: Dict[str, Any] = {
+    "description": "Error",
+    "content": {
+        "application/json": {
+            "schema": {
+                "type": "object",
+                "properties": {"message": {"type": "string"}},
+            }
+        }
+    },
+}
+
+SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {"/pets": {"$ref": "paths/pets.json#/~1pets"}},
+    "components": {
+        "schemas": {
+            "Pet": {
+                "title": "Pet",
+                "type": "object",
+                "properties": {
+                    "price": {"$ref": "schemas/common.yaml#/components/schemas/Money"},
+                    "currency": {"$ref": "#/components/schemas/Currency"},
+                },
+            },
+            "Currency": {"type": "string", "enum": ["GBP"]},
+        }
+    },
+}
+
+
+@pytest.fixture()
+def spec_path(tmp_path: Path) -> Path:
+    (tmp_path / "schemas").mkdir()
+    (tmp_path / "paths").mkdir()
+    (tmp_path / "schemas" / "common.yaml").write_text(COMMON_YAML)
+    (tmp_path / "paths" / "pets.json").write_text(json.dumps(PETS_PATHS))
+    (tmp_path / "errors.json").write_text(json.dumps(ERROR_RESPONSE))
+    (tmp_path / "openapi.json").write_text(json.dumps(SPEC))
+    return tmp_path / "openapi.json"
+
+
+def test_split_ref() -> None:
+    assert split_ref("#/components/schemas/Pet") == ("components", "schemas", "Pet")
+    assert split_ref("pets.json#/~1pets~0v1/get") == ("/pets~v1", "get")
+    assert split_ref("pets.json#/Foo%20Bar") == ("Foo Bar",)
+    assert split_ref("pets.json") == ()
+
+
+def test_bundle_external_refs(spec_path: Path) -> None:
+    original = copy.deepcopy(SPEC)
+    swagger = bundle_external_refs(SPEC, spec_path, DocumentCache())
+    schemas = swagger["components"]["schemas"]
+
+    # Targets are named after their pointer, without clashing with other components, and their
+    # own `$ref`s are relative to their file
+    assert list(schemas) == ["Pet", "Currency", "Money", "Currency2"]
+    assert schemas["Pet"]["properties"]["price"] == {"$ref": "#/components/schemas/Money"}
+    assert schemas["Money"]["properties"]["currency"] == {"$ref": "#/components/schemas/Currency2"}
+    assert schemas["Currency2"] == {"type": "string", "enum": ["EUR", "USD"]}
+    # YAML dates are kept as strings, as in JSON documents
+    assert schemas["Money"]["properties"]["since"]["example"] == "2020-01-01"
+
+    # Path items are inlined, `$ref`s back to the document become local and whole files are
+    # named after their file
+    responses = swagger["paths"]["/pets"]["get"]["responses"]
+    schema = responses["200"]["content"]["application/json"]["schema"]
+    assert schema["items"] == {"$ref": "#/components/schemas/Pet"}
+    assert responses["default"] == {"$ref": "#/components/responses/errors"}
+    assert swagger["components"]["responses"] == {"errors": ERROR_RESPONSE}
+
+    # The original document is left untouched
+    assert SPEC == original
+
+
+def test_bundle_without_external_refs() -> None:
+    swagger = copy.deepcopy(SPEC)
+    swagger["paths"] = {}
+    del swagger["components"]["schemas"]["Pet"]["properties"]["price"]
+
+    assert bundle_external_refs(swagger, Path("openapi.json"), DocumentCache()) is swagger
+
+
+@pytest.mark.parametrize(
+    "ref,match",
+    [
+        ("schemas/common.yaml#/components/schemas/Price", "Unresolvable"),
+        ("schemas/missing.yaml#/Price", "Can't load"),
+        ("https://domain.tld/common.yaml#/Price", "Remote"),
+    ],
+)
+def test_bundle_unresolvable_refs(spec_path: Path, ref: str, match: str) -> None:
+    swagger = copy.deepcopy(SPEC)
+    swagger["components"]["schemas"]["Pet"]["properties"]["price"] = {"$ref": ref}
+
+    with pytest.raises(UnsupportedOpenAPISpec, match=match):
+        bundle_external_refs(swagger, spec_path, DocumentCache())
+
+
+def test_document_cache(spec_path: Path) -> None:
+    cache = DocumentCache()
+    path = spec_path.parent / "errors.json"
+
+    document = cache.load(path)
+    assert cache.load(spec_path.parent / "paths" / ".." / "errors.json") is document
+
+    # Modified files are parsed again
+    path.write_text(json.dumps({"description": "Modified"}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache.load(path) == {"description": "Modified"}
+
+
+def test_generate_split_spec(spec_path: Path, tmp_path: Path) -> None:
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", "split_client"]
+        + ["--project-name", "split", "--outdir", str(tmp_path / "out")]
+    )
+    generate(args)
+
+    with open(tmp_path / "out" / "split_client" / "models.py", "r") as f:
+        models = f.read()
+    assert "class Money(BaseModel)" in models
+    assert "class Currency2(str, Enum)" in models
+
+    # Referenced files are part of the inputs of the generated files
+    assert generate(args) == []
+    common = spec_path.parent / "schemas" / "common.yaml"
+    common.write_text(COMMON_YAML.replace("[EUR, USD]", "[EUR, USD, CHF]"))
+    stat = common.stat()
+    os.utime(common, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert tmp_path / "out" / "split_client" / "models.py" in generate(args)
@@ -0,0 +1,290 @@
+import copy
+import importlib
+import json
+
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+import pytest
+
+from python_client_generator.deduplication import deduplicate_schemas
+from python_client_generator.main import generate, get_parser
+
+
+client_base_url = "https://domain.tld"
+
+OWNER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+STATUS_SCHEMA: Dict[str, Any] = {"type": "string", "enum": ["available", "sold"]}
+
+PET_SCHEMA: Dict[str, Any] = {
+    "title": "Pet",
+    "type": "object",
+    "properties": {
+        "status": STATUS_SCHEMA,
+        "owner": OWNER_SCHEMA,
+        "previous_statuses": {"type": "array", "items": STATUS_SCHEMA},
+        "kind": {"type": "string", "enum": ["pet"]},
+    },
+}
+
+SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        "/pets/{pet_id}": {
+            "get": {
+                "operationId": "get_pet",
+                "parameters": [
+                    {
+                        "name": "pet_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Pet-Output"}
+                            }
+                        },
+                    }
+                },
+            }
+        },
+        "/owners": {
+            "get": {
+                "operationId": "list_owners",
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "owners": {"type": "array", "items": OWNER_SCHEMA}
+                                    },
+                                }
+                            }
+                        },
+                    }
+                },
+            }
+        },
+    },
+    "components": {
+        "schemas": {
+            "Pet-Input": copy.deepcopy(PET_SCHEMA),
+            "Pet-Output": {**copy.deepcopy(PET_SCHEMA), "title": "Pet", "description": "A pet"},
+            "Shop": {
+                "title": "Shop",
+                "type": "object",
+                "properties": {"pet": {"$ref": "#/components/schemas/Pet-Output"}},
+            },
+            "PetStatus": {
+                "title": "PetStatus",
+                "type": "object",
+                "properties": {"code": {"type": "integer"}},
+            },
+        }
+    },
+}
+
+
+def test_deduplicate_schemas() -> None:
+    original = copy.deepcopy(SPEC)
+    schemas = deduplicate_schemas(SPEC)["components"]["schemas"]
+
+    # Inline schemas are named after where they were first found, without clashing with the
+    # names of other schemas, and structurally identical ones are named once
+    assert list(schemas) == [
+        "Pet-Input",
+        "Pet-Output",
+        "Shop",
+        "PetStatus",
+        "PetStatus2",
+        "PetOwner",
+        "ListOwners200Response",
+    ]
+    assert schemas["Pet-Input"]["properties"] == {
+        "status": {"$ref": "#/components/schemas/PetStatus2"},
+        "owner": {"$ref": "#/components/schemas/PetOwner"},
+        "previous_statuses": {
+            "type": "array",
+            "items": {"$ref": "#/components/schemas/PetStatus2"},
+        },
+        # Single valued enums resolve to literals
+        "kind": {"type": "string", "enum": ["pet"]},
+    }
+    assert schemas["PetStatus2"] == {"title": "PetStatus2", **STATUS_SCHEMA}
+    assert schemas["PetOwner"] == {"title": "PetOwner", **OWNER_SCHEMA}
+
+    # Components which only differ by their annotations reference the first one, as does
+    # everything which referenced them
+    assert schemas["Pet-Output"] == {"$ref": "#/components/schemas/Pet-Input"}
+    assert schemas["Shop"]["properties"]["pet"] == {"$ref": "#/components/schemas/Pet-Input"}
+
+    # The original document is left untouched
+    assert SPEC == original
+
+
+def test_deduplicate_schemas_of_bodies() -> None:
+    swagger = deduplicate_schemas(SPEC)
+    response = swagger["paths"]["/owners"]["get"]["responses"]["200"]
+
+    assert response["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/ListOwners200Response"
+    }
+    assert swagger["components"]["schemas"]["ListOwners200Response"]["properties"] == {
+        "owners": {"type": "array", "items": {"$ref": "#/components/schemas/PetOwner"}}
+    }
+
+
+@pytest.mark.parametrize("layout", ["single", "modular"])
+@pytest.mark.parametrize("model_backend", ["pydantic", "msgspec"])
+def test_generate_deduplicated_schemas(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, layout: str, model_backend: str
+) -> None:
+    package_name = f"deduplicated_{layout}_{model_backend}_client"
+    spec_path = tmp_path / "pets.json"
+    with open(spec_path, "w") as f:
+        json.dump(SPEC, f)
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", "pets"]
+        + ["--outdir", str(tmp_path), "--no-cache", "--sync", "--deduplicate-schemas"]
+        + ["--layout", layout, "--model-backend", model_backend]
+    )
+    generate(args)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    models = importlib.import_module(f"{package_name}.models")
+    apis = importlib.import_module(f"{package_name}.apis")
+
+    # Duplicated components are aliases of the first one
+    assert models.PetOutput is models.Pet
+
+    pet = {"owner": {"name": "Alice"}, "previous_statuses": ["available"], "kind": "pet"}
+    owners = {"owners": [{"name": "Alice"}]}
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json=owners if request.url.path == "/owners" else pet)
+    )
+    client = apis.Api(base_url=client_base_url, transport=transport)
+
+    response = client.get_pet(pet_id=1)
+    assert isinstance(response, models.Pet)
+    assert isinstance(response.owner, models.PetOwner)
+    assert response.previous_statuses == [models.PetStatus2.AVAILABLE]
+    assert client.list_owners().owners[0] == response.owner
+
+
+EVENT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"kind": {"type": "string"}, "id": {"type": "integer"}},
+    "required": ["kind"],
+}
+
+EVENTS_SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Events", "version": "1.0.0"},
+    "paths": {
+        "/events": {
+            "get": {
+                "operationId": "list_events",
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {"$ref": "#/components/schemas/Event"},
+                                }
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Created": copy.deepcopy(EVENT_SCHEMA),
+            "Deleted": copy.deepcopy(EVENT_SCHEMA),
+            "Renamed": copy.deepcopy(EVENT_SCHEMA),
+            "Event": {
+                "title": "Event",
+                "oneOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                ],
+                "discriminator": {
+                    "propertyName": "kind",
+                    "mapping": {"deleted": "#/components/schemas/Deleted", "renamed": "Renamed"},
+                },
+            },
+            "Log": {
+                "type": "object",
+                "properties": {
+                    "last": {
+                        "oneOf": [
+                            {"title": "Opened", **EVENT_SCHEMA},
+                            {"title": "Closed", **EVENT_SCHEMA},
+                        ],
+                        "discriminator": {"propertyName": "kind"},
+                    },
+                },
+            },
+            "Audit": copy.deepcopy(EVENT_SCHEMA),
+            "Report": copy.deepcopy(EVENT_SCHEMA),
+        }
+    },
+}
+
+
+def test_deduplicate_discriminated_unions() -> None:
+    schemas = deduplicate_schemas(EVENTS_SPEC)["components"]["schemas"]
+
+    # Members and mapping targets of discriminated unions are only told apart by their tag
+    assert schemas["Created"] == EVENT_SCHEMA
+    assert schemas["Deleted"] == EVENT_SCHEMA
+    assert schemas["Renamed"] == EVENT_SCHEMA
+    assert schemas["Log"]["properties"]["last"]["oneOf"] == [
+        {"$ref": "#/components/schemas/Opened"},
+        {"$ref": "#/components/schemas/Closed"},
+    ]
+    # Other schemas of the same structure are still deduplicated, with one another only
+    assert schemas["Audit"] == EVENT_SCHEMA
+    assert schemas["Report"] == {"$ref": "#/components/schemas/Audit"}
+
+
+@pytest.mark.parametrize("model_backend", ["pydantic", "msgspec"])
+def test_generate_deduplicated_discriminated_unions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, model_backend: str
+) -> None:
+    package_name = f"deduplicated_events_{model_backend}_client"
+    spec_path = tmp_path / "events.json"
+    with open(spec_path, "w") as f:
+        json.dump(EVENTS_SPEC, f)
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", "events"]
+        + ["--outdir", str(tmp_path), "--no-cache", "--sync", "--deduplicate-schemas"]
+        + ["--model-backend", model_backend]
+    )
+    generate(args)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    models = importlib.import_module(f"{package_name}.models")
+    apis = importlib.import_module(f"{package_name}.apis")
+
+    events = [{"kind": "Created", "id": 1}, {"kind": "deleted", "id": 1}]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=events))
+    client = apis.Api(base_url=client_base_url, transport=transport)
+    assert [type(e) for e in client.list_events()] == [models.Created, models.Deleted]
@@ -5,10 +5,17 @@ import httpx
 import pytest
 import respx
 
+
+try:
+    from pydantic.v1 import ValidationError
+except ImportError:
+    from pydantic import ValidationError  # type: ignore
+
 from tests.utils import does_not_raise
 
 from .expected.fastapi_app_client.apis import Api as FastApiAppClient
-from .expected.fastapi_app_client.models import Document, Foo, PaginatedFoo
+from .expected.fastapi_app_client.base_client import JSONCodec, OrjsonCodec
+from .expected.fastapi_app_client.models import Bar, Document, Foo, PaginatedFoo
 
 
 client_base_url = "https://domain.tld"
@@ -112,3 +119,50 @@ async def test_list_foos() -> None:
 
     assert route.called
     assert response == paginated_response
+
+
+@respx.mock
+@pytest.mark.asyncio
+@pytest.mark.parametrize("json_codec", [JSONCodec(), OrjsonCodec()])
+async def test_json_codecs(json_codec: JSONCodec) -> None:
+    """
+    Check that bodies are serialized, and responses parsed, by the JSON codec of the client
+    """
+    codec_client = FastApiAppClient(base_url=client_base_url, json_codec=json_codec)
+    foo = Foo.parse_obj({"field_1": "field_1", "field_2": 1, "field_7": {"field_1": "bar"}})
+
+    route = respx.post(f"{client_base_url}/api/foo")
+    route.mock(return_value=httpx.Response(200, content=foo.json()))
+
+    response = await codec_client.create_foo_api_foo_post(
+        body=foo, body_serializer_args={"exclude_unset": True}
+    )
+
+    assert json.loads(route.calls.last.request.content) == foo.dict(exclude_unset=True)
+    assert response == foo
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_list_foos_without_validation() -> None:
+    """
+    Check that responses are built without validation when disabled on the client, unless
+    enabled again for a call
+    """
+    trusting_client = FastApiAppClient(base_url=client_base_url, validate=False)
+    foo = {"field_1": "field_1", "field_2": "not validated", "field_7": {"field_1": "bar"}}
+
+    route = respx.get(f"{client_base_url}/api/foo")
+    route.mock(
+        return_value=httpx.Response(
+            200, json={"results": [foo], "offset": 0, "limit": 10, "size": 1}
+        )
+    )
+
+    response = await trusting_client.list_foos_api_foo_get()
+
+    assert isinstance(response, PaginatedFoo)
+    assert response.results[0].field_2 == "not validated"
+    assert response.results[0].field_7 == Bar.parse_obj({"field_1": "bar"})
+    with pytest.raises(ValidationError):
+        await trusting_client.list_foos_api_foo_get(_validate=True)
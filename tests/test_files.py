@@ -0,0 +1,35 @@
+import os
+
+from pathlib import Path
+
+import pytest
+
+from python_client_generator.files import AtomicWriter, write_if_changed
+
+
+def test_write_if_changed(tmp_path: Path) -> None:
+    path = tmp_path / "file.py"
+
+    assert write_if_changed(path, "a = 1\n") is True
+    os.utime(path, ns=(0, 0))
+
+    assert write_if_changed(path, "a = 1\n") is False
+    assert path.stat().st_mtime_ns == 0
+
+    assert write_if_changed(path, "a = 2\n") is True
+    assert path.read_text() == "a = 2\n"
+    assert os.listdir(tmp_path) == ["file.py"]
+
+
+def test_atomic_writer_leaves_target_untouched_on_error(tmp_path: Path) -> None:
+    path = tmp_path / "file.py"
+    path.write_text("a = 1\n")
+
+    with pytest.raises(RuntimeError):
+        with AtomicWriter(path) as f:
+            f.write("a = ")
+            raise RuntimeError()
+
+    assert f.changed is False
+    assert path.read_text() == "a = 1\n"
+    assert os.listdir(tmp_path) == ["file.py"]
@@ -0,0 +1,351 @@
+import copy
+import importlib
+import json
+import typing as t
+
+from pathlib import Path
+
+import httpx
+import pytest
+
+from python_client_generator.generate_base_client import generate_base_client
+from python_client_generator.generate_models import (
+    _sort_models,
+    generate_models,
+    get_references,
+)
+from python_client_generator.main import generate, get_parser
+from python_client_generator.schema_cache import schema_cache
+from python_client_generator.utils import (
+    add_schema_title_if_missing,
+    dereference_swagger,
+)
+from tests.utils import import_from_path
+
+
+def _model(name: str, refs: t.List[str]) -> t.Dict[str, t.Any]:
+    return {"name": name, "refs": refs, "fields": [{"name": "x", "type": "int"}]}
+
+
+class TestSortModels:
+    def test_sort_models_puts_dependencies_first(self) -> None:
+        models = [_model("A", ["B", "C"]), _model("B", ["C"]), _model("C", []), _model("D", [])]
+
+        assert [m["name"] for m in _sort_models(models)] == ["C", "B", "A", "D"]
+        assert not any(m.get("has_forward_refs") for m in models)
+
+    def test_sort_models_groups_mutually_referencing_models(self) -> None:
+        models = [
+            _model("A", ["B"]),
+            _model("B", ["A", "C"]),
+            _model("C", []),
+            _model("D", ["D"]),
+        ]
+        models[0]["fields"] = [{"name": "b", "type": "Optional[B]"}]
+        models[1]["fields"] = [{"name": "a", "type": "List[A]"}, {"name": "c", "type": "C"}]
+
+        sorted_models = _sort_models(models)
+
+        assert [m["name"] for m in sorted_models] == ["C", "A", "B", "D"]
+        assert [m.get("has_forward_refs", False) for m in sorted_models] == [
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert [f["forward_ref"] for f in models[1]["fields"]] == [True, False]
+
+
+def test_generate_models_with_recursive_schemas(tmp_path: Path) -> None:
+    swagger: t.Dict[str, t.Any] = {
+        "components": {
+            "schemas": {
+                "Comment": {
+                    "type": "object",
+                    "properties": {
+                        "text": {"type": "string"},
+                        "author": {"$ref": "#/components/schemas/User"},
+                        "replies": {
+                            "type": "array",
+                            "items": {"$ref": "#/components/schemas/Comment"},
+                        },
+                    },
+                    "required": ["text", "replies"],
+                },
+                "User": {
+                    "type": "object",
+                    "properties": {
+                        "last_comment": {"$ref": "#/components/schemas/Comment"},
+                    },
+                },
+            }
+        }
+    }
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+
+    generate_models(dereference_swagger(swagger, swagger), tmp_path / "models.py")
+
+    models = import_from_path("recursive_models", tmp_path / "models.py")
+    comment = models.Comment.parse_obj(
+        {"text": "a", "replies": [{"text": "b", "replies": []}], "author": {"last_comment": None}}
+    )
+    assert comment.replies[0].text == "b"
+    assert isinstance(comment.author, models.User)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_get_references_of_untitled_recursive_schemas(reverse: bool) -> None:
+    # tree -> node -> tree, each of them along with a named schema
+    leaf = {"title": "Leaf", "type": "object", "properties": {}}
+    branch = {"title": "Branch", "type": "object", "properties": {}}
+    tree: t.Dict[str, t.Any] = {"anyOf": [{"type": "array"}, leaf]}
+    node = {"anyOf": [tree, branch]}
+    tree["anyOf"][0]["items"] = node
+    models: t.List[t.Dict[str, t.Any]] = [
+        {"anyOf": [tree]},
+        {"properties": {"nodes": {"type": "array", "items": node}}},
+    ]
+
+    with schema_cache():
+        for model in reversed(models) if reverse else models:
+            assert sorted(get_references(model)) == ["Branch", "Leaf"]
+
+
+def test_generate_msgspec_structs(tmp_path: Path) -> None:
+    msgspec = pytest.importorskip("msgspec")
+    swagger: t.Dict[str, t.Any] = {
+        "components": {
+            "schemas": {
+                "Cat": {"type": "object", "properties": {"meows": {"type": "boolean"}}},
+                "Dog": {"type": "object", "properties": {"barks": {"type": "boolean"}}},
+                "Owner": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "maxLength": 3},
+                        "pet": {
+                            "anyOf": [
+                                {"$ref": "#/components/schemas/Cat"},
+                                {"$ref": "#/components/schemas/Dog"},
+                            ]
+                        },
+                        "friend": {"$ref": "#/components/schemas/Owner"},
+                    },
+                    "required": ["name"],
+                },
+            }
+        }
+    }
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+
+    generate_models(
+        dereference_swagger(swagger, swagger), tmp_path / "models.py", model_backend="msgspec"
+    )
+
+    models = import_from_path("msgspec_models", tmp_path / "models.py")
+    owner = msgspec.json.decode(
+        b'{"name": "Bob", "pet": {"barks": true}, "friend": {"name": "Al"}}', type=models.Owner
+    )
+    assert owner.friend == models.Owner(name="Al")
+    # Structs of untagged unions can't be told apart, they are decoded as dictionaries
+    assert owner.pet == {"barks": True}
+    with pytest.raises(msgspec.ValidationError):
+        msgspec.json.decode(b'{"name": "Robert"}', type=models.Owner)
+
+
+def test_construct_models_without_validation(tmp_path: Path) -> None:
+    swagger: t.Dict[str, t.Any] = {
+        "components": {
+            "schemas": {
+                "Cat": {
+                    "type": "object",
+                    "properties": {"meow": {"type": "integer"}},
+                    "required": ["meow"],
+                },
+                "Dog": {
+                    "type": "object",
+                    "properties": {"bark": {"type": "integer"}},
+                    "required": ["bark"],
+                },
+                "Pet": {
+                    "title": "Pet",
+                    "anyOf": [
+                        {"$ref": "#/components/schemas/Cat"},
+                        {"$ref": "#/components/schemas/Dog"},
+                    ],
+                },
+                "Owner": {
+                    "type": "object",
+                    "properties": {
+                        "pets": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}},
+                        "best_friend": {"$ref": "#/components/schemas/Owner"},
+                    },
+                },
+            }
+        }
+    }
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+    generate_models(dereference_swagger(swagger, swagger), tmp_path / "models.py")
+    generate_base_client(tmp_path / "base_client.py", sync=True)
+
+    models = import_from_path("construct_models", tmp_path / "models.py")
+    base_client = import_from_path("construct_base_client", tmp_path / "base_client.py")
+    owner = base_client.construct(
+        models.Owner,
+        {"pets": [{"bark": "not validated"}], "best_friend": {"pets": [{"meow": 1}, 1]}},
+    )
+
+    assert isinstance(owner.pets[0].__root__, models.Dog)
+    assert owner.pets[0].__root__.bark == "not validated"
+    assert isinstance(owner.best_friend, models.Owner)
+    assert isinstance(owner.best_friend.pets[0].__root__, models.Cat)
+    assert owner.best_friend.pets[1].__root__ == 1
+
+
+EVENT_SCHEMAS: t.Dict[str, t.Any] = {
+    "Created": {
+        "type": "object",
+        "properties": {"kind": {"type": "string"}, "id": {"type": "integer"}},
+        "required": ["kind"],
+    },
+    "Deleted": {
+        "type": "object",
+        "properties": {"kind": {"type": "string"}, "id": {"type": "integer"}},
+        "required": ["kind"],
+    },
+    "Renamed": {
+        "type": "object",
+        "properties": {"kind": {"type": "string"}, "name": {"type": "string"}},
+        "required": ["kind"],
+    },
+    "Event": {
+        "title": "Event",
+        "oneOf": [
+            {"$ref": "#/components/schemas/Created"},
+            {"$ref": "#/components/schemas/Deleted"},
+            {"$ref": "#/components/schemas/Renamed"},
+        ],
+        "discriminator": {
+            "propertyName": "kind",
+            "mapping": {
+                "created": "#/components/schemas/Created",
+                "added": "#/components/schemas/Created",
+                "deleted": "Deleted",
+            },
+        },
+    },
+    "Log": {
+        "type": "object",
+        "properties": {
+            "events": {"type": "array", "items": {"$ref": "#/components/schemas/Event"}},
+            "last": {
+                "oneOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                ],
+                "discriminator": {"propertyName": "kind"},
+            },
+        },
+    },
+}
+
+
+def _generate_event_models(tmp_path: Path, name: str, **kwargs: t.Any) -> t.Any:
+    swagger: t.Dict[str, t.Any] = {"components": {"schemas": copy.deepcopy(EVENT_SCHEMAS)}}
+    add_schema_title_if_missing(swagger["components"]["schemas"])
+    generate_models(dereference_swagger(swagger, swagger), tmp_path / "models.py", **kwargs)
+    return import_from_path(name, tmp_path / "models.py")
+
+
+def test_generate_discriminated_unions(tmp_path: Path) -> None:
+    models = _generate_event_models(tmp_path, "discriminated_models")
+
+    # Members of discriminated unions default to the tags of the mapping, or to their name
+    assert models.Created().kind == "created"
+    assert models.Renamed().kind == "Renamed"
+
+    log = models.Log.parse_obj(
+        {
+            "events": [{"kind": "added", "id": 1}, {"kind": "deleted", "id": 1}],
+            "last": {"kind": "Deleted", "id": 1},
+        }
+    )
+    # Deleted events have the same fields as created events, only the tag tells them apart
+    assert [type(e.__root__) for e in log.events] == [models.Created, models.Deleted]
+    assert isinstance(log.last, models.Deleted)
+    with pytest.raises(ValueError, match="discriminator"):
+        models.Event.parse_obj({"kind": "updated", "id": 1})
+
+
+def test_construct_discriminated_unions(tmp_path: Path) -> None:
+    models = _generate_event_models(tmp_path, "construct_discriminated_models")
+    generate_base_client(tmp_path / "base_client.py", sync=True)
+    base_client = import_from_path(
+        "construct_discriminated_base_client", tmp_path / "base_client.py"
+    )
+
+    log = base_client.construct(models.Log, {"events": [{"kind": "deleted", "id": 1}]})
+
+    assert isinstance(log.events[0].__root__, models.Deleted)
+
+
+def test_generate_msgspec_tagged_unions(tmp_path: Path) -> None:
+    msgspec = pytest.importorskip("msgspec")
+    models = _generate_event_models(tmp_path, "msgspec_tagged_models", model_backend="msgspec")
+
+    log = msgspec.json.decode(
+        b'{"events": [{"kind": "created", "id": 1}, {"kind": "deleted", "id": 1}]}',
+        type=models.Log,
+    )
+
+    assert log.events == [models.Created(id=1), models.Deleted(id=1)]
+    assert msgspec.json.encode(models.Renamed(name="a")) == b'{"kind":"Renamed","name":"a"}'
+
+
+@pytest.mark.parametrize("layout", ["single", "modular"])
+@pytest.mark.parametrize("model_backend", ["pydantic", "msgspec"])
+def test_parse_discriminated_union_responses(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, layout: str, model_backend: str
+) -> None:
+    if model_backend == "msgspec":
+        pytest.importorskip("msgspec")
+    package_name = f"events_{layout}_{model_backend}_client"
+    response = {"type": "array", "items": {"$ref": "#/components/schemas/Event"}}
+    spec = {
+        "openapi": "3.0.2",
+        "info": {"title": "Events", "version": "1.0.0"},
+        "paths": {
+            "/events": {
+                "get": {
+                    "operationId": "list_events",
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            "content": {"application/json": {"schema": response}},
+                        }
+                    },
+                }
+            }
+        },
+        "components": {"schemas": EVENT_SCHEMAS},
+    }
+    spec_path = tmp_path / "events.json"
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", "events"]
+        + ["--outdir", str(tmp_path), "--no-cache", "--sync"]
+        + ["--layout", layout, "--model-backend", model_backend]
+    )
+    generate(args)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    models = importlib.import_module(f"{package_name}.models")
+    apis = importlib.import_module(f"{package_name}.apis")
+    events = [{"kind": "created", "id": 1}, {"kind": "deleted", "id": 1}, {"kind": "Renamed"}]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=events))
+    client = apis.Api(base_url="https://domain.tld", transport=transport)
+
+    # Members are selected by their tag, although the first one matches every event
+    expected = [models.Created, models.Deleted, models.Renamed]
+    assert [type(e) for e in client.list_events()] == expected
+    assert [type(e) for e in client.iter_list_events()] == expected
@@ -0,0 +1,255 @@
+import copy
+import importlib
+import json
+import os
+import sys
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from python_client_generator.main import generate, get_parser
+from python_client_generator.modular import get_imports, to_module_name
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+client_base_url = "https://domain.tld"
+
+RECURSIVE_SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Trees", "version": "1.0.0"},
+    "paths": {
+        "/trees/{tree_id}": {
+            "get": {
+                "operationId": "get_tree",
+                "parameters": [
+                    {
+                        "name": "tree_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {"schema": {"$ref": "#/components/schemas/Tree"}}
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Color": {"title": "Color", "type": "string", "enum": ["red", "green"]},
+            "Tree": {
+                "title": "Tree",
+                "type": "object",
+                "properties": {"root": {"$ref": "#/components/schemas/Node"}},
+            },
+            "Node": {
+                "title": "Node",
+                "type": "object",
+                "properties": {
+                    "color": {"$ref": "#/components/schemas/Color"},
+                    "leaf": {"$ref": "#/components/schemas/Leaf"},
+                    "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+                },
+            },
+            "Leaf": {
+                "title": "Leaf",
+                "type": "object",
+                "properties": {"parent": {"$ref": "#/components/schemas/Node"}},
+            },
+            "Unused": {
+                "title": "Unused",
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+            },
+        }
+    },
+}
+
+
+def generate_client(spec_path: Path, out_dir: Path, package_name: str, options: List[str]) -> Any:
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", "modular"]
+        + ["--outdir", str(out_dir), "--layout", "modular"]
+        + options
+    )
+    return generate(args)
+
+
+def imported_modules(package_name: str) -> List[str]:
+    return sorted(m for m in sys.modules if m.startswith(f"{package_name}."))
+
+
+def test_to_module_name() -> None:
+    taken = {"root_client"}
+
+    assert to_module_name("ApiResponse", taken) == "api_response"
+    assert to_module_name("Api_Response", taken) == "api_response_2"
+    assert to_module_name("import", taken) == "_import"
+    assert to_module_name("root_client", taken) == "root_client_2"
+
+
+def test_get_imports() -> None:
+    modules = {"Pet": "pet", "Tag": "pet", "Category": "category", "Petition": "petition"}
+
+    assert get_imports(["Optional[List[Tag]]", "Pet", "Category"], modules, exclude=["Pet"]) == [
+        {"module": "category", "names": "Category"},
+        {"module": "pet", "names": "Tag"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_modular_layout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    package_name = "modular_petstore_client"
+    spec_path = PATH / "inputs" / "swagger-petstore.json"
+    generate_client(spec_path, tmp_path, package_name, ["--group-by-tags"])
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    package = importlib.import_module(package_name)
+    assert imported_modules(package_name) == []
+
+    # Only the modules of the api and of the models its endpoints use are imported
+    store_api = package.StoreApi
+    assert imported_modules(package_name) == [
+        f"{package_name}.apis",
+        f"{package_name}.apis.store",
+        f"{package_name}.base_client",
+        f"{package_name}.models",
+        f"{package_name}.models.order",
+    ]
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"available": 1}))
+    client = store_api(base_url=client_base_url, transport=transport)
+    assert await client.getInventory() == {"available": 1}
+
+    async with package.RootClient(base_url=client_base_url, transport=transport) as root_client:
+        assert isinstance(root_client.store, store_api)
+        assert root_client.pet.__class__.__module__ == f"{package_name}.apis.pet"
+
+    models = importlib.import_module(f"{package_name}.models")
+    assert set(models.__all__) == {
+        "Address",
+        "ApiResponse",
+        "Category",
+        "Customer",
+        "Order",
+        "Pet",
+        "Tag",
+        "User",
+    }
+    with pytest.raises(AttributeError):
+        package.Unknown
+
+    # Star imports export the apis and models of the subpackages
+    assert {"RootClient", "StoreApi", "Pet", "Order"} <= set(package.__all__)
+    namespace: Dict[str, Any] = {}
+    exec(f"from {package_name} import *", namespace)
+    assert namespace["Pet"] is models.Pet
+
+    # Subpackages are cached as a whole
+    assert generate_client(spec_path, tmp_path, package_name, ["--group-by-tags"]) == []
+
+    # Deleted or edited modules of a subpackage are rendered again
+    order_module = tmp_path / package_name / "models" / "order.py"
+    store_module = tmp_path / package_name / "apis" / "store.py"
+    order, store = order_module.read_text(), store_module.read_text()
+    order_module.unlink()
+    store_module.write_text("")
+    assert generate_client(spec_path, tmp_path, package_name, ["--group-by-tags"]) == [
+        tmp_path / package_name / "models" / "__init__.py",
+        tmp_path / package_name / "apis" / "__init__.py",
+    ]
+    assert order_module.read_text() == order
+    assert store_module.read_text() == store
+
+
+@pytest.mark.parametrize("model_backend", ["pydantic", "msgspec"])
+def test_modular_layout_recursive_models(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, model_backend: str
+) -> None:
+    """
+    Check that mutually referencing models are defined in the same module, and that modules of
+    schemas removed from the spec are removed
+    """
+    package_name = f"modular_trees_{model_backend}_client"
+    spec_path = tmp_path / "trees.json"
+    with open(spec_path, "w") as f:
+        json.dump(RECURSIVE_SPEC, f)
+    options = ["--sync", "--model-backend", model_backend]
+    generate_client(spec_path, tmp_path, package_name, options)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    models_path = tmp_path / package_name / "models"
+    assert sorted(p.name for p in models_path.glob("*.py")) == [
+        "__init__.py",
+        "color.py",
+        "node.py",
+        "tree.py",
+        "unused.py",
+    ]
+
+    tree = {"root": {"color": "red", "children": [{"leaf": {"parent": {"color": "green"}}}]}}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=tree))
+    apis = importlib.import_module(f"{package_name}.apis")
+    response = apis.Api(base_url=client_base_url, transport=transport).get_tree(tree_id=1)
+
+    color = importlib.import_module(f"{package_name}.models").Color
+    assert response.root.children[0].leaf.parent.color == color.GREEN
+
+    # Modules of the subpackages which weren't generated are left as they are
+    (models_path / "extensions.py").write_text("EXTENDED = True\n")
+
+    spec = copy.deepcopy(RECURSIVE_SPEC)
+    del spec["components"]["schemas"]["Unused"]
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+    generate_client(spec_path, tmp_path, package_name, options)
+
+    assert not (models_path / "unused.py").exists()
+    assert (models_path / "extensions.py").read_text() == "EXTENDED = True\n"
+
+
+def test_switching_layouts_removes_the_other_one(
+    tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    package_name = "layouts_client"
+    package_path = tmp_path / package_name
+    spec_path = tmp_path / "trees.json"
+    with open(spec_path, "w") as f:
+        json.dump(RECURSIVE_SPEC, f)
+
+    generate_client(spec_path, tmp_path, package_name, ["--layout", "single"])
+    changed = generate_client(spec_path, tmp_path, package_name, [])
+
+    assert changed[:2] == [package_path / "models.py", package_path / "apis.py"]
+    assert not (package_path / "models.py").exists()
+    assert not (package_path / "apis.py").exists()
+
+    # Files of the subpackages which weren't generated are left as they are
+    (package_path / "models" / "extensions.py").write_text("EXTENDED = True\n")
+    changed = generate_client(spec_path, tmp_path, package_name, ["--layout", "single"])
+
+    assert changed[:2] == [
+        package_path / "models" / "__init__.py",
+        package_path / "apis" / "__init__.py",
+    ]
+    assert [p.name for p in (package_path / "models").iterdir()] == ["extensions.py"]
+    assert not (package_path / "apis").exists()
+    assert (package_path / "models.py").exists()
+
+    # Modules of the other layout which weren't generated are only warned about
+    (package_path / "apis").mkdir()
+    (package_path / "apis" / "__init__.py").write_text("")
+    generate_client(spec_path, tmp_path, package_name, ["--layout", "single", "--no-cache"])
+
+    assert (package_path / "apis" / "__init__.py").exists()
+    assert "Warning: leaving" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+import respx
+
+
+msgspec = pytest.importorskip("msgspec")
+
+from .expected.fastapi_app_client_msgspec.apis import Api as FastApiAppClient  # noqa: E402
+from .expected.fastapi_app_client_msgspec.models import Foo, PaginatedFoo  # noqa: E402
+from .expected.swagger_petstore_client_msgspec.apis import Api as PetstoreClient  # noqa: E402
+from .expected.swagger_petstore_client_msgspec.models import Pet  # noqa: E402
+
+
+client_base_url = "https://domain.tld"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_create_foo() -> None:
+    client = FastApiAppClient(base_url=client_base_url)
+    foo = Foo(field_1="field_1", field_2=1)
+
+    route = respx.post(f"{client_base_url}/api/foo")
+    route.mock(return_value=httpx.Response(200, content=msgspec.json.encode(foo)))
+
+    response = await client.create_foo_api_foo_post(body=foo)
+
+    assert route.called
+    assert route.calls.last.request.content == msgspec.json.encode(foo)
+    assert response == foo
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_list_foos() -> None:
+    client = FastApiAppClient(base_url=client_base_url)
+    paginated_response = PaginatedFoo(
+        results=[Foo(field_1="field_1", field_2=1)], offset=0, limit=10, size=1
+    )
+
+    route = respx.get(f"{client_base_url}/api/foo")
+    route.mock(return_value=httpx.Response(200, content=msgspec.json.encode(paginated_response)))
+
+    assert await client.list_foos_api_foo_get() == paginated_response
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_find_pets_by_status() -> None:
+    client = PetstoreClient(base_url=client_base_url)
+    pets = [Pet(id=1, name="doggie", photoUrls=[])]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, content=msgspec.json.encode(pets)))
+
+    assert await client.findPetsByStatus() == pets
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_invalid_response() -> None:
+    client = FastApiAppClient(base_url=client_base_url)
+
+    route = respx.get(f"{client_base_url}/api/foo")
+    route.mock(return_value=httpx.Response(200, json={"results": "not a list"}))
+
+    with pytest.raises(msgspec.ValidationError):
+        await client.list_foos_api_foo_get()
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_iter_find_pets_by_status() -> None:
+    client = PetstoreClient(base_url=client_base_url)
+    pets = [Pet(id=1, name="doggie", photoUrls=[]), Pet(id=2, name="kitty", photoUrls=[])]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, content=msgspec.json.encode(pets)))
+
+    assert [pet async for pet in client.iter_findPetsByStatus()] == pets
@@ -0,0 +1,268 @@
+import asyncio
+import importlib
+import json
+
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+import pytest
+
+from python_client_generator.generate_apis import get_pagination
+from python_client_generator.main import generate, get_parser
+
+from .expected.fastapi_app_client.apis import Api as FastApiAppClient
+from .expected.fastapi_app_client.models import Foo
+
+
+client_base_url = "https://domain.tld"
+
+FOOS = [{"field_1": f"foo_{i}", "field_2": i} for i in range(25)]
+
+CURSOR_SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Cursors", "version": "1.0.0"},
+    "paths": {
+        "/items": {
+            "get": {
+                "operationId": "list_items",
+                "parameters": [
+                    {
+                        "name": "cursor",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                    },
+                ],
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ItemPage"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "ItemPage": {
+                "title": "ItemPage",
+                "type": "object",
+                "properties": {
+                    "items": {"type": "array", "items": {"type": "integer"}},
+                    "next_cursor": {"type": "string"},
+                },
+                "required": ["items"],
+            }
+        }
+    },
+}
+
+
+OFFSET_SPEC: Dict[str, Any] = {
+    "openapi": "3.0.2",
+    "info": {"title": "Offsets", "version": "1.0.0"},
+    "paths": {
+        "/items": {
+            "get": {
+                "operationId": "list_items",
+                "parameters": [
+                    {
+                        "name": name,
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                    }
+                    for name in ("offset", "limit")
+                ],
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/ItemPage"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "ItemPage": {
+                "title": "ItemPage",
+                "type": "object",
+                "properties": {
+                    "items": {"type": "array", "items": {"type": "integer"}},
+                    "total_count": {"type": "integer"},
+                },
+                "required": ["items"],
+            }
+        }
+    },
+}
+
+
+def test_get_pagination(fastapi_app_openapi: Dict[str, Any]) -> None:
+    list_foos = fastapi_app_openapi["paths"]["/api/foo"]["get"]
+    read_foo = fastapi_app_openapi["paths"]["/api/foo/{foo_id}"]["get"]
+
+    assert get_pagination(list_foos) == {
+        "items": "results",
+        "item_type": "Foo",
+        "offset": True,
+        "total": None,
+    }
+    assert get_pagination(read_foo) is None
+
+
+def test_get_pagination_titled_union_items() -> None:
+    pet = {
+        "title": "Pet",
+        "oneOf": [
+            {"title": "Cat", "type": "object", "properties": {"meow": {"type": "string"}}},
+            {"title": "Dog", "type": "object", "properties": {"bark": {"type": "string"}}},
+        ],
+    }
+    page = {
+        "title": "PetPage",
+        "type": "object",
+        "properties": {"items": {"type": "array", "items": pet}, "total": {"type": "integer"}},
+    }
+    list_pets = {
+        "parameters": [
+            {"name": name, "in": "query", "schema": {"type": "integer"}}
+            for name in ("offset", "limit")
+        ],
+        "responses": {"200": {"content": {"application/json": {"schema": page}}}},
+    }
+
+    # Same as the type of the items in the model field, rather than Union[Cat, Dog]
+    assert get_pagination(list_pets) == {
+        "items": "items",
+        "item_type": "Pet",
+        "offset": True,
+        "total": "total",
+    }
+
+
+def get_client(tmp_path: Path, spec: Dict[str, Any], name: str, sync: bool) -> ModuleType:
+    spec_path = tmp_path / f"{name}.json"
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+
+    package_name = f"{name}_{'sync' if sync else 'async'}_client"
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", package_name, "--project-name", name]
+        + ["--outdir", str(tmp_path), "--no-cache"]
+        + (["--sync"] if sync else [])
+    )
+    generate(args)
+    return importlib.import_module(f"{package_name}.apis")
+
+
+def cursor_pages(request: httpx.Request) -> httpx.Response:
+    cursor = int(request.url.params.get("cursor", "0"))
+    next_cursor = str(cursor + 2) if cursor + 2 < 5 else None
+    return httpx.Response(
+        200, json={"items": [cursor, cursor + 1][: 5 - cursor], "next_cursor": next_cursor}
+    )
+
+
+class AsyncHandlerTransport(httpx.AsyncBaseTransport):
+    """
+    Transport handling requests with a coroutine function, to mock slow servers
+    """
+
+    def __init__(self, handler: Callable[[httpx.Request], Awaitable[httpx.Response]]) -> None:
+        self.handler = handler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.handler(request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefetch", [1, 3])
+async def test_paginate_offset(prefetch: int) -> None:
+    in_flight: List[int] = []
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal max_in_flight
+        in_flight.append(1)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        offset, limit = int(request.url.params["offset"]), int(request.url.params["limit"])
+        page = FOOS[offset:][:limit]
+        return httpx.Response(
+            200, json={"results": page, "offset": offset, "limit": limit, "size": len(page)}
+        )
+
+    client = FastApiAppClient(base_url=client_base_url, transport=AsyncHandlerTransport(handler))
+
+    foos = [foo async for foo in client.paginate_list_foos_api_foo_get(_prefetch=prefetch)]
+
+    assert foos == [Foo.parse_obj(foo) for foo in FOOS]
+    assert max_in_flight == prefetch
+
+
+@pytest.mark.asyncio
+async def test_paginate_cursor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.syspath_prepend(str(tmp_path))
+    apis = get_client(tmp_path, CURSOR_SPEC, "cursor", sync=False)
+
+    client = apis.Api(base_url=client_base_url, transport=httpx.MockTransport(cursor_pages))
+
+    assert [item async for item in client.paginate_list_items()] == [0, 1, 2, 3, 4]
+
+
+def test_paginate_sync(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.syspath_prepend(str(tmp_path))
+    apis = get_client(tmp_path, CURSOR_SPEC, "cursor", sync=True)
+
+    client = apis.Api(base_url=client_base_url, transport=httpx.MockTransport(cursor_pages))
+
+    assert list(client.paginate_list_items()) == [0, 1, 2, 3, 4]
+    assert list(client.paginate_list_items(cursor="2")) == [2, 3, 4]
+
+
+def capped_pages(request: httpx.Request) -> httpx.Response:
+    """
+    Pages of 25 items, of at most 10 items whatever the limit
+    """
+    offset, limit = int(request.url.params["offset"]), int(request.url.params["limit"])
+    return httpx.Response(
+        200, json={"items": list(range(25))[offset:][: min(limit, 10)], "total_count": 25}
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefetch", [1, 3])
+async def test_paginate_offset_capped(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, prefetch: int
+) -> None:
+    monkeypatch.syspath_prepend(str(tmp_path))
+    apis = get_client(tmp_path, OFFSET_SPEC, f"offset_{prefetch}", sync=False)
+
+    client = apis.Api(base_url=client_base_url, transport=httpx.MockTransport(capped_pages))
+    items = [i async for i in client.paginate_list_items(limit=100, _prefetch=prefetch)]
+
+    # Pages shorter than the limit don't end the pagination before the total is reached
+    assert items == list(range(25))
+
+
+def test_paginate_offset_capped_sync(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.syspath_prepend(str(tmp_path))
+    apis = get_client(tmp_path, OFFSET_SPEC, "offset", sync=True)
+
+    client = apis.Api(base_url=client_base_url, transport=httpx.MockTransport(capped_pages))
+
+    assert list(client.paginate_list_items(limit=100)) == list(range(25))
+    assert list(client.paginate_list_items(offset=5, limit=4)) == list(range(5, 25))
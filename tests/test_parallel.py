@@ -0,0 +1,77 @@
+import filecmp
+import os
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from python_client_generator import main
+from python_client_generator.generate_apis import generate_apis
+from python_client_generator.generate_models import generate_models
+from python_client_generator.parallel import SwaggerPool, imap_chunks
+from python_client_generator.schema_cache import SchemaCache, get_schema_cache
+
+
+EXPECTED_PATH = Path(os.path.dirname(os.path.realpath(__file__))) / "expected"
+
+
+@pytest.mark.parametrize(
+    "openapi_fixture, expected_dir",
+    [
+        ("fastapi_app_openapi", "fastapi_app_client"),
+        ("swagger_petstore_openapi", "swagger_petstore_client"),
+    ],
+)
+def test_generation_with_pool_is_identical(
+    openapi_fixture: str, expected_dir: str, request: pytest.FixtureRequest, tmp_path: Path
+) -> None:
+    swagger: Dict[str, Any] = request.getfixturevalue(openapi_fixture)
+
+    with SwaggerPool(swagger, jobs=2) as pool:
+        generate_models(swagger, tmp_path / "models.py", pool)
+        generate_apis(swagger, tmp_path / "apis.py", group_by_tags=False, sync=False, pool=pool)
+
+    for name in ["models.py", "apis.py"]:
+        assert filecmp.cmp(EXPECTED_PATH / expected_dir / name, tmp_path / name, shallow=False)
+
+
+def test_imap_chunks_without_pool_is_lazy() -> None:
+    processed: List[int] = []
+
+    def square(swagger: Dict[str, Any], chunk: List[int]) -> List[int]:
+        processed.extend(chunk)
+        return [i * i for i in chunk]
+
+    results = imap_chunks(None, {}, square, [1, 2, 3])
+
+    assert next(results) == 1
+    assert processed == [1]
+    assert list(results) == [4, 9]
+
+
+def test_generators_share_schema_cache_with_pool(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    caches: Dict[str, Optional[SchemaCache]] = {}
+
+    def record(name: str, generator: Callable[..., bool]) -> Callable[..., bool]:
+        def wrapper(*args: Any, **kwargs: Any) -> bool:
+            caches[name] = get_schema_cache()
+            return generator(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(main, "generate_models", record("models", generate_models))
+    monkeypatch.setattr(main, "generate_apis", record("apis", generate_apis))
+    args = main.get_parser().parse_args(
+        ["--open-api", str(Path(__file__).parent / "inputs" / "swagger-petstore.json")]
+        + ["--package-name", "pool_client", "--project-name", "pool"]
+        + ["--outdir", str(tmp_path), "--no-cache", "--jobs", "2"]
+    )
+    main.generate(args)
+
+    # Generators run on threads, within the schema cache of the generation rather than each in
+    # a cache of its own
+    assert caches["models"] is not None
+    assert caches["apis"] is caches["models"]
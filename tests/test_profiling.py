@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import pstats
+import tracemalloc
+
+from pathlib import Path
+
+import pytest
+
+from python_client_generator.main import main
+from python_client_generator.profiling import Profiler, phase, profiling
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+def test_profiler_accumulates_phases() -> None:
+    profiler = Profiler()
+
+    # Hooks are no-ops when not profiling
+    with phase("ignored"):
+        pass
+
+    tracemalloc.start()
+    try:
+        with profiling(profiler):
+            for _ in range(2):
+                with phase("outer"), phase("inner"):
+                    pass
+    finally:
+        tracemalloc.stop()
+
+    assert list(profiler.phases) == ["inner", "outer"]
+    assert profiler.phases["outer"].calls == 2
+    assert profiler.phases["outer"].wall_s >= profiler.phases["inner"].wall_s
+    # Peak memory is only measured for top-level phases
+    assert profiler.phases["outer"].peak_mb is not None
+    assert profiler.phases["inner"].peak_mb is None
+
+
+@pytest.mark.parametrize("timings", ["table", "json"])
+def test_timings(
+    timings: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "",
+            "--open-api",
+            str(PATH / "inputs" / "swagger-petstore.json"),
+            "--package-name",
+            "swagger_petstore_client",
+            "--project-name",
+            "test-project",
+            "--outdir",
+            str(tmp_path),
+            "--timings",
+            timings,
+            "--profile",
+            str(tmp_path / "generation.prof"),
+        ],
+    )
+    main()
+
+    report = capsys.readouterr().err
+    if timings == "json":
+        phases = json.loads(report)["phases"]
+        assert {"load", "dereference_swagger", "generate models.py", "write apis.py"} <= set(phases)
+        assert phases["load"]["peak_mb"] > 0
+    else:
+        assert "Top schemas by processing time:" in report
+        assert "Top operations by processing time:" in report
+        assert "findPetsByStatus" in report
+
+    stream = io.StringIO()
+    pstats.Stats(str(tmp_path / "generation.prof"), stream=stream).print_stats()
+    assert "function calls" in stream.getvalue()
+    assert "generate_models" in stream.getvalue()
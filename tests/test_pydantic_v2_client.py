@@ -0,0 +1,90 @@
+import httpx
+import pydantic
+import pytest
+import respx
+
+
+if not pydantic.VERSION.startswith("2."):
+    pytest.skip("Clients generated for Pydantic v2 require Pydantic v2", allow_module_level=True)
+
+from .expected.fastapi_app_client_v2.apis import Api as FastApiAppClient  # noqa: E402
+from .expected.fastapi_app_client_v2.models import Foo  # noqa: E402
+from .expected.swagger_petstore_client_v2.apis import Api as PetstoreClient  # noqa: E402
+from .expected.swagger_petstore_client_v2.models import Pet, User  # noqa: E402
+
+
+client_base_url = "https://domain.tld"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_create_foo() -> None:
+    client = FastApiAppClient(base_url=client_base_url)
+    foo = Foo(field_1="field_1", field_2=1)
+
+    route = respx.post(f"{client_base_url}/api/foo")
+    route.mock(return_value=httpx.Response(200, content=foo.model_dump_json()))
+
+    response = await client.create_foo_api_foo_post(body=foo)
+
+    assert route.called
+    assert route.calls.last.request.content == foo.model_dump_json().encode()
+    assert response == foo
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_find_pets_by_status() -> None:
+    """
+    Check that responses which are not models are validated by the module-level TypeAdapters
+    """
+    client = PetstoreClient(base_url=client_base_url)
+    pets = [Pet(id=1, name="doggie", photoUrls=[])]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, content=f"[{pets[0].model_dump_json()}]".encode()))
+
+    response = await client.findPetsByStatus()
+
+    assert route.called
+    assert response == pets
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_get_inventory() -> None:
+    client = PetstoreClient(base_url=client_base_url)
+
+    route = respx.get(f"{client_base_url}/store/inventory")
+    route.mock(return_value=httpx.Response(200, json={"available": 1}))
+
+    assert await client.getInventory() == {"available": 1}
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_iter_find_pets_by_status() -> None:
+    client = PetstoreClient(base_url=client_base_url)
+    pets = [Pet(id=1, name="doggie", photoUrls=[]), Pet(id=2, name="kitty", photoUrls=[])]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, json=[pet.model_dump() for pet in pets]))
+
+    assert [pet async for pet in client.iter_findPetsByStatus()] == pets
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_create_users_with_list_input() -> None:
+    client = PetstoreClient(base_url=client_base_url)
+    users = [User(id=1, username="user_1"), User(id=2, username="user_2")]
+
+    route = respx.post(f"{client_base_url}/user/createWithList")
+    route.mock(return_value=httpx.Response(200, content=users[0].model_dump_json()))
+
+    await client.createUsersWithListInput(body=users, body_serializer_args={"exclude_none": True})
+
+    assert (
+        route.calls.last.request.content
+        == b'[{"id":1,"username":"user_1"},{"id":2,"username":"user_2"}]'
+    )
@@ -0,0 +1,60 @@
+import importlib
+import os
+
+from pathlib import Path
+from types import ModuleType
+
+import httpx
+import pytest
+
+from python_client_generator.main import generate, get_parser
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+client_base_url = "https://domain.tld"
+pet = {"id": 1, "name": "doggie", "photoUrls": []}
+
+
+def get_apis(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, sync: bool) -> ModuleType:
+    package_name = f"petstore_{'sync' if sync else 'async'}_client"
+    args = get_parser().parse_args(
+        ["--open-api", str(PATH / "inputs" / "swagger-petstore.json")]
+        + ["--package-name", package_name, "--project-name", "petstore"]
+        + ["--outdir", str(tmp_path), "--no-cache", "--group-by-tags"]
+        + (["--sync"] if sync else [])
+    )
+    generate(args)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return importlib.import_module(f"{package_name}.apis")
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/store/inventory":
+        return httpx.Response(200, json={"available": 1})
+    return httpx.Response(200, json=pet)
+
+
+@pytest.mark.asyncio
+async def test_root_client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    apis = get_apis(tmp_path, monkeypatch, sync=False)
+    transport = httpx.MockTransport(handler)
+
+    async with apis.RootClient(base_url=client_base_url, transport=transport) as client:
+        assert client._apis == {}
+        assert client.pet is client.pet
+        assert isinstance(client.store, apis.StoreApi)
+        assert client.pet._transport is client.store._transport is transport
+
+        assert await client.pet.getPetById(petId=1) == apis.Pet.parse_obj(pet)
+        assert await client.store.getInventory() == {"available": 1}
+
+
+def test_root_client_sync(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    apis = get_apis(tmp_path, monkeypatch, sync=True)
+
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+    with apis.RootClient(base_url=client_base_url, limits=limits) as client:
+        assert isinstance(client._transport, httpx.HTTPTransport)
+        assert client.pet._transport is client.user._transport is client._transport
+        assert client._transport._pool._max_connections == 10
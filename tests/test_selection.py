@@ -0,0 +1,125 @@
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from python_client_generator.main import generate, get_parser
+from python_client_generator.selection import select_operations
+
+
+PATH = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+@pytest.fixture()
+def petstore() -> Dict[str, Any]:
+    with open(PATH / "inputs" / "swagger-petstore.json", "r") as f:
+        swagger: Dict[str, Any] = json.load(f)
+    return swagger
+
+
+def get_operation_ids(swagger: Dict[str, Any]) -> List[str]:
+    return [m["operationId"] for path in swagger["paths"].values() for m in path.values()]
+
+
+@pytest.mark.parametrize(
+    "include_operations,include_tags,exclude_operations,exclude_tags,expected",
+    [
+        (["getPetById"], None, None, None, ["getPetById"]),
+        (None, ["store"], ["delete*"], None, ["getInventory", "placeOrder", "getOrderById"]),
+        (["getPetById"], ["store"], None, ["store"], ["getPetById"]),
+        (None, None, ["*Pet*", "*Order*", "upload*"], ["user"], ["getInventory"]),
+    ],
+)
+def test_select_operations(
+    petstore: Dict[str, Any],
+    include_operations: Optional[List[str]],
+    include_tags: Optional[List[str]],
+    exclude_operations: Optional[List[str]],
+    exclude_tags: Optional[List[str]],
+    expected: List[str],
+) -> None:
+    selected = select_operations(
+        petstore, include_operations, include_tags, exclude_operations, exclude_tags
+    )
+
+    assert get_operation_ids(selected) == expected
+
+
+def test_select_operations_prunes_components(petstore: Dict[str, Any]) -> None:
+    operation_ids = get_operation_ids(petstore)
+    schemas = set(petstore["components"]["schemas"])
+
+    selected = select_operations(petstore, include_operations=["getPetById"])
+
+    # Pet references Category and Tag
+    assert set(selected["components"]["schemas"]) == {"Pet", "Category", "Tag"}
+    assert set(selected["components"]["requestBodies"]) == set()
+    assert selected["components"]["securitySchemes"] == petstore["components"]["securitySchemes"]
+    # The original document is left untouched
+    assert get_operation_ids(petstore) == operation_ids
+    assert set(petstore["components"]["schemas"]) == schemas
+
+
+def test_select_operations_unmatched_pattern(petstore: Dict[str, Any]) -> None:
+    with pytest.raises(ValueError, match="--include-tags 'pets'"):
+        select_operations(petstore, include_tags=["pet", "pets"])
+
+
+def test_generate_selected_operations(tmp_path: Path) -> None:
+    args = get_parser().parse_args(
+        ["--open-api", str(PATH / "inputs" / "swagger-petstore.json"), "--no-cache"]
+        + ["--package-name", "selected_client", "--project-name", "selected"]
+        + ["--outdir", str(tmp_path), "--include-tags", "store", "--exclude-operations", "delete*"]
+    )
+    generate(args)
+
+    with open(tmp_path / "selected_client" / "models.py", "r") as f:
+        models = f.read()
+    with open(tmp_path / "selected_client" / "apis.py", "r") as f:
+        apis = f.read()
+
+    assert "class Order(BaseModel)" in models
+    assert "class Pet(BaseModel)" not in models
+    assert "def placeOrder(" in apis
+    assert "def deleteOrder(" not in apis
+    assert "def getPetById(" not in apis
+
+
+def test_select_operations_keeps_discriminator_mapping_targets() -> None:
+    swagger: Dict[str, Any] = {
+        "openapi": "3.0.2",
+        "paths": {
+            "/pet": {
+                "get": {
+                    "operationId": "getPet",
+                    "responses": {"200": {"$ref": "#/components/responses/Pet"}},
+                }
+            }
+        },
+        "components": {
+            "responses": {
+                "Pet": {
+                    "description": "",
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "discriminator": {
+                                    "propertyName": "type",
+                                    "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"},
+                                },
+                            }
+                        }
+                    },
+                }
+            },
+            "schemas": {name: {"type": "object"} for name in ("Cat", "Dog", "Fish")},
+        },
+    }
+
+    selected = select_operations(swagger, include_operations=["getPet"])
+
+    assert set(selected["components"]["schemas"]) == {"Cat", "Dog"}
@@ -4,40 +4,94 @@ import os
 from pathlib import Path
 from typing import Any, Dict
 
-from python_client_generator.generate_apis import generate_apis
+import pytest
+
+from python_client_generator.generate_apis import generate_apis, get_param_value
 from python_client_generator.generate_base_client import generate_base_client
 from python_client_generator.generate_models import generate_models
 from python_client_generator.generate_pyproject import generate_pyproject
 
 
-EXPECTED_PATH = (
-    Path(os.path.dirname(os.path.realpath(__file__))) / "expected/swagger_petstore_client"
+EXPECTED_PATH = Path(os.path.dirname(os.path.realpath(__file__))) / "expected"
+
+model_backends = pytest.mark.parametrize(
+    "options, expected_dir",
+    [
+        ({}, "swagger_petstore_client"),
+        ({"pydantic_v2": True}, "swagger_petstore_client_v2"),
+        ({"model_backend": "msgspec"}, "swagger_petstore_client_msgspec"),
+    ],
 )
 
 
-def test_models(swagger_petstore_openapi: Dict[str, Any], tmp_path: Path) -> None:
-    generate_models(swagger_petstore_openapi, tmp_path / "models.py")
-    assert filecmp.cmp(EXPECTED_PATH / "models.py", tmp_path / "models.py", shallow=False) is True
+@model_backends
+def test_models(
+    options: Dict[str, Any],
+    expected_dir: str,
+    swagger_petstore_openapi: Dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    generate_models(swagger_petstore_openapi, tmp_path / "models.py", **options)
+    assert filecmp.cmp(
+        EXPECTED_PATH / expected_dir / "models.py", tmp_path / "models.py", shallow=False
+    )
 
 
-def test_base_client(tmp_path: Path) -> None:
-    generate_base_client(tmp_path / "base_client.py", sync=False)
-    assert (
-        filecmp.cmp(EXPECTED_PATH / "base_client.py", tmp_path / "base_client.py", shallow=False)
-        is True
+@model_backends
+def test_base_client(options: Dict[str, Any], expected_dir: str, tmp_path: Path) -> None:
+    generate_base_client(tmp_path / "base_client.py", sync=False, **options)
+    assert filecmp.cmp(
+        EXPECTED_PATH / expected_dir / "base_client.py", tmp_path / "base_client.py", shallow=False
     )
 
 
-def test_apis(swagger_petstore_openapi: Dict[str, Any], tmp_path: Path) -> None:
-    generate_apis(swagger_petstore_openapi, tmp_path / "apis.py", group_by_tags=False, sync=False)
-    assert filecmp.cmp(EXPECTED_PATH / "apis.py", tmp_path / "apis.py", shallow=False) is True
+@model_backends
+def test_apis(
+    options: Dict[str, Any],
+    expected_dir: str,
+    swagger_petstore_openapi: Dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    generate_apis(
+        swagger_petstore_openapi,
+        tmp_path / "apis.py",
+        group_by_tags=False,
+        sync=False,
+        **options,
+    )
+    assert filecmp.cmp(
+        EXPECTED_PATH / expected_dir / "apis.py", tmp_path / "apis.py", shallow=False
+    )
 
 
-def test_pyproject(swagger_petstore_openapi: Dict[str, Any], tmp_path: Path) -> None:
+@model_backends
+def test_pyproject(
+    options: Dict[str, Any],
+    expected_dir: str,
+    swagger_petstore_openapi: Dict[str, Any],
+    tmp_path: Path,
+) -> None:
     generate_pyproject(
-        swagger_petstore_openapi, tmp_path / "pyproject.toml", project_name="test-project"
+        swagger_petstore_openapi,
+        tmp_path / "pyproject.toml",
+        project_name="test-project",
+        **options,
     )
-    assert (
-        filecmp.cmp(EXPECTED_PATH / "pyproject.toml", tmp_path / "pyproject.toml", shallow=False)
-        is True
+    assert filecmp.cmp(
+        EXPECTED_PATH / expected_dir / "pyproject.toml", tmp_path / "pyproject.toml", shallow=False
     )
+
+
+@pytest.mark.parametrize(
+    "schema,expected",
+    [
+        ({"type": "string"}, "x"),
+        ({"type": "array", "items": {"type": "integer"}}, "x"),
+        ({"type": "string", "format": "uuid"}, "str(x)"),
+        ({"type": "string", "enum": ["a", "b"]}, 'getattr(x, "value", x)'),
+        ({"allOf": [{"title": "E", "type": "string", "enum": ["a"]}]}, 'getattr(x, "value", x)'),
+        ({}, "self._serialize_param(x)"),
+    ],
+)
+def test_get_param_value(schema: Dict[str, Any], expected: str) -> None:
+    assert get_param_value("x", schema) == expected
@@ -0,0 +1,213 @@
+import importlib
+import json
+
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import httpx
+import pytest
+import respx
+
+from python_client_generator.generate_base_client import generate_base_client
+from python_client_generator.main import generate, get_parser
+from tests.utils import import_from_path
+
+from .expected.swagger_petstore_client import apis
+from .expected.swagger_petstore_client.apis import Api as PetstoreClient
+from .expected.swagger_petstore_client.base_client import JSONArrayParser, RootParser
+from .expected.swagger_petstore_client.models import Pet, Tag, User
+
+
+client_base_url = "https://domain.tld"
+client = PetstoreClient(base_url=client_base_url)
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_find_pets_by_status() -> None:
+    pets = [
+        Pet.parse_obj({"id": 1, "name": "doggie", "photoUrls": []}),
+        Pet.parse_obj({"id": 2, "name": "kitty", "photoUrls": []}),
+    ]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, json=[pet.dict() for pet in pets]))
+
+    response = await client.findPetsByStatus()
+
+    assert route.called
+    assert response == pets
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_get_inventory() -> None:
+    route = respx.get(f"{client_base_url}/store/inventory")
+    route.mock(return_value=httpx.Response(200, json={"available": 1}))
+
+    assert await client.getInventory() == {"available": 1}
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_find_pets_by_status_without_validation() -> None:
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, json=[{"name": "doggie", "tags": [{"id": 1}]}]))
+
+    response = await client.findPetsByStatus(_validate=False)
+
+    assert isinstance(response[0], Pet)
+    assert response[0].tags == [Tag.parse_obj({"id": 1})]
+
+
+def test_parameter_named_validate(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Check that the `_validate` option of calls doesn't clash with parameters named `validate`
+    """
+    with open(Path(__file__).parent / "inputs" / "swagger-petstore.json", "r") as f:
+        swagger = json.load(f)
+    swagger["paths"]["/pet/findByStatus"]["get"]["parameters"].append(
+        {"name": "validate", "in": "query", "required": False, "schema": {"type": "boolean"}}
+    )
+    spec_path = tmp_path / "petstore.json"
+    with open(spec_path, "w") as f:
+        json.dump(swagger, f)
+    args = get_parser().parse_args(
+        ["--open-api", str(spec_path), "--package-name", "validate_petstore_client"]
+        + ["--project-name", "petstore", "--outdir", str(tmp_path), "--no-cache", "--sync"]
+    )
+    generate(args)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    apis = importlib.import_module("validate_petstore_client.apis")
+
+    requests: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=[{"id": "unvalidated", "name": "doggie"}])
+
+    sync_client = apis.Api(base_url=client_base_url, transport=httpx.MockTransport(handler))
+    pets = sync_client.findPetsByStatus(validate=True, _validate=False)
+
+    assert requests[0].url.params["validate"] == "true"
+    assert pets[0].id == "unvalidated"
+
+
+def test_parsers_are_shared() -> None:
+    """
+    Check that endpoints returning the same type which isn't a model share a module-level parser,
+    as do the streaming endpoints parsing the same items
+    """
+    parsers = [value for value in vars(apis).values() if isinstance(value, RootParser)]
+
+    assert len(parsers) == 3
+    assert apis._List_Pet_parser.parse_obj([{"name": "doggie", "photoUrls": []}]) == [
+        Pet.parse_obj({"name": "doggie", "photoUrls": []})
+    ]
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_iter_find_pets_by_status() -> None:
+    pets = [
+        Pet.parse_obj({"id": 1, "name": "doggie", "photoUrls": []}),
+        Pet.parse_obj({"id": 2, "name": "kitty", "photoUrls": []}),
+    ]
+
+    route = respx.get(f"{client_base_url}/pet/findByStatus")
+    route.mock(return_value=httpx.Response(200, json=[pet.dict() for pet in pets]))
+
+    assert [pet async for pet in client.iter_findPetsByStatus()] == pets
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+def test_json_array_parser(chunk_size: int) -> None:
+    items = [{"a": [1, "é]"]}, 12345, -1.5e3, "s", True, None, [], {}]
+    content = json.dumps(items, indent=2).encode()
+    parser = JSONArrayParser()
+
+    parsed = []
+    chunks = [content[i:][:chunk_size] for i in range(0, len(content), chunk_size)]
+    for chunk in chunks:
+        parsed += parser.feed(chunk)
+    parsed += parser.feed(b"", final=True)
+
+    assert parsed == items
+
+
+def test_json_array_parser_large_item() -> None:
+    items = ["x" * 100_000, 1]
+    content = json.dumps(items).encode()
+    calls = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s: str, idx: int = 0) -> Tuple[Any, int]:
+            calls.append(idx)
+            return super().raw_decode(s, idx)
+
+    parser = JSONArrayParser()
+    parser._json_decoder = CountingDecoder()
+
+    parsed = []
+    for i in range(0, len(content), 10):
+        parsed += parser.feed(content[i:][:10])
+    parsed += parser.feed(b"", final=True)
+
+    assert parsed == items
+    # The incomplete item is only parsed again once the pending text has doubled
+    assert len(calls) < 30
+
+
+@pytest.mark.parametrize(
+    "content", [b"", b"{}", b"[1", b"[1 2]", b"[1,]", b"[,1]", b"[1]]", b'["a]']
+)
+def test_json_array_parser_raises(content: bytes) -> None:
+    parser = JSONArrayParser()
+
+    with pytest.raises(ValueError):
+        parser.feed(content)
+        parser.feed(b"", final=True)
+
+
+def test_iter_json_array_sync(tmp_path: Path) -> None:
+    generate_base_client(tmp_path / "base_client.py", sync=True)
+    base_client = import_from_path("sync_base_client", tmp_path / "base_client.py")
+    response = httpx.Response(200, content=iter([b"[1", b"2, ", b'{"a"', b": 3}]"]))
+
+    assert list(base_client.BaseClient._iter_json_array(response)) == [12, {"a": 3}]
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_request_params_and_headers() -> None:
+    """
+    Check that optional parameters are only sent when set, and that the params and headers passed
+    as keyword arguments are merged over those of the endpoint
+    """
+    find_route = respx.get(f"{client_base_url}/pet/findByStatus")
+    find_route.mock(return_value=httpx.Response(200, json=[]))
+    delete_route = respx.delete(f"{client_base_url}/pet/1")
+    delete_route.mock(return_value=httpx.Response(200))
+
+    await client.findPetsByStatus(status="sold", params={"page": 2}, headers={"X-Trace": "1"})
+    await client.deletePet(petId=1)
+    await client.deletePet(petId=1, api_key="key", headers={"api_key": "other"})
+
+    find_request = find_route.calls.last.request
+    assert dict(find_request.url.params) == {"status": "sold", "page": "2"}
+    assert find_request.headers["X-Trace"] == "1"
+    assert "api_key" not in delete_route.calls[0].request.headers
+    assert delete_route.calls[1].request.headers["api_key"] == "other"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_create_users_with_list_input() -> None:
+    users = [User.parse_obj({"id": i, "username": f"user_{i}"}) for i in (1, 2)]
+
+    route = respx.post(f"{client_base_url}/user/createWithList")
+    route.mock(return_value=httpx.Response(200, json=users[0].dict()))
+
+    await client.createUsersWithListInput(body=users)
+
+    assert json.loads(route.calls.last.request.content) == [user.dict() for user in users]
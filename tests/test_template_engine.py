@@ -0,0 +1,22 @@
+import chevron
+
+from python_client_generator.template_engine import (
+    Template,
+    get_template,
+    load_template,
+)
+
+
+def test_template_renders_like_chevron() -> None:
+    source = "{{#items}}\n  {{name}} = {{{value}}}\n{{/items}}\n{{^items}}\nempty\n{{/items}}\n"
+    template = Template(source)
+
+    for data in [{"items": [{"name": "a", "value": '"<a>"'}, {"name": "<b>", "value": 1}]}, {}]:
+        assert template.render(data) == chevron.render(source, data)
+
+
+def test_templates_are_tokenized_once() -> None:
+    template = get_template("apis_endpoint.py.mustache")
+
+    assert get_template("apis_endpoint.py.mustache") is template
+    assert template.tokens == Template(load_template("apis_endpoint.py.mustache")).tokens
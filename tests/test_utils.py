@@ -3,10 +3,14 @@ import typing as t
 import pytest
 
 from python_client_generator.exceptions import UnsupportedOpenAPISpec
+from python_client_generator.schema_cache import get_schema_cache, schema_cache
 from python_client_generator.utils import (
     add_schema_title_if_missing,
     assert_openapi_version,
+    collect_refs,
     dereference_swagger,
+    resolve_type,
+    strongly_connected_components,
 )
 from tests.utils import does_not_raise
 
@@ -61,6 +65,10 @@ from tests.utils import does_not_raise
                 }
             },
         ),  # Shouldn't fail if title is already present
+        (
+            {"X": {"$ref": "#/components/schemas/Y"}},
+            {"X": {"$ref": "#/components/schemas/Y"}},
+        ),  # Shouldn't add title to references to other schemas
     ],
 )
 def test_add_schema_title_if_missing(
@@ -137,3 +145,130 @@ class TestDereferenceSwagger:
         expected["b"] = [original["schemas"]["X"], original["schemas"]["X"]]
 
         assert dereference_swagger(current, original) == expected
+
+    def test_dereference_swagger_shares_resolved_nodes(self) -> None:
+        original: t.Dict[str, t.Any] = {
+            "a": {"$ref": "#/schemas/X"},
+            "b": [{"$ref": "#/schemas/X"}, {"$ref": "#/schemas/Y"}],
+            "schemas": {
+                "X": {"type": "object", "properties": {"y": {"$ref": "#/schemas/Y"}}},
+                "Y": {"$ref": "#/schemas/Z"},
+                "Z": {"type": "string"},
+            },
+        }
+
+        result = dereference_swagger(original, original)
+
+        assert result["a"] is result["b"][0] is result["schemas"]["X"]
+        assert result["b"][1] is result["schemas"]["X"]["properties"]["y"]
+        assert result["schemas"]["Y"] == {"type": "string"}
+        assert original["a"] == {"$ref": "#/schemas/X"}  # Input is left untouched
+
+    def test_dereference_swagger_with_recursive_schemas(self) -> None:
+        original: t.Dict[str, t.Any] = {
+            "schemas": {
+                "Node": {
+                    "title": "Node",
+                    "type": "object",
+                    "properties": {
+                        "children": {"type": "array", "items": {"$ref": "#/schemas/Node"}},
+                    },
+                },
+                "Tree": {"type": "array", "items": {"$ref": "#/schemas/Tree"}},
+            },
+        }
+
+        result = dereference_swagger(original, original)
+
+        node = result["schemas"]["Node"]
+        assert node["properties"]["children"]["items"] is node
+        assert resolve_type(node["properties"]["children"]) == "List[Node]"
+        assert resolve_type(result["schemas"]["Tree"]) == "List[Any]"
+
+    def test_dereference_swagger_with_circular_ref_chain(self) -> None:
+        original: t.Dict[str, t.Any] = {
+            "a": {"$ref": "#/b"},
+            "b": {"$ref": "#/a"},
+        }
+
+        with pytest.raises(UnsupportedOpenAPISpec):
+            dereference_swagger(original, original)
+
+
+def test_collect_refs() -> None:
+    document: t.Dict[str, t.Any] = {
+        "paths": {"/": {"get": {"schema": {"$ref": "#/schemas/A"}}}},
+        "schemas": {
+            "A": {"items": [{"$ref": "#/schemas/B"}]},
+            "B": {"properties": {"a": {"$ref": "#/schemas/A"}}},
+            "C": {"type": "string"},
+        },
+    }
+
+    assert collect_refs(document["paths"], document) == {"#/schemas/A", "#/schemas/B"}
+
+
+def test_collect_refs_of_discriminator_mappings() -> None:
+    document: t.Dict[str, t.Any] = {
+        "paths": {"/": {"get": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "oneOf": [{"$ref": "#/components/schemas/Cat"}],
+                    "discriminator": {
+                        "propertyName": "type",
+                        "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"},
+                    },
+                },
+                "Cat": {"type": "object"},
+                "Dog": {"properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+                "Owner": {"type": "object"},
+                "Fish": {"type": "object"},
+            }
+        },
+    }
+
+    assert collect_refs(document["paths"], document) == {
+        f"#/components/schemas/{name}" for name in ("Pet", "Cat", "Dog", "Owner")
+    }
+
+
+def test_resolve_type_is_memoized_in_schema_cache() -> None:
+    item: t.Dict[str, t.Any] = {"title": "Item", "type": "object", "properties": {}}
+    schema: t.Dict[str, t.Any] = {"type": "array", "items": item}
+
+    with schema_cache() as cache:
+        assert resolve_type(schema) == "List[Item]"
+        with schema_cache() as nested_cache:
+            assert nested_cache is cache
+            assert resolve_type(schema) == "List[Item]"
+
+    assert cache.types == {
+        (id(schema), False, False): "List[Item]",
+        (id(item), True, False): "Item",
+    }
+    assert get_schema_cache() is None
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_resolve_type_of_untitled_recursive_schemas_in_schema_cache(reverse: bool) -> None:
+    # tree -> node -> tree, with a list of nodes
+    tree: t.Dict[str, t.Any] = {"type": "array"}
+    node: t.Dict[str, t.Any] = {"anyOf": [tree, {"type": "integer"}]}
+    tree["items"] = node
+    nodes: t.Dict[str, t.Any] = {"type": "array", "items": node}
+    expected = [(tree, "List[Union[Any, int]]"), (nodes, "List[Union[List[Any], int]]")]
+
+    with schema_cache() as cache:
+        for schema, type_ in reversed(expected) if reverse else expected:
+            assert resolve_type(schema) == type_
+
+    # The types falling back to Any depend on where the resolution started
+    assert (id(node), True, False) not in cache.types
+
+
+def test_strongly_connected_components() -> None:
+    # 0 -> 1 <-> 2 -> 3, 3 -> 3, 4 isolated
+    edges = [[1], [2], [1, 3], [3], []]
+
+    assert strongly_connected_components(edges) == [[3], [1, 2], [0], [4]]
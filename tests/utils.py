@@ -1,8 +1,24 @@
+import importlib.util
+import sys
 import typing as t
 
 from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
 
 
 @contextmanager
 def does_not_raise() -> t.Generator:
     yield
+
+
+def import_from_path(name: str, path: Path) -> ModuleType:
+    """
+    Import a generated module or package (given its `__init__.py`) from its path
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module